@@ -1,35 +1,224 @@
 """
 AI Helper for XScout - Uses Google Gemini (Free)
-Features: Lead Scoring, Reply Generation, Keyword Expansion
+Features: Lead Scoring, Reply Generation, Batched Outreach for Scored Leads, Keyword Expansion,
+Local classifier in front of Gemini for confident calls
 """
-import google.generativeai as genai
 import os
 import json
-from typing import Dict, List, Optional
+import time
+import hashlib
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from text_match import normalize_text
+from classifier import LeadClassifier, ScoreLog
+from scheduler import TokenBucket
+from metrics import metrics, timed
+from state_store import connect
+
+# Bump whenever a prompt changes so cached results from the old prompt are not reused
+PROMPT_VERSION = "2"
+
+SCORING_RULES = """CRITICAL: If the author is a developer/designer offering services, score 0! We want CLIENTS, not competitors.
+
+Red flags (score 0-2):
+- "I help", "I build", "I offer", "hire me", "I'm a developer"
+- Portfolio links, service advertisements
+- Other developers promoting themselves
+
+Rate from 0-10 where:
+- 10: CLIENT with clear intent, budget indicators, or urgency
+- 7-9: CLIENT with project details or specific requirements
+- 4-6: Possible CLIENT but vague or uncertain
+- 1-3: Poor lead, might be spam or irrelevant
+- 0: NOT A CLIENT (developer/competitor, spam, or irrelevant)
+
+ALSO detect URGENCY level (1-3):
+- 3 (HIGH): "ASAP", "urgent", "immediately", "right now", "need now", "emergency", "quick", "fast"
+- 2 (MEDIUM): "soon", "this week", "need help", "looking for"
+- 1 (LOW): "eventually", "considering", "thinking about", "might need\""""
+
+
+OUTREACH_GUIDELINES = """"reply" - a SHORT, friendly public reply to their tweet (max 200 characters) that:
+1. References their specific need from the tweet
+2. Mentions 1-2 key benefits a website would bring to their business type
+3. Includes: {portfolio_url}
+4. Ends with "DM me if interested"
+
+"dm" - a SHORT, personalized direct message (150-200 characters max):
+1. Quick friendly greeting
+2. Reference their specific need from tweet
+3. Mention 2 KEY BENEFITS a website brings to their business type
+4. Add: {portfolio_url}
+5. Simple CTA: "Let me know if you'd like to discuss!"
+
+Keep both BRIEF, CASUAL, and FRIENDLY, focused on THEIR benefit. Don't be pushy or salesy."""
+
+
+class ResponseCache:
+    """
+    On-disk cache of AI results.
+    Keys hash the result kind, PROMPT_VERSION and the normalized inputs. Entries
+    expire after `ttl` seconds; past `max_entries` the least recently used go first.
+    With `bypass` set, lookups always miss but fresh results are still stored.
+    """
+    
+    def __init__(self, path: str, ttl: float = 7 * 86400, max_entries: int = 20000, bypass: bool = False):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bypass = bypass
+        self.hits = Counter()
+        self.misses = Counter()
+        self.lock = threading.Lock()
+        
+        self.conn = connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS ai_cache ("
+            " key TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ai_cache_accessed_at ON ai_cache (accessed_at)")
+        self.conn.execute("DELETE FROM ai_cache WHERE created_at < ?", (time.time() - self.ttl,))
+        self.conn.commit()
+    
+    @staticmethod
+    def key(kind: str, *parts: str) -> str:
+        material = "\x1f".join([kind, PROMPT_VERSION] + [normalize_text(part) for part in parts])
+        return f"{kind}:{hashlib.sha256(material.encode('utf-8')).hexdigest()}"
+    
+    def get(self, key: str):
+        kind = key.split(':', 1)[0]
+        if self.bypass:
+            self.misses[kind] += 1
+            metrics.inc('xscout_ai_cache_requests_total', kind=kind, result='miss')
+            return None
+        
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, created_at FROM ai_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if not row or time.time() - row[1] > self.ttl:
+                self.misses[kind] += 1
+                metrics.inc('xscout_ai_cache_requests_total', kind=kind, result='miss')
+                return None
+            
+            self.conn.execute("UPDATE ai_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+        
+        self.hits[kind] += 1
+        metrics.inc('xscout_ai_cache_requests_total', kind=kind, result='hit')
+        return json.loads(row[0])
+    
+    def set(self, key: str, value):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO ai_cache (key, kind, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, key.split(':', 1)[0], json.dumps(value), now, now)
+            )
+            overflow = self.conn.execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self.conn.execute(
+                    "DELETE FROM ai_cache WHERE key IN ("
+                    " SELECT key FROM ai_cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,)
+                )
+            self.conn.commit()
+    
+    def invalidate(self, kind: Optional[str] = None) -> int:
+        """Drop every cached entry, or only those of one kind. Returns rows removed."""
+        with self.lock:
+            if kind:
+                removed = self.conn.execute("DELETE FROM ai_cache WHERE kind = ?", (kind,)).rowcount
+            else:
+                removed = self.conn.execute("DELETE FROM ai_cache").rowcount
+            self.conn.commit()
+        return removed
+    
+    def report(self):
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        if not hits and not misses:
+            return
+        rate = 100 * hits / (hits + misses)
+        print(f"[*] AI cache: {hits} hits / {misses} misses ({rate:.0f}% hit rate)")
+        for kind in sorted(set(self.hits) | set(self.misses)):
+            print(f"    {kind}: {self.hits[kind]} hits / {self.misses[kind]} misses")
+
 
 class AIHelper:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache: Optional[ResponseCache] = None,
+                 rate_limiter: Optional[TokenBucket] = None, rate_limit_wait: float = 20,
+                 score_log: Optional[ScoreLog] = None, classifier: Optional[LeadClassifier] = None,
+                 batch_retries: int = 1, batch_backoff: float = 5):
         self.api_key = api_key
         self.enabled = bool(api_key and api_key != 'your_gemini_api_key_here')
+        self.cache = cache
+        self.score_log = score_log
+        self.classifier = classifier
+        self.rate_limiter = rate_limiter
+        self.rate_limit_wait = rate_limit_wait
+        self.batch_retries = batch_retries
+        self.batch_backoff = batch_backoff
+        self._model = None
+        self._model_lock = threading.Lock()
         
         if self.enabled:
-            try:
-                genai.configure(api_key=api_key)
-                self.model = genai.GenerativeModel('gemini-2.5-flash')
-                print("[+] AI Features enabled with Google Gemini")
-            except Exception as e:
-                print(f"[X] Failed to initialize AI: {e}")
-                self.enabled = False
+            print("[+] AI Features enabled with Google Gemini")
         else:
             print("[i] AI Features disabled (no API key)")
     
-    def score_lead(self, tweet_text: str, author_username: str) -> Dict:
+    @property
+    def model(self):
         """
-        Score a tweet as a potential lead (0-10) and detect urgency
+        The Gemini model, created on first use: importing google.generativeai takes
+        most of a second, which runs with no uncached leads never need to pay
+        """
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    try:
+                        with metrics.timer('startup.import_genai'):
+                            import google.generativeai as genai
+                        genai.configure(api_key=self.api_key)
+                        self._model = genai.GenerativeModel('gemini-2.5-flash')
+                    except Exception as e:
+                        print(f"[X] Failed to initialize AI: {e}")
+                        self.enabled = False
+                        raise
+        return self._model
+    
+    @model.setter
+    def model(self, model):
+        self._model = model
+    
+    def _generate(self, prompt: str):
+        """Call Gemini, waiting for a rate-limit token first so bursts queue instead of failing"""
+        if self.rate_limiter and not self.rate_limiter.acquire(timeout=self.rate_limit_wait):
+            metrics.inc('xscout_rate_limited_total', service='gemini')
+            raise RuntimeError(f"Gemini rate limit reached (no request slot within {self.rate_limit_wait:.0f}s)")
+        with metrics.timer('gemini.generate_content'):
+            return self.model.generate_content(prompt)
+    
+    @timed('ai.score_lead')
+    def score_lead(self, tweet_text: str, author_username: str, local: bool = True) -> Dict:
+        """
+        Score a tweet as a potential lead (0-10) and detect urgency.
+        local=False skips the local classifier (batch fallbacks have already asked it)
         Returns: {score: int, reason: str, urgency: str, urgency_level: int}
         """
         if not self.enabled:
-            return {"score": 5, "reason": "AI disabled", "urgency": "medium", "urgency_level": 2}
+            return {"score": 5, "reason": "AI disabled", "urgency": "medium", "urgency_level": 2, "scored": False}
+        
+        # Scores depend only on the text, so reposted spam under other accounts hits the cache
+        cache_key = self._cache_key('score', tweet_text)
+        cached = self._cache_get(cache_key) or (self._local_score(tweet_text) if local else None)
+        if cached:
+            return cached
         
         try:
             prompt = f"""Analyze this tweet to determine if it's a quality lead for a web developer/designer.
@@ -37,83 +226,277 @@ class AIHelper:
 Tweet: "{tweet_text}"
 Author: @{author_username}
 
-CRITICAL: If the author is a developer/designer offering services, score 0! We want CLIENTS, not competitors.
-
-Red flags (score 0-2):
-- "I help", "I build", "I offer", "hire me", "I'm a developer"
-- Portfolio links, service advertisements
-- Other developers promoting themselves
-
-Rate from 0-10 where:
-- 10: CLIENT with clear intent, budget indicators, or urgency
-- 7-9: CLIENT with project details or specific requirements
-- 4-6: Possible CLIENT but vague or uncertain
-- 1-3: Poor lead, might be spam or irrelevant
-- 0: NOT A CLIENT (developer/competitor, spam, or irrelevant)
-
-ALSO detect URGENCY level (1-3):
-- 3 (HIGH): "ASAP", "urgent", "immediately", "right now", "need now", "emergency", "quick", "fast"
-- 2 (MEDIUM): "soon", "this week", "need help", "looking for"
-- 1 (LOW): "eventually", "considering", "thinking about", "might need"
+{SCORING_RULES}
 
 Respond ONLY in this JSON format:
 {{"score": <number>, "reason": "<brief explanation>", "urgency": "<high/medium/low>", "urgency_level": <1-3>}}"""
 
-            response = self.model.generate_content(prompt)
-            result = json.loads(response.text.strip().replace('```json', '').replace('```', ''))
-            
-            score = int(result.get('score', 5))
-            reason = result.get('reason', 'No reason provided')
-            urgency = result.get('urgency', 'medium').lower()
-            urgency_level = int(result.get('urgency_level', 2))
+            response = self._generate(prompt)
+            result = self._normalize_score(json.loads(self._strip_fences(response.text)))
             
-            return {
-                "score": score,
-                "reason": reason,
-                "urgency": urgency,
-                "urgency_level": urgency_level
-            }
+            self._remember(cache_key, tweet_text, result)
+            return result
         except Exception as e:
             print(f"[X] AI scoring error: {e}")
-            return {"score": 5, "reason": f"Error: {e}", "urgency": "medium", "urgency_level": 2}
+            return self._score_error(e)
     
-    def generate_reply(self, tweet_text: str, author_username: str, portfolio_url: str) -> Optional[str]:
+    @timed('ai.score_leads')
+    def score_leads(self, batch: List[Dict]) -> List[Dict]:
         """
-        Generate a personalized DM based on the client's business and needs
+        Score many tweets in one request.
+        batch: [{text: str, username: str}, ...]
+        Returns one score_lead-style dict per item, in the same order. Items missing
+        or malformed in the response fall back to score_lead individually.
         """
         if not self.enabled:
-            return None
+            return [self.score_lead(item['text'], item['username']) for item in batch]
         
-        try:
-            prompt = f"""You are a professional web developer reaching out to a potential client.
+        def build_prompt(sub_batch: List[Dict]) -> str:
+            return f"""Analyze each of these {len(sub_batch)} tweets to determine if it's a quality lead for a web developer/designer.
+Score every tweet independently.
 
-Their tweet: "{tweet_text}"
-Their username: @{author_username}
+{self._tweets_block(sub_batch)}
 
-Write a SHORT, friendly reply (max 200 characters) that:
-1. References their specific need from the tweet
-2. Mentions 1-2 key benefits a website would bring to their business type
-3. Include: {portfolio_url}
-4. End with "DM me if interested"
+{SCORING_RULES}
 
-Keep it brief, friendly, and focused on THEIR benefit, not your skills.
+Respond ONLY with a JSON array containing one object per tweet, using the tweet's number as "id":
+[{{"id": <tweet number>, "score": <number>, "reason": "<brief explanation>", "urgency": "<high/medium/low>", "urgency_level": <1-3>}}, ...]"""
+        
+        return self._batch_request(
+            'scoring', batch,
+            keys=[self._cache_key('score', item['text']) for item in batch],
+            build_prompt=build_prompt,
+            normalize=self._normalize_score,
+            fallback=lambda item: self.score_lead(item['text'], item['username'], local=False),
+            failed=lambda item, error: self._score_error(error),
+            local=lambda item: self._local_score(item['text'])
+        )
+    
+    @timed('ai.outreach_for_lead')
+    def outreach_for_lead(self, tweet_text: str, author_username: str, portfolio_url: str) -> Dict:
+        """
+        Write the public reply and suggested DM for an already-scored lead
+        Returns: {reply: str|None, dm: str|None}
+        """
+        if not self.enabled:
+            return {"reply": None, "dm": None}
+        
+        cache_key = self._cache_key('outreach', tweet_text, author_username, portfolio_url)
+        cached = self._cache_get(cache_key)
+        if cached:
+            return cached
+        
+        try:
+            prompt = f"""You are a professional web developer writing to a potential client about their tweet.
+
+Tweet: "{tweet_text}"
+Author: @{author_username}
 
-Reply:"""
+{OUTREACH_GUIDELINES.format(portfolio_url=portfolio_url)}
 
-            response = self.model.generate_content(prompt)
-            reply = response.text.strip()
+Respond ONLY in this JSON format:
+{{"reply": "<public reply>", "dm": "<direct message>"}}"""
+
+            response = self._generate(prompt)
+            result = self._normalize_outreach(json.loads(self._strip_fences(response.text)))
             
-            # Remove any quotes that might be added
-            reply = reply.strip('"').strip("'")
+            self._cache_set(cache_key, result)
+            return result
+        except Exception as e:
+            print(f"[X] AI outreach error: {e}")
+            return {"reply": None, "dm": None}
+    
+    @timed('ai.outreach_for_leads')
+    def outreach_for_leads(self, batch: List[Dict], portfolio_url: str) -> List[Dict]:
+        """
+        Batched outreach_for_lead: reply and DM for N scored leads in one request.
+        batch: [{text: str, username: str}, ...]
+        """
+        if not self.enabled:
+            return [self.outreach_for_lead(item['text'], item['username'], portfolio_url) for item in batch]
+        
+        def build_prompt(sub_batch: List[Dict]) -> str:
+            return f"""You are a professional web developer writing to {len(sub_batch)} potential clients about their tweets.
+Handle every tweet independently.
+
+{self._tweets_block(sub_batch)}
+
+{OUTREACH_GUIDELINES.format(portfolio_url=portfolio_url)}
+
+Respond ONLY with a JSON array containing one object per tweet, using the tweet's number as "id":
+[{{"id": <tweet number>, "reply": "<public reply>", "dm": "<direct message>"}}, ...]"""
+        
+        return self._batch_request(
+            'outreach', batch,
+            keys=[self._cache_key('outreach', item['text'], item['username'], portfolio_url) for item in batch],
+            build_prompt=build_prompt,
+            normalize=self._normalize_outreach,
+            fallback=lambda item: self.outreach_for_lead(item['text'], item['username'], portfolio_url),
+            failed=lambda item, error: {"reply": None, "dm": None}
+        )
+    
+    def _batch_request(self, kind: str, batch: List[Dict], keys: List[Optional[str]],
+                       build_prompt: Callable[[List[Dict]], str],
+                       normalize: Callable[[Dict], Dict],
+                       fallback: Callable[[Dict], Dict],
+                       failed: Callable[[Dict, Exception], Dict],
+                       local: Optional[Callable[[Dict], Optional[Dict]]] = None) -> List[Dict]:
+        """
+        Shared driver for the batched methods: serve cached items and those the local
+        classifier is sure about, send the rest in one numbered prompt, keep whatever
+        parses and fall back per item for anything missing or malformed. If the request
+        itself keeps failing (quota, rate limit, outage), one request per item would only
+        hit the same limit N times, so the batch is retried with backoff and then every
+        item gets `failed(item, error)`.
+        """
+        results: List[Optional[Dict]] = [
+            self._cache_get(key) or (local(item) if local else None) for key, item in zip(keys, batch)
+        ]
+        pending = [i for i, result in enumerate(results) if result is None]
+        missing = pending
+        
+        if len(pending) > 1:
+            prompt = build_prompt([batch[i] for i in pending])
+            response = error = None
+            for attempt in range(self.batch_retries + 1):
+                try:
+                    response = self._generate(prompt)
+                    break
+                except Exception as e:
+                    error = e
+                    if attempt < self.batch_retries:
+                        delay = self.batch_backoff * 2 ** attempt
+                        print(f"[!] AI batch {kind} failed ({e}), retrying in {delay:.0f}s...")
+                        time.sleep(delay)
+            if response is None:
+                print(f"[X] AI batch {kind} error: {error}, {len(pending)} tweets get no AI result")
+                metrics.inc('xscout_ai_batch_failures_total', kind=kind)
+                for i in pending:
+                    results[i] = failed(batch[i], error)
+                return results
             
-            if len(reply) > 280:
-                reply = reply[:277] + "..."
+            try:
+                items = self._parse_json_items(response.text)
+            except Exception as e:
+                print(f"[X] AI batch {kind} response unreadable: {e}")
+                items = []
+            for item in items:
+                try:
+                    position = int(item.get('id')) - 1
+                    if 0 <= position < len(pending) and results[pending[position]] is None:
+                        index = pending[position]
+                        results[index] = normalize(item)
+                        self._remember(keys[index], batch[index]['text'], results[index])
+                except (TypeError, ValueError):
+                    continue
             
-            return reply
-        except Exception as e:
-            print(f"[X] AI reply generation error: {e}")
-            return None
+            missing = [i for i in pending if results[i] is None]
+            if missing:
+                print(f"[!] Batch {kind} returned {len(pending) - len(missing)}/{len(pending)} results, handling the rest individually")
+        
+        for i in missing:
+            results[i] = fallback(batch[i])
+        
+        return results
+    
+    @staticmethod
+    def _score_error(error: Exception) -> Dict:
+        """Neutral stand-in when Gemini couldn't score a tweet; 'scored': False lets it through every threshold"""
+        return {"score": 5, "reason": f"Error: {error}", "urgency": "medium", "urgency_level": 2, "scored": False}
+    
+    @staticmethod
+    def _tweets_block(batch: List[Dict]) -> str:
+        return "\n".join(
+            f'{i}. Author: @{item["username"]} | Tweet: {json.dumps(item["text"], ensure_ascii=False)}'
+            for i, item in enumerate(batch, 1)
+        )
+    
+    def _cache_key(self, kind: str, *parts: str) -> Optional[str]:
+        return self.cache.key(kind, *parts) if self.cache else None
     
+    def _cache_get(self, key: Optional[str]):
+        return self.cache.get(key) if self.cache and key else None
+    
+    def _cache_set(self, key: Optional[str], value):
+        if self.cache and key and value:
+            self.cache.set(key, value)
+    
+    def _remember(self, key: Optional[str], tweet_text: str, result: Dict):
+        """Cache a fresh Gemini result and log its score as training data for the local classifier"""
+        self._cache_set(key, result)
+        if self.score_log:
+            try:
+                self.score_log.record(tweet_text, result)
+            except Exception as e:
+                print(f"[!] Could not log AI score: {e}")
+    
+    def _local_score(self, tweet_text: str) -> Optional[Dict]:
+        """The local classifier's score when it is confident, else None"""
+        return self.classifier.decide(tweet_text) if self.classifier else None
+    
+    @staticmethod
+    def _clean_reply(text: str) -> str:
+        # Remove any quotes that might be added
+        reply = text.strip().strip('"').strip("'")
+        
+        if len(reply) > 280:
+            reply = reply[:277] + "..."
+        
+        return reply
+    
+    @classmethod
+    def _normalize_outreach(cls, result: Dict) -> Dict:
+        reply = str(result.get('reply') or '').strip()
+        dm = str(result.get('dm') or '').strip().strip('"').strip("'")
+        return {"reply": cls._clean_reply(reply) if reply else None, "dm": dm or None}
+    
+    @staticmethod
+    def _strip_fences(text: str) -> str:
+        return text.strip().replace('```json', '').replace('```', '').strip()
+    
+    @staticmethod
+    def _normalize_score(result: Dict) -> Dict:
+        score = int(result.get('score', 5))
+        reason = result.get('reason', 'No reason provided')
+        urgency = str(result.get('urgency', 'medium')).lower()
+        urgency_level = int(result.get('urgency_level', 2))
+        
+        return {
+            "score": score,
+            "reason": reason,
+            "urgency": urgency,
+            "urgency_level": urgency_level
+        }
+    
+    def _parse_json_items(self, text: str) -> List[Dict]:
+        """
+        Parse a JSON array of objects from a model response, tolerating code fences,
+        surrounding prose and truncated output by salvaging each complete object.
+        """
+        text = self._strip_fences(text)
+        start, end = text.find('['), text.rfind(']')
+        if start != -1 and end > start:
+            try:
+                items = json.loads(text[start:end + 1])
+                if isinstance(items, list):
+                    return [item for item in items if isinstance(item, dict)]
+            except ValueError:
+                pass
+        
+        items = []
+        decoder = json.JSONDecoder()
+        position = text.find('{')
+        while position != -1:
+            try:
+                item, consumed = decoder.raw_decode(text, position)
+                if isinstance(item, dict):
+                    items.append(item)
+                position = text.find('{', consumed)
+            except ValueError:
+                position = text.find('{', position + 1)
+        return items
+    
+    @timed('ai.generate_dm')
     def generate_dm(self, tweet_text: str, author_username: str, portfolio_url: str) -> Optional[str]:
         """
         Generate a short, personalized DM for direct messaging
@@ -121,6 +504,11 @@ Reply:"""
         if not self.enabled:
             return None
         
+        cache_key = self._cache_key('dm', tweet_text, author_username, portfolio_url)
+        cached = self._cache_get(cache_key)
+        if cached:
+            return cached
+        
         try:
             prompt = f"""You are a professional web developer reaching out to a potential client.
 
@@ -140,17 +528,19 @@ Don't be pushy or salesy. Just helpful.
 
 Message:"""
 
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             dm = response.text.strip()
             
             # Remove any quotes
             dm = dm.strip('"').strip("'")
             
+            self._cache_set(cache_key, dm)
             return dm
         except Exception as e:
             print(f"[X] AI DM generation error: {e}")
             return None
     
+    @timed('ai.expand_keywords')
     def expand_keywords(self, base_keywords: List[str], count: int = 10) -> List[str]:
         """
         Generate additional relevant keywords based on existing ones
@@ -171,7 +561,7 @@ Generate {count} more creative, relevant variations that potential clients might
 
 Respond with ONLY a comma-separated list of keywords, no numbering or extra text."""
 
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             new_keywords = [k.strip() for k in response.text.strip().split(',')]
             
             return [k for k in new_keywords if k and len(k) < 100][:count]
@@ -0,0 +1,123 @@
+"""
+Tweet archive and results files for XScout (JSON Lines, optionally gzipped)
+Features: Capture of fetched tweets + users, streaming constant-memory replay reader, results writer
+"""
+import gzip
+import json
+import threading
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional, Tuple
+
+import tweepy
+
+
+def _open(path: str, mode: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _timestamp(value: datetime) -> str:
+    """X API timestamp format, the only one tweepy parses back (e.g. 2026-01-02T03:04:05.000Z)"""
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def _raw(obj, fields) -> Optional[Dict]:
+    """The API payload behind a tweepy model, or the given fields for objects without one"""
+    if obj is None:
+        return None
+    data = getattr(obj, 'data', None)
+    if isinstance(data, dict):
+        return dict(data)
+    raw = {}
+    for field in fields:
+        value = getattr(obj, field, None)
+        if value is not None:
+            raw[field] = _timestamp(value) if isinstance(value, datetime) else value
+    return raw
+
+
+class JsonlWriter:
+    """Thread-safe JSON Lines appender; every record is flushed so a crash loses at most one line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = _open(path, 'a')
+        self.lock = threading.Lock()
+        self.written = 0
+
+    def write(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self.lock:
+            if self.file.closed:
+                return  # shutting down; a search thread may still be finishing a page
+            self.file.write(line + '\n')
+            self.file.flush()
+            self.written += 1
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+class ArchiveWriter(JsonlWriter):
+    """Appends fetched tweets, one per line: {"tweet": {...}, "users": [{...}], "captured_at": "..."}"""
+
+    def capture(self, tweet, author=None):
+        tweet_data = _raw(tweet, ('id', 'text', 'author_id', 'created_at', 'public_metrics'))
+        tweet_data['id'] = str(tweet_data['id'])
+        if tweet_data.get('author_id') is not None:
+            tweet_data['author_id'] = str(tweet_data['author_id'])
+        users = []
+        if author is not None:
+            user_data = _raw(author, ('id', 'username', 'name'))
+            user_data['id'] = str(user_data['id'])
+            users.append(user_data)
+        self.write({
+            'tweet': tweet_data,
+            'users': users,
+            'captured_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        })
+
+
+def _read_lines(path: str) -> Iterator[Tuple[int, str]]:
+    """Numbered lines of a file; a truncated or corrupt .gz (e.g. a capture killed mid-run) ends it early"""
+    line_number = 0
+    try:
+        with _open(path, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                yield line_number, line
+    except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+        print(f"[!] {path} is truncated or corrupt after line {line_number} ({e}), stopping there")
+
+
+def read_archive(path: str) -> Iterator[Tuple[tweepy.Tweet, Optional[tweepy.User]]]:
+    """
+    Yield (tweet, author) pairs from an archive one line at a time, so memory stays
+    constant however large the file is. Malformed lines are skipped with a warning.
+    """
+    skipped = 0
+    for line_number, line in _read_lines(path):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            tweet_data = record['tweet']
+            tweet_data.setdefault('edit_history_tweet_ids', [tweet_data['id']])
+            tweet = tweepy.Tweet(tweet_data)
+            author = None
+            for user_data in record.get('users') or []:
+                if tweet.author_id is None or int(user_data['id']) == tweet.author_id:
+                    user_data.setdefault('name', user_data.get('username', ''))
+                    author = tweepy.User(user_data)
+                    break
+        except (ValueError, KeyError, TypeError) as e:
+            skipped += 1
+            if skipped <= 5:
+                print(f"[!] Skipping malformed archive line {line_number}: {e}")
+            continue
+        yield tweet, author
+    if skipped:
+        print(f"[!] Skipped {skipped} malformed archive lines")
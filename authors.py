@@ -0,0 +1,173 @@
+"""
+Author index for XScout - what we know about each account
+Features: Last AI score, last contact and reply, reply count, block/allow flag,
+in-memory LRU in front of SQLite, per-author cooldowns checked before AI and write calls
+"""
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Optional
+
+from metrics import metrics
+from state_store import connect
+
+BLOCK = 'block'
+ALLOW = 'allow'
+
+
+class AuthorIndex:
+    """
+    One row per author_id. `skip_reason` answers, before any AI call, whether a
+    lead from this author is worth processing: blocked accounts, authors whose
+    last score was at most `low_score` within `score_ttl`, and authors contacted
+    within `cooldown` are skipped; allow-listed authors never are. Lookups go
+    through an LRU of `cache_size` rows.
+    """
+
+    def __init__(self, path: str, cache_size: int = 10000, cooldown: float = 72 * 3600,
+                 low_score: int = 2, score_ttl: float = 7 * 86400, claim_ttl: float = 600):
+        self.cooldown = cooldown
+        self.low_score = low_score
+        self.score_ttl = score_ttl
+        self.claim_ttl = claim_ttl
+        self.cache_size = cache_size
+        self.cache: OrderedDict = OrderedDict()  # author_id -> row dict, or None for unknown authors
+        self.claims: Dict[int, float] = {}  # author_id -> monotonic time a lead of theirs entered the pipeline
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+        self.conn = connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS authors ("
+            " author_id INTEGER PRIMARY KEY,"
+            " username TEXT,"
+            " last_score INTEGER,"
+            " scored_at REAL,"
+            " last_contact_at REAL,"
+            " last_reply_at REAL,"
+            " reply_count INTEGER NOT NULL DEFAULT 0,"
+            " flag TEXT,"
+            " updated_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS authors_username ON authors (username)")
+        self.conn.commit()
+
+    def get(self, author_id) -> Optional[Dict]:
+        author_id = int(author_id)
+        with self.lock:
+            if author_id in self.cache:
+                self.cache.move_to_end(author_id)
+                metrics.inc('xscout_author_cache_requests_total', result='hit')
+                return self.cache[author_id]
+            row = self.conn.execute("SELECT * FROM authors WHERE author_id = ?", (author_id,)).fetchone()
+            record = dict(row) if row else None
+            self._cache(author_id, record)
+        metrics.inc('xscout_author_cache_requests_total', result='miss')
+        return record
+
+    def _cache(self, author_id: int, record: Optional[Dict]):
+        self.cache[author_id] = record
+        self.cache.move_to_end(author_id)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def _update(self, author_id, username: Optional[str], **changes):
+        """Upsert the row and refresh the cached copy"""
+        author_id = int(author_id)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO authors (author_id, username, updated_at) VALUES (?, ?, ?)"
+                " ON CONFLICT(author_id) DO UPDATE SET username = COALESCE(excluded.username, username),"
+                " updated_at = excluded.updated_at",
+                (author_id, username, now)
+            )
+            if changes:
+                assignments = ', '.join(
+                    f"{column} = {column} + ?" if column == 'reply_count' else f"{column} = ?" for column in changes
+                )
+                self.conn.execute(f"UPDATE authors SET {assignments} WHERE author_id = ?",
+                                  (*changes.values(), author_id))
+            self.conn.commit()
+            row = self.conn.execute("SELECT * FROM authors WHERE author_id = ?", (author_id,)).fetchone()
+            self._cache(author_id, dict(row))
+
+    def skip_reason(self, author_id, check_history: bool = True) -> Optional[str]:
+        """
+        Why a new lead from this author should be dropped before any AI call, or None.
+        Without `check_history` (dry-run replays) only an explicit block counts.
+        """
+        record = self.get(author_id)
+        flag = record['flag'] if record else None
+        if flag == BLOCK:
+            return 'author_blocked'
+        if flag == ALLOW or not record or not check_history:
+            return None
+        now = time.time()
+        if record['last_contact_at'] and now - record['last_contact_at'] < self.cooldown:
+            return 'author_cooldown'
+        if (record['last_score'] is not None and record['last_score'] <= self.low_score
+                and record['scored_at'] and now - record['scored_at'] < self.score_ttl):
+            return 'author_low_score'
+        return None
+
+    def claim(self, author_id) -> bool:
+        """
+        Reserve an author while one of their leads is in the pipeline, so a second
+        tweet from them in the same batch isn't scored and contacted again.
+        Claims lapse after claim_ttl in case a lead never finishes.
+        """
+        author_id = int(author_id)
+        now = time.monotonic()
+        with self.lock:
+            claimed_at = self.claims.get(author_id)
+            if claimed_at is not None and now - claimed_at < self.claim_ttl:
+                return False
+            self.claims[author_id] = now
+            return True
+
+    def release(self, author_id):
+        with self.lock:
+            self.claims.pop(int(author_id), None)
+
+    def can_reply(self, author_id) -> bool:
+        """Write-time guard: no second reply to the same author within the cooldown"""
+        record = self.get(author_id)
+        if record and record['flag'] == BLOCK:
+            return False
+        if record and record['flag'] == ALLOW:
+            return True
+        return not (record and record['last_reply_at'] and time.time() - record['last_reply_at'] < self.cooldown)
+
+    def record_score(self, author_id, username: Optional[str], score: Optional[int]):
+        if score is not None:
+            self._update(author_id, username, last_score=int(score), scored_at=time.time())
+
+    def record_contact(self, author_id, username: Optional[str]):
+        self._update(author_id, username, last_contact_at=time.time())
+
+    def record_reply(self, author_id, username: Optional[str]):
+        now = time.time()
+        self._update(author_id, username, last_contact_at=now, last_reply_at=now, reply_count=1)
+
+    def set_flag(self, author_id, username: Optional[str], flag: Optional[str]):
+        """Block or allow-list an author (None clears the flag)"""
+        self._update(author_id, username, flag=flag)
+
+    def find_by_username(self, username: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT * FROM authors WHERE username = ? COLLATE NOCASE", (username.lstrip('@'),)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def count_skip(self, reason: str):
+        self.stats[reason] += 1
+
+    def report(self):
+        if self.stats:
+            print("[*] Author index: skipped " + ', '.join(
+                f"{count} {reason.replace('author_', '')}" for reason, count in self.stats.most_common()
+            ))
@@ -0,0 +1,705 @@
+"""
+Offline benchmark for XScout
+Features: Fake tweepy Client serving synthetic tweet pages, fake filtered-stream server,
+fake Gemini model with latency/error rate, local CallMeBot HTTP stub, end-to-end
+search_tweets throughput, per-lead latency, tweet-to-alert latency for --stream,
+API calls per lead, and duplicate side effects across parallel workers (with a
+Redis-protocol stand-in for COORDINATION_URL=redis://)
+
+Usage: python benchmark.py --sizes 10,1000,100000 [--gemini-latency 0.05] [--json results.json]
+       python benchmark.py --stream --sizes 200 [--stream-rate 50] [--stream-drop-every 50]
+       python benchmark.py --workers 3 --sizes 500 [--coordination sqlite|redis|none]
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import itertools
+import json
+import os
+import random
+import re
+import shutil
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import tweepy
+
+import xscout
+from ai_helper import AIHelper, ResponseCache
+from coordination import RELEASE_SCRIPT, RENEW_SCRIPT
+from query_planner import build_query
+
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+KEYWORDS = ["need a website", "looking for web developer", "hire web developer"]
+
+_BUSINESSES = ["bakery", "dental clinic", "law firm", "yoga studio", "food truck", "startup", "salon",
+               "real estate agency", "nonprofit", "coffee shop", "gym", "photography studio", "band", "podcast"]
+_FILLER = ("booking payments gallery blog shop mobile fast modern simple clean seo landing page menu "
+           "calendar newsletter login dashboard portal catalog reviews maps chat forms pricing team events "
+           "careers faq video donations members schedule invoices orders delivery loyalty coupons rentals "
+           "listings search filters analytics multilingual accessibility branding logo redesign migration").split()
+_PROMOS = ["I help small businesses launch websites, hire me: https://me.vercel.app",
+           "I build fast landing pages, check out my portfolio https://dev.netlify.app",
+           "Freelance web developer available, DM me for your project https://fiverr.com/dev"]
+
+
+def synthetic_texts(total: int, promo_rate: float = 0.1, repost_rate: float = 0.1, seed: int = 1):
+    """Mostly genuine leads, some self-promotion (pre-filter fodder) and some near-duplicate reposts"""
+    rng = random.Random(seed)
+    texts = []
+    for i in range(total):
+        roll = rng.random()
+        if roll < promo_rate:
+            texts.append(rng.choice(_PROMOS) + f" #{i}")
+        elif roll < promo_rate + repost_rate and texts:
+            texts.append(rng.choice(texts[-50:]) + " 🙏")
+        else:
+            business = rng.choice(_BUSINESSES)
+            details = ' '.join(rng.sample(_FILLER, 8))
+            texts.append(f"{rng.choice(KEYWORDS)} for my {business}: {details}. Budget ${rng.randint(3, 90)}00")
+    return texts
+
+
+class FakeTwitterClient:
+    """
+    Serves `total` synthetic tweets (see synthetic_texts) newest-first through
+    search_recent_tweets, with next_token pagination and since_id support.
+    """
+
+    def __init__(self, total: int, latency: float = 0.0, promo_rate: float = 0.1,
+                 repost_rate: float = 0.1, authors: int = 500, seed: int = 1):
+        self.total = total
+        self.latency = latency
+        self.authors = authors
+        self.calls = Counter()
+        self.replies = Counter()  # tweet id -> replies posted to it
+        self.fetched_at = {}
+        self.lock = threading.Lock()
+        self.texts = synthetic_texts(total, promo_rate, repost_rate, seed)
+
+    def _tweet_id(self, index: int) -> int:
+        return 10 ** 15 + self.total - index  # index 0 is the newest
+
+    def search_recent_tweets(self, query=None, max_results=10, since_id=None, next_token=None, **kwargs):
+        with self.lock:
+            self.calls['search_recent_tweets'] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        start = int(next_token) if next_token else 0
+        end = min(self.total, start + max_results)
+        tweets, users = [], {}
+        for index in range(start, end):
+            tweet_id = self._tweet_id(index)
+            if since_id and tweet_id <= int(since_id):
+                end = index
+                break
+            author_id = index % self.authors
+            tweets.append(SimpleNamespace(id=tweet_id, text=self.texts[index], author_id=author_id))
+            users[author_id] = SimpleNamespace(id=author_id, username=f"client{author_id}", name=f"Client {author_id}")
+
+        now = time.perf_counter()
+        with self.lock:
+            for tweet in tweets:
+                self.fetched_at[tweet.id] = now
+
+        meta = {'result_count': len(tweets)}
+        if tweets:
+            meta['newest_id'] = str(tweets[0].id)
+            meta['oldest_id'] = str(tweets[-1].id)
+        if end < self.total and len(tweets) == max_results:
+            meta['next_token'] = str(end)
+        return tweepy.Response(tweets or None, {'users': list(users.values())}, [], meta)
+
+    def like(self, tweet_id):
+        with self.lock:
+            self.calls['like'] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def create_tweet(self, text=None, in_reply_to_tweet_id=None, **kwargs):
+        with self.lock:
+            self.calls['create_tweet'] += 1
+            self.replies[in_reply_to_tweet_id] += 1
+            reply_id = self.calls['create_tweet']
+        if self.latency:
+            time.sleep(self.latency)
+        return SimpleNamespace(data={'id': str(reply_id)})
+
+    def get_me(self, **kwargs):
+        return SimpleNamespace(data=SimpleNamespace(username='benchmark'))
+
+
+class FakeStreamServer:
+    """
+    Local HTTP server standing in for X's filtered stream: the rules endpoints plus a
+    stream that emits `texts` at `rate` tweets/sec as newline-delimited JSON with
+    keep-alives. The first `fail_connections` connections get HTTP 503 and, with
+    `drop_every`, each connection is closed after that many tweets, so reconnects
+    get exercised. Point XScout at it with STREAM_API_BASE=<url>.
+    """
+
+    def __init__(self, texts, rate: float = 50.0, drop_every: int = 0, fail_connections: int = 0,
+                 authors: int = 500):
+        self.texts = texts
+        self.rules = {}
+        self.connections = 0
+        self.sent_at = {}  # tweet id -> perf_counter when emitted
+        self.done = threading.Event()
+        self.closing = False
+        self.next_index = 0
+        rule_ids = itertools.count(1000)
+        lock = threading.Lock()
+        server = self
+
+        def tweet_payload(index):
+            tweet_id = str(10 ** 15 + index)
+            author_id = str(index % authors)
+            created_at = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+            return {
+                'data': {'id': tweet_id, 'text': texts[index], 'author_id': author_id,
+                         'created_at': created_at, 'edit_history_tweet_ids': [tweet_id]},
+                'includes': {'users': [{'id': author_id, 'username': f"client{author_id}",
+                                        'name': f"Client {author_id}"}]},
+                'matching_rules': [{'id': rule['id'], 'tag': rule.get('tag')} for rule in server.rules.values()][:1],
+            }
+
+        class Handler(BaseHTTPRequestHandler):
+            # Chunked, like X's stream: each line reaches the client as soon as it is written
+            protocol_version = 'HTTP/1.1'
+
+            def reply(self, status, body):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                if path == '/2/tweets/search/stream/rules':
+                    rules = list(server.rules.values())
+                    self.reply(200, {'data': rules, 'meta': {'result_count': len(rules)}} if rules else
+                               {'meta': {'result_count': 0}})
+                elif path == '/2/tweets/search/stream':
+                    self.stream()
+                else:
+                    self.reply(404, {'title': 'Not Found'})
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                with lock:
+                    added = [dict(rule, id=str(next(rule_ids))) for rule in body.get('add', [])]
+                    for rule in added:
+                        server.rules[rule['id']] = rule
+                    deleted = [server.rules.pop(rule_id) for rule_id in body.get('delete', {}).get('ids', [])
+                               if rule_id in server.rules]
+                summary = {'created': len(added), 'not_created': 0} if 'add' in body else {'deleted': len(deleted)}
+                self.reply(201 if added else 200, dict({'data': added} if added else {}, meta={'summary': summary}))
+
+            def stream(self):
+                with lock:
+                    server.connections += 1
+                    failed = server.connections <= fail_connections
+                if failed:
+                    self.reply(503, {'title': 'Service Unavailable'})
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.close_connection = True
+                sent = 0
+                try:
+                    while not server.closing:
+                        with lock:
+                            index = server.next_index
+                            if index < len(texts):
+                                server.next_index += 1
+                        if index >= len(texts):
+                            server.done.set()
+                            self.send_chunk(b'\r\n')  # keep-alive
+                            time.sleep(0.2)
+                            continue
+                        payload = tweet_payload(index)
+                        self.send_chunk(json.dumps(payload).encode('utf-8') + b'\r\n')
+                        server.sent_at[int(payload['data']['id'])] = time.perf_counter()
+                        sent += 1
+                        if drop_every and sent >= drop_every:
+                            self.wfile.write(b'0\r\n\r\n')
+                            return
+                        if rate:
+                            time.sleep(1 / rate)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def send_chunk(self, data):
+                self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b'\r\n')
+                self.wfile.flush()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.closing = True
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeRedisServer:
+    """
+    Minimal RESP server standing in for Redis with just what RedisCoordinator uses:
+    PING, AUTH, SELECT, SET (NX, PX), GET, DEL, EXISTS, PEXPIRE and EVAL of the two
+    lease scripts. Keys expire like Redis's. Point XScout at it with COORDINATION_URL=<url>.
+    """
+
+    def __init__(self):
+        self.data = {}  # key -> (value, expires_at monotonic or None)
+        self.commands = Counter()
+        lock = threading.Lock()
+        server = self
+
+        def live(key):
+            entry = server.data.get(key)
+            if entry and entry[1] is not None and entry[1] <= time.monotonic():
+                del server.data[key]
+                return None
+            return entry
+
+        def execute(args):
+            name = args[0].upper()
+            server.commands[name] += 1
+            if name in ('PING', 'AUTH', 'SELECT'):
+                return 'PONG' if name == 'PING' else 'OK'
+            if name == 'SET':
+                key, value, options = args[1], args[2], [arg.upper() for arg in args[3:]]
+                if 'NX' in options and live(key):
+                    return None
+                ttl = int(args[3 + options.index('PX') + 1]) / 1000 if 'PX' in options else None
+                server.data[key] = (value, time.monotonic() + ttl if ttl else None)
+                return 'OK'
+            if name == 'GET':
+                entry = live(args[1])
+                return entry[0] if entry else None
+            if name in ('DEL', 'EXISTS'):
+                found = [key for key in args[1:] if live(key)]
+                if name == 'DEL':
+                    for key in found:
+                        del server.data[key]
+                return len(found)
+            if name == 'PEXPIRE':
+                entry = live(args[1])
+                if not entry:
+                    return 0
+                server.data[args[1]] = (entry[0], time.monotonic() + int(args[2]) / 1000)
+                return 1
+            if name == 'EVAL' and args[1] in (RENEW_SCRIPT, RELEASE_SCRIPT):
+                key, owner = args[3], args[4]
+                entry = live(key)
+                if not entry or entry[0] != owner:
+                    return 0
+                return execute(['PEXPIRE', key, args[5]] if args[1] == RENEW_SCRIPT else ['DEL', key])
+            return RuntimeError(f"ERR unknown command '{name}'")
+
+        def encode(reply):
+            if reply is None:
+                return b"$-1\r\n"
+            if isinstance(reply, Exception):
+                return f"-{reply}\r\n".encode()
+            if isinstance(reply, int):
+                return f":{reply}\r\n".encode()
+            data = reply.encode('utf-8')
+            return b"$%d\r\n%s\r\n" % (len(data), data)
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    line = self.rfile.readline()
+                    if not line.startswith(b'*'):
+                        return
+                    args = []
+                    for _ in range(int(line[1:])):
+                        length = int(self.rfile.readline()[1:])
+                        args.append(self.rfile.read(length + 2)[:-2].decode('utf-8'))
+                    with lock:
+                        reply = execute(args)
+                    self.wfile.write(encode(reply))
+
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"redis://127.0.0.1:{self.server.server_address[1]}/0"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeGeminiModel:
+    """Answers XScout's prompts with well-formed JSON after `latency` seconds; fails `error_rate` of calls"""
+
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0, seed: int = 1):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _verdict(text: str) -> dict:
+        score = int(hashlib.md5(text.encode('utf-8')).hexdigest(), 16) % 11
+        level = 3 if score >= 8 else 2 if score >= 5 else 1
+        return {"score": score, "reason": "synthetic", "urgency": {3: "high", 2: "medium", 1: "low"}[level],
+                "urgency_level": level, "reply": "Happy to help - see my portfolio!", "dm": "Hi! I'd love to build this."}
+
+    def generate_content(self, prompt: str):
+        with self.lock:
+            self.calls += 1
+            failed = self.rng.random() < self.error_rate
+            self.errors += failed
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            raise RuntimeError("503 fake Gemini overload")
+
+        if "JSON array" in prompt:
+            items = [dict(self._verdict(tweet), id=int(number))
+                     for number, tweet in re.findall(r'^(\d+)\. Author: @\S+ \| Tweet: (.*)$', prompt, re.M)]
+            text = json.dumps(items)
+        elif "JSON format" in prompt:
+            text = json.dumps(self._verdict(prompt))
+        else:
+            text = "Hi! I build websites like this - happy to help."
+        return SimpleNamespace(text=text)
+
+
+class CallMeBotStub:
+    """Local HTTP server standing in for api.callmebot.com"""
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int = 1):
+        self.requests = 0
+        self.received = []  # (perf_counter, message text) of delivered messages
+        rng = random.Random(seed)
+        lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with lock:
+                    stub.requests += 1
+                    failed = rng.random() < error_rate
+                if latency:
+                    time.sleep(latency)
+                if not failed:
+                    text = parse_qs(urlparse(self.path).query).get('text', [''])[0]
+                    with lock:
+                        stub.received.append((time.perf_counter(), text))
+                body = b"Error" if failed else b"Message queued"
+                self.send_response(503 if failed else 200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/whatsapp.php"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _configure(workdir: str, size: int, **overrides):
+    # Set after `import xscout` so the real .env (loaded at import) can't override the stand-ins
+    os.environ.update({
+        'KEYWORDS': ','.join(KEYWORDS),
+        'SEARCH_MAX_TWEETS': str(size),
+        'AUTO_REPLY': 'false',  # switched on after construction, so no credential check goes out
+        'AUTO_LIKE': 'true',
+        'PORTFOLIO_URL': 'https://example.com/portfolio',
+        'CALLMEBOT_PHONE': '+10000000000',
+        'CALLMEBOT_APIKEY': 'benchmark',
+        'CALLMEBOT_RETRIES': '1',
+        'NOTIFY_MODE': 'instant',
+        'ENABLE_AI_FEATURES': 'false',
+        'XSCOUT_STATE_DB': os.path.join(workdir, 'xscout_state.db'),
+        'SEEN_TWEETS_MAX': str(max(50000, size * 2)),
+        # Rate limits are what production waits on; the benchmark measures the pipeline itself
+        'CALLMEBOT_RPM': '1000000000',
+        'TWITTER_WRITE_RPM': '1000000000',
+        'TWITTER_WRITE_BURST': '1000000000',
+        'SCHEDULER_DRAIN_SECONDS': '3600',
+        'OUTBOX_RETRY_SECONDS': '0',
+        'METRICS_PORT': '0',
+        'METRICS_SUMMARY_FILE': '',
+        **overrides,
+    })
+
+
+def _make_bot(size: int, args, workdir: str, stub: CallMeBotStub):
+    """An XScout wired to the fake Twitter client, fake Gemini model and CallMeBot stub"""
+    bot = xscout.XScout()
+    bot.client = FakeTwitterClient(size, latency=args.twitter_latency, authors=args.authors)
+    for profile in bot.profiles:
+        profile.auto_reply = True
+        profile.notifier.url = stub.url
+        profile.notifier.backoff = 0.01
+
+    model = FakeGeminiModel(args.gemini_latency, args.gemini_error_rate)
+    if not args.no_ai:
+        cache = ResponseCache(os.path.join(workdir, 'xscout_ai_cache.db'))
+        bot.ai_helper = AIHelper('', cache=cache, batch_backoff=0.01)
+        bot.ai_helper.enabled = True
+        bot.ai_helper.model = model
+        bot.ai_enabled = True
+    return bot, model
+
+
+def run_benchmark(size: int, args) -> dict:
+    """Drive one search_tweets cycle over `size` synthetic tweets and return its numbers"""
+    workdir = tempfile.mkdtemp(prefix='xscout-bench-')
+    stub = CallMeBotStub(args.callmebot_latency, args.callmebot_error_rate)
+    _configure(workdir, size)
+
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        bot, model = _make_bot(size, args, workdir, stub)
+
+        # Per-lead latency: from the search page that returned the tweet to its last side effect
+        finished = {}
+        execute_action = bot.execute_action
+
+        def timed_execute_action(row):
+            execute_action(row)
+            finished[row['tweet_id']] = time.perf_counter()
+
+        bot.execute_action = timed_execute_action
+
+        started = time.perf_counter()
+        bot.search_tweets(time_window_minutes=15)
+        elapsed = time.perf_counter() - started
+    stub.close()
+
+    fetched_at = bot.client.fetched_at
+    latencies = [finished[tweet_id] - fetched_at[tweet_id] for tweet_id in finished if tweet_id in fetched_at]
+    leads = len(latencies)
+    calls = {
+        'twitter_search': bot.client.calls['search_recent_tweets'],
+        'twitter_like': bot.client.calls['like'],
+        'twitter_reply': bot.client.calls['create_tweet'],
+        'gemini': model.calls,
+        'callmebot': stub.requests,
+    }
+    outbox = bot.outbox.counts()
+    # Repeat authors are skipped before any AI call; they are not leads, so they don't dilute per-lead numbers
+    author_skips = dict(bot.authors.stats) if bot.authors is not None else {}
+    shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        'tweets': size,
+        'leads': leads,
+        'author_skips': author_skips,
+        'seconds': round(elapsed, 3),
+        'tweets_per_sec': round(size / elapsed, 1) if elapsed else None,
+        'lead_latency_p50_ms': round(1000 * percentile(latencies, 0.5), 1) if latencies else None,
+        'lead_latency_p99_ms': round(1000 * percentile(latencies, 0.99), 1) if latencies else None,
+        'api_calls': calls,
+        'api_calls_per_lead': {name: round(count / leads, 3) for name, count in calls.items()} if leads else {},
+        'gemini_errors': model.errors,
+        'outbox': outbox,
+        'log_lines': log.getvalue().count('\n'),
+    }
+
+
+def run_stream_benchmark(size: int, args) -> dict:
+    """Stream `size` synthetic tweets from the fake stream server and time each one to its WhatsApp alert"""
+    workdir = tempfile.mkdtemp(prefix='xscout-bench-')
+    stub = CallMeBotStub(args.callmebot_latency, args.callmebot_error_rate)
+    server = FakeStreamServer(synthetic_texts(size), rate=args.stream_rate, drop_every=args.stream_drop_every,
+                              authors=args.authors)
+    _configure(workdir, size, STREAM_API_BASE=server.url, STREAM_BACKOFF_SECONDS='0.1',
+               TWITTER_BEARER_TOKEN='benchmark')
+
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        bot, model = _make_bot(0, args, workdir, stub)
+        runner = threading.Thread(target=bot.stream)
+        started = time.perf_counter()
+        runner.start()
+        server.done.wait()
+        # Let the last AI batch fill and its alerts go out before stopping
+        time.sleep(bot.stream_batch_seconds + 1)
+        bot.lead_stream.stop()
+        runner.join()
+        elapsed = time.perf_counter() - started
+    server.close()
+    stub.close()
+
+    latencies = []
+    for received_at, text in stub.received:
+        match = re.search(r'/status/(\d+)', text)
+        if match and int(match.group(1)) in server.sent_at:
+            latencies.append(received_at - server.sent_at[int(match.group(1))])
+    shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        'tweets': size,
+        'alerts': len(latencies),
+        'seconds': round(elapsed, 3),
+        'connections': server.connections,
+        'alert_latency_p50_ms': round(1000 * percentile(latencies, 0.5), 1) if latencies else None,
+        'alert_latency_p99_ms': round(1000 * percentile(latencies, 0.99), 1) if latencies else None,
+        'gemini_calls': model.calls,
+        'log_lines': log.getvalue().count('\n'),
+    }
+
+
+def run_workers_benchmark(size: int, args) -> dict:
+    """
+    Run `args.workers` bots at once over the same `size` synthetic tweets, one query
+    shard per keyword, and count side effects that happened more than once. With
+    --coordination sqlite they share one state DB (one machine); with redis or none
+    each has its own, like workers on separate machines.
+    """
+    workdir = tempfile.mkdtemp(prefix='xscout-bench-')
+    stub = CallMeBotStub(args.callmebot_latency, args.callmebot_error_rate)
+    redis = FakeRedisServer() if args.coordination == 'redis' else None
+    # Just long enough for the longest single keyword, so every keyword gets its own shard
+    query_length = max(len(build_query([keyword], xscout.QUERY_SUFFIX)) for keyword in KEYWORDS)
+    client = FakeTwitterClient(size, latency=args.twitter_latency, authors=args.authors)
+
+    log = io.StringIO()
+    bots, models = [], []
+    with contextlib.redirect_stdout(log):
+        for worker in range(args.workers):
+            worker_dir = workdir if args.coordination == 'sqlite' else os.path.join(workdir, str(worker))
+            os.makedirs(worker_dir, exist_ok=True)
+            coordination_url = {'sqlite': '', 'redis': redis.url if redis else '', 'none': 'none'}[args.coordination]
+            _configure(worker_dir, size, SEARCH_QUERY_MAX_LENGTH=str(query_length), COORDINATION_URL=coordination_url)
+            bot, model = _make_bot(size, args, worker_dir, stub)
+            bot.client = client
+            bots.append(bot)
+            models.append(model)
+
+        threads = [threading.Thread(target=bot.run_once) for bot in bots]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    stub.close()
+    if redis:
+        redis.close()
+
+    alerts = Counter()
+    for _, text in stub.received:
+        match = re.search(r'/status/(\d+)', text)
+        if match:
+            alerts[match.group(1)] += 1
+    shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        'tweets': size,
+        'workers': args.workers,
+        'coordination': args.coordination,
+        'seconds': round(elapsed, 3),
+        'tweets_per_sec': round(size / elapsed, 1) if elapsed else None,
+        'replied_tweets': len(client.replies),
+        'duplicate_replies': sum(count - 1 for count in client.replies.values()),
+        'alerted_tweets': len(alerts),
+        'duplicate_alerts': sum(count - 1 for count in alerts.values()),
+        'gemini_calls': sum(model.calls for model in models),
+        'log_lines': log.getvalue().count('\n'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='XScout offline benchmark')
+    parser.add_argument('--sizes', default='10,1000,100000',
+                        help='Comma-separated tweet counts to run (default: 10,1000,100000)')
+    parser.add_argument('--twitter-latency', type=float, default=0.0, help='Seconds per fake Twitter API call')
+    parser.add_argument('--gemini-latency', type=float, default=0.05, help='Seconds per fake Gemini call')
+    parser.add_argument('--gemini-error-rate', type=float, default=0.0, help='Fraction of Gemini calls that fail')
+    parser.add_argument('--callmebot-latency', type=float, default=0.0, help='Seconds per CallMeBot request')
+    parser.add_argument('--callmebot-error-rate', type=float, default=0.0, help='Fraction of CallMeBot requests that fail')
+    parser.add_argument('--no-ai', action='store_true', help='Run without AI scoring')
+    parser.add_argument('--authors', type=int, default=500,
+                        help='Distinct authors in the synthetic tweets. The author index skips repeat authors '
+                             '(AUTHOR_COOLDOWN_HOURS), so at most this many tweets per run become leads')
+    parser.add_argument('--stream', action='store_true',
+                        help='Benchmark --stream mode against a fake filtered-stream server instead of search')
+    parser.add_argument('--stream-rate', type=float, default=50.0, help='Tweets per second the fake stream emits')
+    parser.add_argument('--stream-drop-every', type=int, default=0,
+                        help='Close the stream connection after this many tweets to exercise reconnects')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Run this many bots at once over the same tweets and count duplicate side effects')
+    parser.add_argument('--coordination', choices=('sqlite', 'redis', 'none'), default='sqlite',
+                        help='With --workers: shared SQLite state, separate state + Redis stand-in, or no coordination')
+    parser.add_argument('--json', help='Also write results to this file')
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(',') if s.strip()):
+        mode = f" ({args.workers} workers)" if args.workers else ' (stream)' if args.stream else ''
+        print(f"[*] Benchmarking {size} tweets{mode}...")
+        if args.workers:
+            result = run_workers_benchmark(size, args)
+            results.append(result)
+            print(f"[+] {args.workers} workers ({args.coordination}) handled {size} tweets in {result['seconds']}s: "
+                  f"{result['tweets_per_sec']} tweets/sec")
+            print(f"    Replies: {result['replied_tweets']} tweets, {result['duplicate_replies']} duplicates | "
+                  f"WhatsApp alerts: {result['alerted_tweets']} tweets, {result['duplicate_alerts']} duplicates | "
+                  f"Gemini calls: {result['gemini_calls']}")
+            continue
+        if args.stream:
+            result = run_stream_benchmark(size, args)
+            results.append(result)
+            print(f"[+] {size} tweets streamed in {result['seconds']}s over {result['connections']} connections, "
+                  f"{result['alerts']} WhatsApp alerts")
+            print(f"    Tweet-to-alert latency: p50 {result['alert_latency_p50_ms']} ms, "
+                  f"p99 {result['alert_latency_p99_ms']} ms")
+            continue
+        result = run_benchmark(size, args)
+        results.append(result)
+        per_lead = ', '.join(f"{name} {value}" for name, value in result['api_calls_per_lead'].items())
+        skipped = sum(result['author_skips'].values())
+        print(f"[+] {size} tweets in {result['seconds']}s: {result['tweets_per_sec']} tweets/sec, "
+              f"{result['leads']} leads" + (f" ({skipped} skipped by the author index)" if skipped else ""))
+        print(f"    Per-lead latency: p50 {result['lead_latency_p50_ms']} ms, p99 {result['lead_latency_p99_ms']} ms")
+        print(f"    API calls per lead: {per_lead}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"[*] Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+"""
+Local lead classifier for XScout
+Features: Log of Gemini lead scores, hashed word n-gram linear model trained from that log,
+confidence band so only uncertain tweets go to Gemini, evaluation report against the LLM
+"""
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from text_match import normalize_text
+from metrics import metrics
+from state_store import connect
+
+DEFAULT_DIMS = 1 << 18
+URGENCY_NAMES = {1: 'low', 2: 'medium', 3: 'high'}
+
+
+def featurize(text: str, dims: int = DEFAULT_DIMS) -> Dict[int, float]:
+    """Hashed word unigrams and bigrams of the normalized text, scaled to unit length"""
+    words = normalize_text(text).split()
+    grams = [f"w:{word}" for word in words] + [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    features: Dict[int, float] = {}
+    for gram in grams:
+        h = zlib.crc32(gram.encode('utf-8'))
+        index = h % dims
+        features[index] = features.get(index, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+    norm = math.sqrt(sum(value * value for value in features.values())) or 1.0
+    return {index: value / norm for index, value in features.items() if value}
+
+
+def _sigmoid(x: float) -> float:
+    if x < -30:
+        return 0.0
+    if x > 30:
+        return 1.0
+    return 1 / (1 + math.exp(-x))
+
+
+class ScoreLog:
+    """
+    Every score Gemini returns, keyed by normalized text (reposts count once),
+    plus the latest trained model. Lives in the AI cache database by default.
+    """
+
+    def __init__(self, path: str, max_rows: int = 50000):
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+        self.conn = connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS score_log ("
+            " key TEXT PRIMARY KEY,"
+            " text TEXT NOT NULL,"
+            " score INTEGER NOT NULL,"
+            " urgency_level INTEGER NOT NULL,"
+            " logged_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS classifier_model ("
+            " id INTEGER PRIMARY KEY CHECK (id = 1),"
+            " model TEXT NOT NULL,"
+            " trained_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def record(self, text: str, result: Dict):
+        if not text or not result or result.get('score') is None:
+            return
+        key = hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO score_log (key, text, score, urgency_level, logged_at) VALUES (?, ?, ?, ?, ?)",
+                (key, text, int(result['score']), int(result.get('urgency_level', 2)), time.time())
+            )
+            overflow = self.conn.execute("SELECT COUNT(*) FROM score_log").fetchone()[0] - self.max_rows
+            if overflow > 0:
+                self.conn.execute(
+                    "DELETE FROM score_log WHERE key IN (SELECT key FROM score_log ORDER BY logged_at LIMIT ?)",
+                    (overflow,)
+                )
+            self.conn.commit()
+
+    def examples(self) -> List[Tuple[str, int, int]]:
+        """(text, score, urgency_level) for every logged score, oldest first"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT text, score, urgency_level FROM score_log ORDER BY logged_at"
+            ).fetchall()
+
+    def save_model(self, model: 'LeadClassifier'):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO classifier_model (id, model, trained_at) VALUES (1, ?, ?)",
+                (json.dumps(model.to_dict()), time.time())
+            )
+            self.conn.commit()
+
+    def load_model(self, low: float = 0.2, high: float = 0.8) -> Optional['LeadClassifier']:
+        with self.lock:
+            row = self.conn.execute("SELECT model FROM classifier_model WHERE id = 1").fetchone()
+        return LeadClassifier.from_dict(json.loads(row[0]), low=low, high=high) if row else None
+
+
+class LeadClassifier:
+    """
+    Linear model over featurize() with three heads: probability that Gemini would
+    score the tweet at least `lead_score`, the score itself, and the urgency level.
+    decide() only answers when the probability falls outside the (low, high) band;
+    everything in between is left for Gemini.
+    """
+
+    HEADS = ('lead', 'score', 'urgency')
+
+    def __init__(self, weights: Dict[str, Dict[int, float]], bias: Dict[str, float],
+                 lead_score: int = 7, dims: int = DEFAULT_DIMS, low: float = 0.2, high: float = 0.8,
+                 examples: int = 0):
+        self.weights = weights
+        self.bias = bias
+        self.lead_score = lead_score
+        self.dims = dims
+        self.low = low
+        self.high = high
+        self.examples = examples
+        self.stats = Counter()
+
+    def predict(self, text: str) -> Dict:
+        """Local estimate for a tweet, in score_lead's format plus 'probability'"""
+        features = featurize(text, self.dims)
+        raw = {
+            head: self.bias[head] + sum(self.weights[head].get(i, 0.0) * v for i, v in features.items())
+            for head in self.HEADS
+        }
+        probability = _sigmoid(raw['lead'])
+        score = max(0, min(10, round(raw['score'] * 10)))
+        # Keep the score on the same side of the lead line as the decision
+        if probability >= 0.5:
+            score = max(score, self.lead_score)
+        else:
+            score = min(score, self.lead_score - 1)
+        urgency_level = max(1, min(3, round(1 + raw['urgency'] * 2)))
+        return {
+            "score": score,
+            "reason": f"Local model: {probability:.0%} likely a client lead",
+            "urgency": URGENCY_NAMES[urgency_level],
+            "urgency_level": urgency_level,
+            "probability": probability,
+        }
+
+    def decide(self, text: str) -> Optional[Dict]:
+        """The local result when the model is confident, otherwise None (ask Gemini)"""
+        result = self.predict(text)
+        if result['probability'] <= self.low:
+            decision = 'not_lead'
+        elif result['probability'] >= self.high:
+            decision = 'lead'
+        else:
+            decision = 'escalated'
+        self.stats[decision] += 1
+        metrics.inc('xscout_local_classifier_total', decision=decision)
+        return None if decision == 'escalated' else result
+
+    def report(self):
+        total = sum(self.stats.values())
+        if total:
+            local = total - self.stats['escalated']
+            print(f"[*] Local classifier: {local}/{total} tweets scored locally "
+                  f"({self.stats['lead']} leads, {self.stats['not_lead']} non-leads), "
+                  f"{self.stats['escalated']} sent to Gemini")
+
+    @classmethod
+    def train(cls, examples: List[Tuple[str, int, int]], lead_score: int = 7, dims: int = DEFAULT_DIMS,
+              epochs: int = 6, learning_rate: float = 0.5, seed: int = 0) -> 'LeadClassifier':
+        """Plain SGD: logistic loss for the lead head, squared loss for score and urgency"""
+        rows = [
+            (featurize(text, dims), {
+                'lead': 1.0 if score >= lead_score else 0.0,
+                'score': score / 10,
+                'urgency': (urgency_level - 1) / 2,
+            })
+            for text, score, urgency_level in examples
+        ]
+        weights = {head: [0.0] * dims for head in cls.HEADS}
+        bias = {head: 0.0 for head in cls.HEADS}
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(rows)
+            rate = learning_rate / (1 + epoch)
+            for features, targets in rows:
+                for head in cls.HEADS:
+                    w = weights[head]
+                    raw = bias[head] + sum(w[i] * v for i, v in features.items())
+                    prediction = _sigmoid(raw) if head == 'lead' else raw
+                    step = rate * (targets[head] - prediction)
+                    bias[head] += step
+                    for i, v in features.items():
+                        w[i] += step * v
+        sparse = {head: {i: w for i, w in enumerate(weights[head]) if abs(w) > 1e-6} for head in cls.HEADS}
+        return cls(sparse, bias, lead_score=lead_score, dims=dims, examples=len(examples))
+
+    def to_dict(self) -> Dict:
+        return {
+            'dims': self.dims,
+            'lead_score': self.lead_score,
+            'examples': self.examples,
+            'bias': self.bias,
+            'weights': {head: {str(i): round(w, 6) for i, w in ws.items()} for head, ws in self.weights.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, low: float = 0.2, high: float = 0.8) -> 'LeadClassifier':
+        weights = {head: {int(i): w for i, w in ws.items()} for head, ws in data['weights'].items()}
+        return cls(weights, data['bias'], lead_score=data['lead_score'], dims=data['dims'],
+                   low=low, high=high, examples=data.get('examples', 0))
+
+
+def evaluate(model: LeadClassifier, examples: List[Tuple[str, int, int]]) -> Dict:
+    """How well the model agrees with Gemini's scores on `examples`"""
+    counts = Counter()
+    score_error = 0
+    for text, score, urgency_level in examples:
+        result = model.predict(text)
+        is_lead = score >= model.lead_score
+        counts['total'] += 1
+        counts['leads'] += is_lead
+        counts['agree'] += (result['probability'] >= 0.5) == is_lead
+        score_error += abs(result['score'] - score)
+        counts['urgency_agree'] += result['urgency_level'] == urgency_level
+        if model.low < result['probability'] < model.high:
+            continue
+        counts['local'] += 1
+        counts['local_agree'] += (result['probability'] >= model.high) == is_lead
+        counts['local_leads'] += result['probability'] >= model.high
+        counts['missed_leads'] += is_lead and result['probability'] <= model.low
+    total = counts['total'] or 1
+    return {
+        'examples': counts['total'],
+        'lead_rate': counts['leads'] / total,
+        'coverage': counts['local'] / total,
+        'local_agreement': counts['local_agree'] / counts['local'] if counts['local'] else None,
+        'missed_leads': counts['missed_leads'],
+        'agreement': counts['agree'] / total,
+        'score_mae': score_error / total,
+        'urgency_agreement': counts['urgency_agree'] / total,
+    }
+
+
+def train_from_log(log: ScoreLog, lead_score: int = 7, low: float = 0.2, high: float = 0.8,
+                   min_examples: int = 200, holdout: int = 5) -> Optional[LeadClassifier]:
+    """
+    Train on every logged score: first on all but a held-out 1/`holdout` of
+    tweets to report agreement with Gemini, then on everything. Saves and
+    returns the model, or None when the log is still too small.
+    """
+    examples = log.examples()
+    if len(examples) < min_examples:
+        print(f"[!] Only {len(examples)} Gemini scores logged, need {min_examples} to train the local classifier")
+        return None
+
+    def held_out(text: str) -> bool:
+        return zlib.crc32(normalize_text(text).encode('utf-8')) % holdout == 0
+
+    train = [example for example in examples if not held_out(example[0])]
+    test = [example for example in examples if held_out(example[0])]
+    print(f"[*] Training local classifier on {len(train)} logged Gemini scores ({len(test)} held out)...")
+    model = LeadClassifier.train(train, lead_score=lead_score)
+    model.low, model.high = low, high
+    if test:
+        report = evaluate(model, test)
+        local_agreement = report['local_agreement']
+        print(f"[*] Held-out evaluation (lead = score >= {lead_score}, Gemini band {low:.2f}-{high:.2f}):")
+        print(f"    Leads in held-out set: {report['lead_rate']:.0%} of {report['examples']}")
+        print(f"    Scored locally: {report['coverage']:.0%} (the rest would go to Gemini)")
+        print(f"    Agreement with Gemini on local decisions: "
+              f"{'n/a' if local_agreement is None else f'{local_agreement:.1%}'}"
+              f" ({report['missed_leads']} Gemini leads dropped as non-leads)")
+        print(f"    Agreement on all held-out tweets: {report['agreement']:.1%}")
+        print(f"    Score mean absolute error: {report['score_mae']:.2f} | urgency match: {report['urgency_agreement']:.0%}")
+
+    model = LeadClassifier.train(examples, lead_score=lead_score)
+    model.low, model.high = low, high
+    log.save_model(model)
+    print(f"[+] Local classifier trained on {len(examples)} examples and saved")
+    return model
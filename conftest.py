@@ -0,0 +1,50 @@
+"""
+Shared pytest fixtures: an XScout wired to a throwaway state DB, with no
+credentials, metrics endpoint or AI, so nothing leaves the machine
+"""
+from types import SimpleNamespace
+
+import pytest
+
+BOT_ENV = {
+    'KEYWORDS': 'need a website,looking for web developer',
+    'AUTO_REPLY': 'false',  # switched on after construction, so no credential check goes out
+    'AUTO_LIKE': 'true',
+    'PORTFOLIO_URL': 'https://example.com/portfolio',
+    'CALLMEBOT_PHONE': '+10000000000',
+    'CALLMEBOT_APIKEY': 'test',
+    'ENABLE_AI_FEATURES': 'false',
+    'COORDINATION_URL': '',
+    'CAPTURE_ARCHIVE': '',
+    'METRICS_PORT': '0',
+    'METRICS_SUMMARY_FILE': '',
+    'OUTBOX_RETRY_SECONDS': '0',
+}
+
+
+def make_tweet(tweet_id, text='need a website for my bakery', author_id=1, username='client1'):
+    """A (tweet, author) pair shaped like the ones tweepy returns"""
+    return (SimpleNamespace(id=tweet_id, text=text, author_id=author_id, created_at=None),
+            SimpleNamespace(id=author_id, username=username, name=username))
+
+
+@pytest.fixture
+def make_bot(tmp_path, monkeypatch):
+    """make_bot(**env) -> XScout with BOT_ENV plus `env`, replying when AUTO_REPLY isn't overridden"""
+    import xscout
+    bots = []
+
+    def make(auto_reply=True, **env):
+        monkeypatch.setenv('XSCOUT_STATE_DB', str(tmp_path / 'xscout_state.db'))
+        for name, value in dict(BOT_ENV, **env).items():
+            monkeypatch.setenv(name, value)
+        bot = xscout.XScout()
+        for profile in bot.profiles:
+            profile.auto_reply = auto_reply
+        bots.append(bot)
+        return bot
+
+    yield make
+    for bot in bots:
+        for pool in bot.stage_pools.values():
+            pool.shutdown(wait=True)
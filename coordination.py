@@ -0,0 +1,233 @@
+"""
+Coordination between XScout workers
+Features: Named leases with expiry (leader lease for search, claim tokens for tweets and
+outbox actions), SQLite backend for workers sharing a disk, Redis-protocol backend for
+workers on different machines
+"""
+import os
+import socket
+import ssl
+import threading
+import time
+import uuid
+from typing import List, Optional
+from urllib.parse import unquote, urlparse
+
+from metrics import metrics
+from state_store import connect
+
+# Lua for Redis: only the lease's owner may extend or drop it
+RENEW_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) else return 0 end"
+RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+
+
+class Coordinator:
+    """
+    Leases by name. acquire() takes a lease that is free, expired or already ours
+    (extending it); release() gives back one we hold. A backend error counts as
+    "not acquired", so a worker that can't coordinate holds back rather than
+    risk doing the same work as another.
+    """
+
+    def __init__(self, owner: Optional[str] = None):
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def acquire(self, name: str, ttl: float) -> bool:
+        kind = name.split(':', 1)[0]
+        try:
+            with metrics.timer('coordination.acquire'):
+                acquired = self._acquire(name, ttl)
+        except Exception as e:
+            print(f"[!] Coordination backend error, not taking {name}: {e}")
+            return False
+        metrics.inc('xscout_coordination_total', kind=kind, result='acquired' if acquired else 'busy')
+        return acquired
+
+    def release(self, name: str):
+        try:
+            with metrics.timer('coordination.release'):
+                self._release(name)
+        except Exception as e:
+            print(f"[!] Coordination backend error releasing {name}: {e}")
+
+    def held(self, name: str) -> bool:
+        """Whether anyone holds the lease now (errors answer yes, the cautious side)"""
+        try:
+            return self._held(name)
+        except Exception as e:
+            print(f"[!] Coordination backend error checking {name}: {e}")
+            return True
+
+    def _acquire(self, name: str, ttl: float) -> bool:
+        raise NotImplementedError
+
+    def _release(self, name: str):
+        raise NotImplementedError
+
+    def _held(self, name: str) -> bool:
+        raise NotImplementedError
+
+
+class SQLiteCoordinator(Coordinator):
+    """Leases in a SQLite table, for workers on one machine or a shared volume"""
+
+    def __init__(self, path: str, owner: Optional[str] = None, cleanup_interval: float = 3600):
+        super().__init__(owner)
+        self.path = path
+        self.cleanup_interval = cleanup_interval
+        self.lock = threading.Lock()
+        self.conn = connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            " name TEXT PRIMARY KEY,"
+            " owner TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+        self.cleaned_at = 0.0
+        self._cleanup()
+
+    def _cleanup(self):
+        now = time.time()
+        if now - self.cleaned_at >= self.cleanup_interval:
+            with self.lock:
+                self.conn.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+                self.conn.commit()
+            self.cleaned_at = now
+
+    def _acquire(self, name: str, ttl: float) -> bool:
+        self._cleanup()
+        now = time.time()
+        with self.lock:
+            acquired = self.conn.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?)"
+                " ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at"
+                " WHERE leases.owner = excluded.owner OR leases.expires_at <= ?",
+                (name, self.owner, now + ttl, now)
+            ).rowcount
+            self.conn.commit()
+        return bool(acquired)
+
+    def _release(self, name: str):
+        with self.lock:
+            self.conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, self.owner))
+            self.conn.commit()
+
+    def _held(self, name: str) -> bool:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM leases WHERE name = ? AND expires_at > ?", (name, time.time())
+            ).fetchone()
+        return row is not None
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisCoordinator(Coordinator):
+    """
+    Leases as Redis keys with a PX expiry, for workers on different machines.
+    Speaks RESP over a plain socket (no client library needed), so it works with
+    Redis, Valkey, KeyDB or any server implementing SET NX PX, EVAL, DEL and EXISTS.
+    """
+
+    def __init__(self, url: str, owner: Optional[str] = None, prefix: str = 'xscout:', timeout: float = 5):
+        super().__init__(owner)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.db = int(parsed.path.strip('/') or 0)
+        self.tls = parsed.scheme == 'rediss'
+        self.prefix = prefix
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.sock = None
+        self.reader = None
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        if self.tls:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self.host)
+        self.sock, self.reader = sock, sock.makefile('rb')
+        if self.password:
+            self._send(['AUTH', self.username, self.password] if self.username else ['AUTH', self.password])
+        if self.db:
+            self._send(['SELECT', str(self.db)])
+
+    def _close(self):
+        if self.sock:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = self.reader = None
+
+    def _send(self, args: List):
+        encoded = [arg if isinstance(arg, bytes) else str(arg).encode('utf-8') for arg in args]
+        message = b''.join([f"*{len(encoded)}\r\n".encode()] +
+                           [b"$%d\r\n%s\r\n" % (len(arg), arg) for arg in encoded])
+        self.sock.sendall(message)
+        return self._read()
+
+    def _read(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode()
+        if kind == b'-':
+            raise RedisError(rest.decode())
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2].decode('utf-8')
+        if kind == b'*':
+            length = int(rest)
+            return None if length < 0 else [self._read() for _ in range(length)]
+        raise RedisError(f"unexpected reply {line[:50]!r}")
+
+    def command(self, *args):
+        """Send one command, reconnecting once if the connection has gone away"""
+        with self.lock:
+            for attempt in range(2):
+                try:
+                    if self.sock is None:
+                        self._connect()
+                    return self._send(list(args))
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt:
+                        raise
+
+    def _acquire(self, name: str, ttl: float) -> bool:
+        key, ms = self.prefix + name, max(1, int(ttl * 1000))
+        if self.command('SET', key, self.owner, 'NX', 'PX', ms) == 'OK':
+            return True
+        return bool(self.command('EVAL', RENEW_SCRIPT, 1, key, self.owner, ms))
+
+    def _release(self, name: str):
+        self.command('EVAL', RELEASE_SCRIPT, 1, self.prefix + name, self.owner)
+
+    def _held(self, name: str) -> bool:
+        return bool(self.command('EXISTS', self.prefix + name))
+
+
+def open_coordinator(url: str, default_path: str) -> Optional[Coordinator]:
+    """
+    COORDINATION_URL: empty for SQLite leases in `default_path` (the state DB),
+    a redis:// or rediss:// URL, a path to another SQLite file, or 'none'
+    """
+    url = (url or '').strip()
+    if url.lower() == 'none':
+        return None
+    if url.startswith(('redis://', 'rediss://')):
+        return RedisCoordinator(url)
+    return SQLiteCoordinator(url or default_path)
@@ -0,0 +1,140 @@
+"""
+Near-duplicate tweet detection for XScout
+Collapses reposts and lightly edited copies (spam rings) to one representative
+using 64-bit SimHash fingerprints over a rolling time window
+"""
+import re
+import time
+import hashlib
+from collections import deque
+from typing import Dict, List, Optional
+
+from text_match import normalize_text
+
+_URL = re.compile(r"https?://\S+", re.IGNORECASE)
+_MENTION = re.compile(r"(?<!\w)@\w+")
+
+MIN_TOKENS = 4
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    64-bit SimHash over word bigrams. URLs and @mentions are dropped first so
+    copies that only differ in links or tagged accounts fingerprint the same.
+    Returns None for texts too short to fingerprint reliably.
+    """
+    tokens = normalize_text(_MENTION.sub(' ', _URL.sub(' ', text))).split()
+    if len(tokens) < MIN_TOKENS:
+        return None
+
+    weights = [0] * 64
+    for shingle in zip(tokens, tokens[1:]):
+        digest = hashlib.blake2b(' '.join(shingle).encode('utf-8'), digest_size=8).digest()
+        value = int.from_bytes(digest, 'big')
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class NearDuplicateDetector:
+    def __init__(self, window_seconds: float = 86400, max_distance: int = 3, store=None,
+                 max_entries: Optional[int] = None):
+        """
+        Fingerprints within `max_distance` differing bits of one seen in the last
+        `window_seconds` are near-duplicates. Lookups use the pigeonhole trick: split
+        the 64 bits into max_distance + 1 bands, and any match within the distance
+        must agree exactly on at least one band.
+        `store` (a StateStore) loads and saves the window.
+        `max_entries` also caps the window by count (oldest dropped first), which keeps
+        memory bounded when replaying a large archive.
+        """
+        self.window = window_seconds
+        self.max_distance = max_distance
+        self.store = store
+        self.max_entries = max_entries
+
+        bands = max_distance + 1
+        width = 64 // bands
+        self.bands = [(i * width, 64 if i == bands - 1 else (i + 1) * width) for i in range(bands)]
+
+        self.entries = deque()  # (seen_at, tweet_id, fingerprint, cluster_id)
+        self.ids: Dict[int, tuple] = {}  # tweet id -> its entry, so a re-fetched tweet never matches itself
+        self.index: List[Dict[int, List[tuple]]] = [{} for _ in self.bands]
+        self.clusters: Dict[int, List[int]] = {}  # representative id -> member ids, for clusters collapsed this run
+
+        if store is not None:
+            for seen_at, tweet_id, fingerprint, cluster_id in store.load_fingerprints(time.time() - self.window):
+                self._insert((seen_at, tweet_id, fingerprint, cluster_id))
+
+    def _band_values(self, fingerprint: int):
+        for i, (start, end) in enumerate(self.bands):
+            yield i, (fingerprint >> start) & ((1 << (end - start)) - 1)
+
+    def _insert(self, entry: tuple):
+        self.entries.append(entry)
+        self.ids[entry[1]] = entry
+        for i, value in self._band_values(entry[2]):
+            self.index[i].setdefault(value, []).append(entry)
+
+    def _expire(self, now: float):
+        cutoff = now - self.window
+        while self.entries and (self.entries[0][0] < cutoff or
+                                (self.max_entries and len(self.entries) >= self.max_entries)):
+            entry = self.entries.popleft()
+            if self.ids.get(entry[1]) is entry:
+                del self.ids[entry[1]]
+            for i, value in self._band_values(entry[2]):
+                bucket = self.index[i].get(value)
+                if bucket:
+                    bucket.remove(entry)
+                    if not bucket:
+                        del self.index[i][value]
+
+    def check(self, tweet_id: int, text: str) -> Optional[int]:
+        """
+        Register a tweet. Returns the representative tweet id of its cluster if it
+        is a near-duplicate of an earlier tweet, else None (it becomes a representative).
+        A tweet already registered (re-fetched after an interrupted run) is not a duplicate.
+        """
+        now = time.time()
+        self._expire(now)
+        tweet_id = int(tweet_id)
+        if tweet_id in self.ids:
+            return None
+
+        fingerprint = simhash(text)
+        if fingerprint is None:
+            return None
+
+        representative = None
+        for i, value in self._band_values(fingerprint):
+            for entry in self.index[i].get(value, ()):
+                if entry[1] != tweet_id and bin(entry[2] ^ fingerprint).count('1') <= self.max_distance:
+                    representative = entry[3]
+                    break
+            if representative is not None:
+                break
+
+        cluster_id = representative if representative is not None else tweet_id
+        entry = (now, tweet_id, fingerprint, cluster_id)
+        self._insert(entry)
+        if self.store is not None:
+            self.store.save_fingerprint(*entry)
+
+        if representative is not None:
+            self.clusters.setdefault(cluster_id, [cluster_id]).append(tweet_id)
+        return representative
+
+    def report(self):
+        collapsed = {rep: members for rep, members in self.clusters.items() if len(members) > 1}
+        if not collapsed:
+            return
+        dropped = sum(len(members) - 1 for members in collapsed.values())
+        print(f"[*] Near-duplicates: {dropped} tweets collapsed into {len(collapsed)} clusters")
+        for rep, members in sorted(collapsed.items(), key=lambda item: -len(item[1])):
+            print(f"    {rep}: {len(members)} tweets ({', '.join(str(m) for m in members[:5])}{'...' if len(members) > 5 else ''})")
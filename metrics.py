@@ -0,0 +1,271 @@
+"""
+Metrics for XScout
+Features: Per-stage latency histograms, call/error counters, gauges,
+Prometheus text endpoint (continuous mode) and JSON summary (single runs)
+"""
+import bisect
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Seconds; covers cache hits (ms) through slow Gemini calls and rate-limit waits
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, max_samples: int = 4096):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=max_samples)  # recent values, for summary quantiles
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _label_key(labels: Dict[str, str]) -> tuple:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Metrics:
+    """Thread-safe registry of counters, gauges and histograms, keyed by name + labels"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[tuple, float]] = {}
+        self.gauges: Dict[str, Dict[tuple, float]] = {}
+        self.histograms: Dict[str, Dict[tuple, Histogram]] = {}
+        self.help: Dict[str, str] = {}
+        self.collectors = []
+        self.started = time.time()
+
+    def describe(self, name: str, text: str):
+        self.help[name] = text
+
+    def inc(self, name: str, value: float = 1, **labels):
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self.lock:
+            self.gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels):
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            key = _label_key(labels)
+            if key not in series:
+                series[key] = Histogram(buckets)
+            series[key].observe(value)
+
+    def add_collector(self, collect: Callable[[], Iterable[Tuple[str, Dict, float]]]):
+        """Register a callback returning (gauge name, labels, value) tuples, read at export time"""
+        self.collectors.append(collect)
+
+    def error(self, stage: str):
+        """Count a failed call that did not raise (e.g. an HTTP error status)"""
+        self.inc('xscout_stage_errors_total', stage=stage)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Time a block as one call of `stage`; an exception escaping it counts as an error"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.error(stage)
+            raise
+        finally:
+            self.observe('xscout_stage_seconds', time.perf_counter() - start, stage=stage)
+            self.inc('xscout_stage_calls_total', stage=stage)
+
+    def timed(self, stage: str):
+        """Decorator form of timer()"""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def _collect(self) -> Dict[str, Dict[tuple, float]]:
+        with self.lock:
+            gauges = {name: dict(series) for name, series in self.gauges.items()}
+        for collect in self.collectors:
+            try:
+                for name, labels, value in collect():
+                    gauges.setdefault(name, {})[_label_key(labels)] = value
+            except Exception as e:
+                print(f"[!] Metrics collector failed: {e}")
+        return gauges
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        gauges = self._collect()
+        lines = []
+
+        def header(name, kind):
+            if name in self.help:
+                lines.append(f"# HELP {name} {self.help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            for name in sorted(self.counters):
+                header(name, 'counter')
+                for key, value in sorted(self.counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self.histograms):
+                header(name, 'histogram')
+                for key, hist in sorted(self.histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(self.bucket_labels(hist), hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, (('le', bound),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        for name in sorted(gauges):
+            header(name, 'gauge')
+            for key, value in sorted(gauges[name].items()):
+                lines.append(f"{name}{_format_labels(key)} {value:g}")
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def bucket_labels(hist: Histogram):
+        return [f"{bound:g}" for bound in hist.buckets] + ['+Inf']
+
+    def summary(self) -> Dict:
+        """JSON-friendly snapshot: per-stage latency/calls/errors, AI cache hit rates, counters, gauges"""
+        gauges = self._collect()
+        with self.lock:
+            stages = {}
+            for key, hist in self.histograms.get('xscout_stage_seconds', {}).items():
+                stage = dict(key)['stage']
+                calls = self.counters.get('xscout_stage_calls_total', {}).get(key, 0)
+                errors = self.counters.get('xscout_stage_errors_total', {}).get(key, 0)
+                stages[stage] = {
+                    'calls': int(calls),
+                    'errors': int(errors),
+                    'total_seconds': round(hist.sum, 3),
+                    'mean_ms': round(1000 * hist.sum / hist.count, 1) if hist.count else None,
+                    'p50_ms': round(1000 * hist.quantile(0.5), 1),
+                    'p99_ms': round(1000 * hist.quantile(0.99), 1),
+                    'max_ms': round(1000 * hist.max, 1),
+                }
+
+            ai_cache = {}
+            for key, value in self.counters.get('xscout_ai_cache_requests_total', {}).items():
+                labels = dict(key)
+                entry = ai_cache.setdefault(labels['kind'], {'hits': 0, 'misses': 0})
+                entry['hits' if labels['result'] == 'hit' else 'misses'] += int(value)
+            for entry in ai_cache.values():
+                entry['hit_rate'] = round(entry['hits'] / (entry['hits'] + entry['misses']), 3)
+
+            def flatten(series):
+                return {
+                    name: {','.join(f'{k}={v}' for k, v in key) or 'total': value for key, value in values.items()}
+                    for name, values in series.items()
+                }
+
+            histograms = {
+                name: {
+                    ','.join(f'{k}={v}' for k, v in key) or 'total': {
+                        'count': hist.count, 'sum': round(hist.sum, 3), 'max': hist.max,
+                        'p50': hist.quantile(0.5), 'p99': hist.quantile(0.99),
+                    }
+                    for key, hist in values.items()
+                }
+                for name, values in self.histograms.items() if name != 'xscout_stage_seconds'
+            }
+            counters = flatten({
+                name: values for name, values in self.counters.items()
+                if name not in ('xscout_stage_calls_total', 'xscout_stage_errors_total', 'xscout_ai_cache_requests_total')
+            })
+
+        return {
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'uptime_seconds': round(time.time() - self.started, 3),
+            'stages': dict(sorted(stages.items())),
+            'ai_cache': ai_cache,
+            'counters': counters,
+            'histograms': histograms,
+            'gauges': flatten(gauges),
+        }
+
+    def write_summary(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+        print(f"[*] Metrics summary written to {path}")
+
+    def serve(self, port: int, host: str = '0.0.0.0') -> ThreadingHTTPServer:
+        """Expose render() at http://host:port/metrics from a daemon thread"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name='xscout-metrics', daemon=True).start()
+        print(f"[+] Prometheus metrics at http://{host}:{server.server_port}/metrics")
+        return server
+
+
+# Process-wide registry shared by every module
+metrics = Metrics()
+timed = metrics.timed
+
+metrics.describe('xscout_stage_seconds', 'Latency of each instrumented stage or API call')
+metrics.describe('xscout_stage_calls_total', 'Calls per stage or API')
+metrics.describe('xscout_stage_errors_total', 'Calls per stage or API that failed')
+metrics.describe('xscout_ai_cache_requests_total', 'AI response cache lookups by kind and hit/miss')
+metrics.describe('xscout_ai_batch_failures_total', 'Batched AI requests that failed after retries, by kind')
+metrics.describe('xscout_tweets_total', 'Tweets seen by search, by outcome')
+metrics.describe('xscout_leads_per_cycle', 'Leads handed to the pipeline per search cycle')
+metrics.describe('xscout_search_quota_remaining', 'Recent-search requests left in the current rate-limit window')
+metrics.describe('xscout_poll_interval_seconds', 'Current wait between polls in continuous mode')
+metrics.describe('xscout_stream_lag_seconds', 'Delay between a streamed tweet being posted and reaching XScout')
+metrics.describe('xscout_author_cache_requests_total', 'Author index lookups by hit/miss in the in-memory LRU')
+metrics.describe('xscout_local_classifier_total', 'Lead scoring decisions by the local classifier: lead, not_lead, or escalated to Gemini')
+metrics.describe('xscout_pipeline_drops_total', 'Leads stopped at each pipeline stage: screen (local checks), notify, outreach (no AI reply/DM), reply')
+metrics.describe('xscout_coordination_total', 'Lease and claim attempts shared with other workers, by kind (search, tweet, action) and result')
+metrics.describe('xscout_stream_reconnects_total', 'Filtered-stream reconnections')
+metrics.describe('xscout_startup_seconds', 'Cold-start cost by phase (imports, init, auth, first_search since process start)')
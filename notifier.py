@@ -0,0 +1,114 @@
+"""
+WhatsApp notifications for XScout via CallMeBot
+Features: Pooled keep-alive session, timeouts, retries with backoff + jitter, digest mode
+"""
+import random
+import time
+from typing import List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import metrics
+
+CALLMEBOT_URL = "https://api.callmebot.com/whatsapp.php"
+
+# Status codes worth retrying; anything else is treated as a permanent failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class WhatsAppNotifier:
+    def __init__(self, phone: str, apikey: str, timeout: float = 10, retries: int = 3,
+                 backoff: float = 1.0, max_message_chars: int = 1500, rate_limiter=None,
+                 url: str = CALLMEBOT_URL, pool_size: int = 4):
+        self.phone = phone
+        self.apikey = apikey
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_message_chars = max_message_chars
+        self.rate_limiter = rate_limiter
+        self.url = url
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.sent = 0
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.phone and self.apikey)
+
+    def send(self, message: str, wait_for_token: bool = False) -> bool:
+        """
+        Send one message, retrying timeouts, connection errors, 429 and 5xx responses
+        with exponential backoff and full jitter. Returns True on success.
+        wait_for_token takes a rate_limiter token per attempt (callers that were
+        already dispatched by the scheduler have spent theirs).
+        """
+        params = {'phone': self.phone, 'text': message, 'apikey': self.apikey}
+
+        for attempt in range(self.retries + 1):
+            if self.rate_limiter and (wait_for_token or attempt):
+                self.rate_limiter.acquire()
+            try:
+                with metrics.timer('callmebot.send'):
+                    response = self.session.get(self.url, params=params, timeout=self.timeout)
+                if response.status_code == 200:
+                    self.sent += 1
+                    return True
+                metrics.error('callmebot.send')
+                if response.status_code not in RETRY_STATUSES:
+                    print(f"[X] Failed to send WhatsApp notification: {response.text[:200]}")
+                    return False
+                error = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = str(e)
+
+            if attempt < self.retries:
+                delay = random.uniform(0, self.backoff * 2 ** attempt)
+                print(f"[!] WhatsApp send failed ({error}), retrying in {delay:.1f}s...")
+                time.sleep(delay)
+            else:
+                print(f"[X] WhatsApp send failed after {self.retries + 1} attempts: {error}")
+        return False
+
+    # ---- digest mode ----
+
+    def send_digest(self, blocks: List[str]) -> bool:
+        """
+        Send lead blocks (already ordered most urgent first) as size-bounded digest
+        messages. Returns True only if every part was delivered.
+        """
+        messages = self.build_digest(blocks)
+        sent = 0
+        for message in messages:
+            if self.send(message, wait_for_token=True):
+                sent += 1
+        print(f"[+] WhatsApp digest: {len(blocks)} leads in {len(messages)} messages ({sent} delivered)")
+        return sent == len(messages)
+
+    def build_digest(self, blocks: List[str]) -> List[str]:
+        """Pack lead blocks into as few messages as fit max_message_chars"""
+        header = f"🔔 XScout digest: {len(blocks)} new lead{'s' if len(blocks) != 1 else ''}\n\n"
+        separator = "\n────────\n"
+        limit = self.max_message_chars - 10  # room for the "(i/n) " part prefix
+        messages, current = [], header
+        for block in blocks:
+            block = block.strip()
+            if len(block) > limit - len(header):
+                block = block[:limit - len(header) - 3] + "..."
+            candidate = current + (separator if current != header else '') + block
+            if len(candidate) > limit and current != header:
+                messages.append(current)
+                current = header + block
+            else:
+                current = candidate
+        if current != header:
+            messages.append(current)
+
+        if len(messages) > 1:
+            messages = [f"({i}/{len(messages)}) {message}" for i, message in enumerate(messages, 1)]
+        return messages
@@ -0,0 +1,215 @@
+"""
+Durable outbox for XScout side effects (WhatsApp notifications, likes, replies)
+Features: SQLite WAL journal, idempotency key per tweet + action, retries with backoff, crash recovery
+"""
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from state_store import connect
+
+# Safe to re-run if a crash left the outcome unknown (liking twice is a no-op,
+# a duplicate WhatsApp message is harmless). Replies are not: a reply that was
+# mid-flight during a crash is parked as 'unknown' instead of being retried.
+IDEMPOTENT_ACTIONS = {'like', 'notify'}
+
+
+class OutcomeUnknown(Exception):
+    """Raised by a handler when a non-idempotent action may or may not have happened"""
+
+
+class Outbox:
+    def __init__(self, path: str, max_attempts: int = 5, retry_backoff: float = 60, keep_days: float = 7):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lock = threading.Lock()
+
+        self.conn = connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " key TEXT PRIMARY KEY,"
+            " action TEXT NOT NULL,"
+            " tweet_id INTEGER NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " urgency_level INTEGER,"
+            " score INTEGER,"
+            " depends_on TEXT,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " last_error TEXT,"
+            " created_at REAL NOT NULL,"
+            " next_attempt_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS outbox_status ON outbox (status, next_attempt_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS outbox_tweet ON outbox (tweet_id)")
+        self.conn.execute(
+            "DELETE FROM outbox WHERE status IN ('done', 'failed', 'unknown') AND updated_at < ?",
+            (time.time() - keep_days * 86400,)
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key(action: str, tweet_id, scope: Optional[str] = None) -> str:
+        """Idempotency key; `scope` separates the same action done once per profile"""
+        return f"{action}:{scope}:{tweet_id}" if scope else f"{action}:{tweet_id}"
+
+    def enqueue(self, action: str, tweet_id, payload: Dict, urgency_level: Optional[int] = None,
+                score: Optional[int] = None, depends_on: Optional[str] = None, scope: Optional[str] = None) -> bool:
+        """Record an action. Returns False if this action already exists for the tweet (and scope)."""
+        now = time.time()
+        with self.lock:
+            inserted = self.conn.execute(
+                "INSERT OR IGNORE INTO outbox (key, action, tweet_id, payload, urgency_level, score,"
+                " depends_on, created_at, next_attempt_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.key(action, tweet_id, scope), action, int(tweet_id), json.dumps(payload),
+                 urgency_level, score, depends_on, now, now, now)
+            ).rowcount
+            self.conn.commit()
+        return bool(inserted)
+
+    def recover(self, active: Optional[Callable[[str], bool]] = None) -> int:
+        """
+        Reset actions left 'in_flight' by a crashed or killed run. Idempotent ones go
+        back to pending; the rest are parked as 'unknown'. When other workers share
+        this outbox, `active(key)` tells which in-flight actions are still running
+        somewhere and must be left alone. Returns rows touched.
+        """
+        now = time.time()
+        with self.lock:
+            rows = self.conn.execute("SELECT key, action FROM outbox WHERE status = 'in_flight'").fetchall()
+        orphaned = [row for row in rows if not (active and active(row['key']))]
+        retried = parked = 0
+        with self.lock:
+            for row in orphaned:
+                if row['action'] in IDEMPOTENT_ACTIONS:
+                    retried += self.conn.execute(
+                        "UPDATE outbox SET status = 'pending', updated_at = ? WHERE key = ? AND status = 'in_flight'",
+                        (now, row['key'])
+                    ).rowcount
+                else:
+                    parked += self._park(row['key'], 'interrupted mid-flight', now)
+            self.conn.commit()
+        if parked:
+            print(f"[!] Outbox: {parked} actions were interrupted mid-flight and will not be retried (status 'unknown')")
+        return retried + parked
+
+    def ready(self, actions: Optional[Iterable[str]] = None, exclude: Iterable[str] = (), limit: int = 100,
+              tweet_id=None) -> List[sqlite3.Row]:
+        """
+        Pending actions due now whose dependency (if any) has completed or given up,
+        most urgent and highest score first. `tweet_id` narrows it to one tweet's actions.
+        """
+        # Without ANALYZE stats SQLite prefers the status index, which scans every pending row
+        query = (
+            f"SELECT o.* FROM outbox o {'INDEXED BY outbox_tweet ' if tweet_id is not None else ''}"
+            "LEFT JOIN outbox d ON d.key = o.depends_on"
+            " WHERE o.status = 'pending' AND o.next_attempt_at <= ?"
+            " AND (o.depends_on IS NULL OR d.key IS NULL OR d.status IN ('done', 'failed', 'unknown'))"
+        )
+        params: list = [time.time()]
+        if tweet_id is not None:
+            query += " AND o.tweet_id = ?"
+            params.append(int(tweet_id))
+        if actions is not None:
+            actions = list(actions)
+            query += f" AND o.action IN ({','.join('?' for _ in actions)})"
+            params += actions
+        query += " ORDER BY COALESCE(o.urgency_level, 2) DESC, COALESCE(o.score, 5) DESC, o.created_at LIMIT ?"
+        excluded = set(exclude)
+        params.append(limit + len(excluded))
+
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [row for row in rows if row['key'] not in excluded][:limit]
+
+    def start(self, key: str) -> bool:
+        """
+        Mark a pending action as executing; a crash from here on leaves it 'in_flight'
+        for recover(). Returns False if it is no longer pending (another worker
+        sharing this outbox got to it first).
+        """
+        now = time.time()
+        with self.lock:
+            started = self.conn.execute(
+                "UPDATE outbox SET status = 'in_flight', attempts = attempts + 1, updated_at = ?"
+                " WHERE key = ? AND status = 'pending'",
+                (now, key)
+            ).rowcount
+            self.conn.commit()
+        return bool(started)
+
+    def complete(self, key: str):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE outbox SET status = 'done', last_error = NULL, updated_at = ? WHERE key = ?",
+                (time.time(), key)
+            )
+            self.conn.commit()
+
+    def fail(self, key: str, error: str, retry: bool = True):
+        """Record a failure; retried with exponential backoff until max_attempts, then 'failed'"""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT attempts FROM outbox WHERE key = ?", (key,)).fetchone()
+            attempts = row['attempts'] if row else self.max_attempts
+            if retry and attempts < self.max_attempts:
+                delay = self.retry_backoff * 2 ** (attempts - 1)
+                self.conn.execute(
+                    "UPDATE outbox SET status = 'pending', last_error = ?, next_attempt_at = ?, updated_at = ? WHERE key = ?",
+                    (error[:500], now + delay, now, key)
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE outbox SET status = 'failed', last_error = ?, updated_at = ? WHERE key = ?",
+                    (error[:500], now, key)
+                )
+            self.conn.commit()
+
+    def defer(self, key: str, until: float, error: str):
+        """
+        Put an in-flight action back to pending until `until` (epoch seconds) without
+        spending an attempt: the service turned it away (rate limit), nothing was done
+        """
+        with self.lock:
+            self.conn.execute(
+                "UPDATE outbox SET status = 'pending', attempts = MAX(attempts - 1, 0), last_error = ?,"
+                " next_attempt_at = ?, updated_at = ? WHERE key = ? AND status = 'in_flight'",
+                (error[:500], until, time.time(), key)
+            )
+            self.conn.commit()
+
+    def park(self, key: str, error: str):
+        """Give up on an action whose outcome is unknown, without retrying it"""
+        with self.lock:
+            self._park(key, error, time.time())
+            self.conn.commit()
+
+    def _park(self, key: str, error: str, now: float) -> int:
+        return self.conn.execute(
+            "UPDATE outbox SET status = 'unknown', last_error = ?, updated_at = ?"
+            " WHERE key = ? AND status = 'in_flight'",
+            (error[:500], now, key)
+        ).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def oldest_pending(self, action: str) -> Optional[float]:
+        """created_at of the oldest pending action of this type, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT MIN(created_at) FROM outbox WHERE status = 'pending' AND action = ?", (action,)
+            ).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def payload(row) -> Dict:
+        return json.loads(row['payload'])
@@ -0,0 +1,105 @@
+"""
+Adaptive polling for XScout's continuous mode
+Features: Search quota tracking from X rate-limit headers, poll interval that follows lead yield and quota headroom
+"""
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+SEARCH_ROUTE = '/2/tweets/search/recent'
+
+
+def rate_limit_reset(response) -> Optional[float]:
+    """Epoch seconds when the x-rate-limit-reset header says this endpoint's window resets, or None"""
+    try:
+        return float(getattr(response, 'headers', {}).get('x-rate-limit-reset', 0)) or None
+    except (TypeError, ValueError):
+        return None
+
+
+class SearchQuota:
+    """
+    Tracks how much of the recent-search rate limit is left. Reads X's
+    x-rate-limit-* headers when responses carry them (register `on_response` as a
+    requests hook on the tweepy Client's session); otherwise counts our own
+    requests against `limit` per `window_seconds`.
+    """
+
+    def __init__(self, limit: int = 60, window_seconds: float = 900):
+        self.limit = limit
+        self.window = window_seconds
+        self.requests = deque()  # monotonic timestamps of recent search requests
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None  # epoch seconds
+        self.lock = threading.Lock()
+
+    def on_response(self, response, *args, **kwargs):
+        if SEARCH_ROUTE not in getattr(response, 'url', ''):
+            return
+        self.record_request()
+        headers = response.headers
+        try:
+            if 'x-rate-limit-remaining' in headers:
+                with self.lock:
+                    self.remaining = int(headers['x-rate-limit-remaining'])
+                    self.reset_at = rate_limit_reset(response)
+                    self.limit = int(headers.get('x-rate-limit-limit', self.limit))
+        except ValueError:
+            pass
+
+    def record_request(self):
+        with self.lock:
+            self.requests.append(time.monotonic())
+
+    def status(self) -> Tuple[int, float]:
+        """(requests remaining, seconds until the window resets)"""
+        now = time.monotonic()
+        with self.lock:
+            while self.requests and now - self.requests[0] > self.window:
+                self.requests.popleft()
+            if self.remaining is not None and self.reset_at and self.reset_at > time.time():
+                return self.remaining, self.reset_at - time.time()
+            remaining = max(0, self.limit - len(self.requests))
+            reset_in = self.window - (now - self.requests[0]) if self.requests else 0.0
+            return remaining, reset_in
+
+
+class AdaptivePoller:
+    """
+    Picks the sleep before the next poll: shorter while polls keep finding leads,
+    longer while they come back empty, and never so short that the expected search
+    requests would run out before the rate-limit window resets.
+    """
+
+    def __init__(self, base_interval: float, min_interval: float = 60, max_interval: float = 1800,
+                 speedup: float = 0.5, backoff: float = 1.5):
+        self.min_interval = min(min_interval, base_interval)
+        self.max_interval = max(max_interval, base_interval)
+        self.interval = base_interval
+        self.speedup = speedup
+        self.backoff = backoff
+        self.requests_per_poll = None  # moving average of search requests per poll
+
+    def next_interval(self, leads: int, requests_used: int, remaining: int, reset_in: float) -> Tuple[float, str]:
+        """Returns (seconds to sleep, short reason)"""
+        if leads:
+            self.interval = max(self.min_interval, self.interval * self.speedup)
+            reason = f"{leads} new leads, polling faster"
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+            reason = "no new leads, backing off"
+
+        if self.requests_per_poll is None:
+            self.requests_per_poll = max(1, requests_used)
+        else:
+            self.requests_per_poll = 0.7 * self.requests_per_poll + 0.3 * max(1, requests_used)
+
+        # Spread what's left of the quota over the rest of its window
+        if reset_in > 0:
+            polls_left = remaining / self.requests_per_poll
+            floor = reset_in / polls_left if polls_left >= 1 else reset_in
+            if floor > self.interval:
+                reason = f"{remaining} search requests left for {reset_in:.0f}s, slowing down"
+                return floor, reason
+        return self.interval, reason
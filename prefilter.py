@@ -0,0 +1,145 @@
+"""
+Rule-based pre-filter for XScout - runs before any AI call
+Rejects obvious self-promoters, bots and link spam locally
+
+Rule files (PREFILTER_DENY_RULES / PREFILTER_ALLOW_RULES) hold one rule per line:
+    rule-name: some phrase      whole-word phrase match on normalized tweet text
+    rule-name: /regex/          case-insensitive regex on the raw tweet text
+Blank lines and lines starting with # are ignored. A tweet matching any allow
+rule skips the deny phrase/regex rules (the structural spam checks still apply).
+"""
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from text_match import KeywordMatcher
+
+# Only phrases a client wouldn't write. Anything a client might say too ("dm me for
+# details", "our services page", "book a call") is left for the AI to judge, since
+# a rejected tweet is never scored and counts as seen for good.
+DEFAULT_DENY_RULES = [
+    # Developers and agencies advertising themselves
+    ("self-promo", "i build websites"),
+    ("self-promo", "we build websites"),
+    ("self-promo", "i help businesses"),
+    ("self-promo", "i help brands"),
+    ("self-promo", "hire me"),
+    ("self-promo", "i'm a developer"),
+    ("self-promo", "i am a developer"),
+    ("self-promo", "i'm a web developer"),
+    ("self-promo", "i'm a freelance"),
+    ("self-promo", "available for hire"),
+    ("self-promo", "open for work"),
+    ("self-promo", "open to work"),
+    ("self-promo", "taking new clients"),
+    ("self-promo", "accepting new clients"),
+    ("portfolio", "link in bio"),
+    ("portfolio", r"/\b(fiverr\.com|upwork\.com/freelancers|behance\.net|dribbble\.com)\//"),
+    # Engagement bait and bots
+    ("bot", "follow back"),
+    ("bot", "retweet to win"),
+    ("bot", "airdrop"),
+    ("bot", "#100daysofcode"),
+]
+
+# Structural limits for link/hashtag/mention spam
+MAX_LINKS = 2
+MAX_HASHTAGS = 5
+MAX_MENTIONS = 4
+
+_LINK = re.compile(r"https?://\S+", re.IGNORECASE)
+_HASHTAG = re.compile(r"(?<!\w)#\w+")
+_MENTION = re.compile(r"(?<!\w)@\w+")
+
+
+def load_rules(path: str) -> List[Tuple[str, str]]:
+    """Read `name: pattern` rules from a file"""
+    rules = []
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            name, sep, pattern = line.partition(':')
+            if not sep or not pattern.strip():
+                print(f"[!] {path}:{line_number}: expected 'rule-name: pattern', skipping")
+                continue
+            rules.append((name.strip(), pattern.strip()))
+    return rules
+
+
+class _RuleSet:
+    """Phrase rules matched in one pass (Aho-Corasick) plus compiled regex rules"""
+
+    def __init__(self, rules: List[Tuple[str, str]]):
+        self.phrase_rules: Dict[str, str] = {}
+        self.regex_rules: List[Tuple[str, re.Pattern]] = []
+        for name, pattern in rules:
+            if len(pattern) > 2 and pattern.startswith('/') and pattern.endswith('/'):
+                self.regex_rules.append((name, re.compile(pattern[1:-1], re.IGNORECASE)))
+            else:
+                self.phrase_rules.setdefault(pattern, name)
+        self.matcher = KeywordMatcher(self.phrase_rules)
+
+    def match(self, text: str) -> Optional[str]:
+        """Name of the first rule matching `text`, or None"""
+        phrases = self.matcher.find(text)
+        if phrases:
+            return self.phrase_rules[phrases[0]]
+        for name, regex in self.regex_rules:
+            if regex.search(text):
+                return name
+        return None
+
+    def __len__(self) -> int:
+        return len(self.phrase_rules) + len(self.regex_rules)
+
+
+class PreFilter:
+    def __init__(self, deny_rules_path: str = '', allow_rules_path: str = ''):
+        deny_rules = list(DEFAULT_DENY_RULES)
+        allow_rules = []
+        if deny_rules_path:
+            deny_rules += load_rules(deny_rules_path)
+        if allow_rules_path:
+            allow_rules += load_rules(allow_rules_path)
+
+        self.deny = _RuleSet(deny_rules)
+        self.allow = _RuleSet(allow_rules)
+        self.hits = Counter()
+        self.checked = 0
+
+    def check(self, tweet_text: str) -> Optional[str]:
+        """
+        Return the name of the rule that rejects this tweet, or None if it passes.
+        Every decision is counted in `hits` ("allow:<rule>" for allow-rule passes).
+        """
+        self.checked += 1
+
+        rejected_by = self._structural(tweet_text)
+        if not rejected_by:
+            allowed_by = self.allow.match(tweet_text)
+            if allowed_by:
+                self.hits[f"allow:{allowed_by}"] += 1
+                return None
+            rejected_by = self.deny.match(tweet_text)
+
+        if rejected_by:
+            self.hits[rejected_by] += 1
+        return rejected_by
+
+    @staticmethod
+    def _structural(tweet_text: str) -> Optional[str]:
+        if len(_LINK.findall(tweet_text)) > MAX_LINKS:
+            return "link-spam"
+        if len(_HASHTAG.findall(tweet_text)) > MAX_HASHTAGS:
+            return "hashtag-spam"
+        if len(_MENTION.findall(tweet_text)) > MAX_MENTIONS:
+            return "mention-spam"
+        return None
+
+    def report(self):
+        rejected = sum(count for rule, count in self.hits.items() if not rule.startswith('allow:'))
+        print(f"[*] Pre-filter: {rejected}/{self.checked} tweets rejected locally")
+        for rule, count in self.hits.most_common():
+            print(f"    {rule}: {count}")
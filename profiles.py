@@ -0,0 +1,108 @@
+"""
+Lead profiles for XScout
+Features: Per-niche keywords, portfolio, WhatsApp target and reply settings from one .env,
+single-pass routing of a tweet to every profile whose keywords it matches
+"""
+import os
+import re
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from text_match import KeywordMatcher, normalize_text
+
+DEFAULT_PROFILE = 'default'
+
+
+def _flag(value: Optional[str], default: bool) -> bool:
+    return default if value is None else value.lower() == 'true'
+
+
+class Profile:
+    """One niche: what to look for, and how to notify and reply when it matches"""
+
+    def __init__(self, name: str, keywords: List[str], portfolio_url: str = '',
+                 callmebot_phone: Optional[str] = None, callmebot_apikey: Optional[str] = None,
+                 auto_reply: bool = True, auto_like: bool = True):
+        self.name = name
+        self.keywords = keywords
+        self.portfolio_url = portfolio_url
+        self.callmebot_phone = callmebot_phone
+        self.callmebot_apikey = callmebot_apikey
+        self.auto_reply = auto_reply
+        self.auto_like = auto_like
+        self.notifier = None  # WhatsAppNotifier, attached by XScout
+
+    @property
+    def notify_configured(self) -> bool:
+        return bool(self.callmebot_phone and self.callmebot_apikey)
+
+    @property
+    def replies(self) -> bool:
+        return bool(self.auto_reply and self.portfolio_url)
+
+    def __repr__(self) -> str:
+        return f"Profile({self.name}, {len(self.keywords)} keywords)"
+
+
+def load_profiles(env: Optional[Mapping[str, str]] = None) -> List[Profile]:
+    """
+    Profiles named in PROFILES (comma-separated), each configured with
+    PROFILE_<NAME>_<SETTING> for KEYWORDS, PORTFOLIO_URL, CALLMEBOT_PHONE,
+    CALLMEBOT_APIKEY, AUTO_REPLY and AUTO_LIKE. Settings a profile leaves out
+    fall back to the plain variables. Without PROFILES there is a single
+    'default' profile built from the plain variables.
+    """
+    env = os.environ if env is None else env
+    names = [name.strip() for name in env.get('PROFILES', '').split(',') if name.strip()] or [DEFAULT_PROFILE]
+
+    profiles = []
+    for name in names:
+        prefix = '' if name == DEFAULT_PROFILE else f"PROFILE_{re.sub(r'[^A-Z0-9]', '_', name.upper())}_"
+
+        def setting(key, default=None):
+            value = env.get(prefix + key) if prefix else None
+            return value if value is not None else env.get(key, default)
+
+        keywords = [k.strip() for k in (setting('KEYWORDS') or '').split(',') if k.strip()]
+        if not keywords:
+            print(f"[!] Profile '{name}' has no keywords, skipping")
+            continue
+        profiles.append(Profile(
+            name,
+            keywords,
+            portfolio_url=setting('PORTFOLIO_URL', ''),
+            callmebot_phone=setting('CALLMEBOT_PHONE'),
+            callmebot_apikey=setting('CALLMEBOT_APIKEY'),
+            auto_reply=_flag(setting('AUTO_REPLY'), True),
+            auto_like=_flag(setting('AUTO_LIKE'), True),
+        ))
+    return profiles or [Profile(DEFAULT_PROFILE, [])]
+
+
+class ProfileRouter:
+    """
+    One keyword index over every profile, so searching and matching cost the
+    same however many profiles share a keyword. route() scans a tweet's text
+    once and returns each matching profile with the keywords it matched.
+    """
+
+    def __init__(self, profiles: List[Profile]):
+        self.profiles = profiles
+        self.keywords: List[str] = []
+        self._owners: Dict[str, List[Profile]] = {}
+        for profile in profiles:
+            for keyword in profile.keywords:
+                pattern = normalize_text(keyword)
+                if pattern not in self._owners:
+                    self._owners[pattern] = []
+                    self.keywords.append(keyword)
+                if profile not in self._owners[pattern]:
+                    self._owners[pattern].append(profile)
+        self.matcher = KeywordMatcher(self.keywords)
+
+    def route(self, text: str) -> List[Tuple[Profile, List[str]]]:
+        """(profile, matched keywords) for every matching profile, in configured order"""
+        matched: Dict[str, List[str]] = {}
+        for keyword in self.matcher.find(text):
+            for profile in self._owners.get(normalize_text(keyword), ()):
+                matched.setdefault(profile.name, []).append(keyword)
+        return [(profile, matched[profile.name]) for profile in self.profiles if profile.name in matched]
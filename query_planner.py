@@ -0,0 +1,63 @@
+"""
+Query planner for XScout
+Packs KEYWORDS into as few search queries as fit the X query length limit
+"""
+import hashlib
+from typing import List
+
+# Recent search query limit for Free/Basic access (Pro allows 1024)
+DEFAULT_MAX_QUERY_LENGTH = 512
+
+
+class QueryShard:
+    def __init__(self, keywords: List[str], suffix: str):
+        self.keywords = keywords
+        self.query = build_query(keywords, suffix)
+        # Stable id so each shard keeps its own since_id checkpoint
+        self.id = hashlib.sha1(self.query.encode('utf-8')).hexdigest()[:12]
+
+    def __len__(self) -> int:
+        return len(self.query)
+
+    def __repr__(self) -> str:
+        return f"QueryShard({self.id}, {len(self.keywords)} keywords, {len(self.query)} chars)"
+
+
+def build_query(keywords: List[str], suffix: str = '') -> str:
+    """
+    Build `("kw1" OR "kw2") <suffix>`. The parentheses matter: X evaluates AND
+    before OR, so without them the suffix would only apply to the last keyword.
+    """
+    phrases = ' OR '.join(f'"{keyword}"' for keyword in keywords)
+    query = f"({phrases})" if len(keywords) > 1 else phrases
+    return f"{query} {suffix}".strip() if suffix else query
+
+
+def plan_queries(keywords: List[str], suffix: str = '',
+                 max_length: int = DEFAULT_MAX_QUERY_LENGTH) -> List[QueryShard]:
+    """
+    Split keywords into shards whose full query (including `suffix`) stays within
+    `max_length`, using first-fit decreasing so the number of queries stays small.
+    Keywords that cannot fit even on their own are skipped with a warning.
+    """
+    cleaned = []
+    for keyword in keywords:
+        keyword = keyword.strip().replace('"', '')
+        if keyword and keyword not in cleaned:
+            cleaned.append(keyword)
+
+    bins: List[List[str]] = []
+    for keyword in sorted(cleaned, key=len, reverse=True):
+        if len(build_query([keyword], suffix)) > max_length:
+            print(f"[!] Keyword too long for a {max_length}-char query, skipping: '{keyword}'")
+            continue
+        for group in bins:
+            if len(build_query(group + [keyword], suffix)) <= max_length:
+                group.append(keyword)
+                break
+        else:
+            bins.append([keyword])
+
+    # Keep the user's keyword order inside each shard for readable logs
+    order = {keyword: i for i, keyword in enumerate(cleaned)}
+    return [QueryShard(sorted(group, key=order.get), suffix) for group in bins]
@@ -0,0 +1,141 @@
+"""
+Outbound call scheduling for XScout
+Features: Per-service token buckets, urgency/score priority queue for side effects
+"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None):
+        """Refills `rate_per_minute` tokens per minute, holding at most `burst` (default: one minute's worth)"""
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst or max(1, int(rate_per_minute)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for `seconds`, e.g. until the service's own rate-limit window resets"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def try_acquire(self, cost: float = 1) -> bool:
+        cost = min(cost, self.capacity)
+        with self.lock:
+            self._refill()
+            if self.tokens >= cost and self.updated >= self.paused_until:
+                self.tokens -= cost
+                return True
+            return False
+
+    def available(self) -> float:
+        """Tokens that could be spent right now"""
+        with self.lock:
+            self._refill()
+            return self.tokens if self.updated >= self.paused_until else 0.0
+
+    def wait_time(self, cost: float = 1) -> float:
+        """Seconds until `cost` tokens will be available"""
+        cost = min(cost, self.capacity)
+        with self.lock:
+            self._refill()
+            paused = max(0.0, self.paused_until - self.updated)
+            if self.tokens >= cost or self.rate <= 0:
+                return paused if self.tokens >= cost else float('inf')
+            return max(paused, (cost - self.tokens) / self.rate)
+
+    def acquire(self, cost: float = 1, timeout: Optional[float] = None) -> bool:
+        """Block until tokens are available. Returns False if `timeout` runs out first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.try_acquire(cost):
+            delay = self.wait_time(cost)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or delay > remaining:
+                    return False
+                delay = min(delay, remaining)
+            time.sleep(min(max(delay, 0.01), 1.0))
+        return True
+
+
+class PriorityScheduler:
+    """
+    Holds outbound side effects (notifications, likes, replies) in per-service
+    priority queues and hands them to `submit(service, fn, *args)` as their
+    service's bucket allows.
+    Higher urgency, then higher score, goes first. Work that has no tokens yet
+    stays queued (deferred) rather than blocking a worker or being dropped.
+    """
+
+    def __init__(self, submit: Callable, buckets: Dict[str, TokenBucket]):
+        self.submit = submit
+        self.buckets = buckets
+        self.queues: Dict[str, list] = {service: [] for service in buckets}
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.dispatcher = None
+        self.dispatching = 0
+
+    @staticmethod
+    def priority(urgency_level: Optional[int], score: Optional[int]) -> tuple:
+        return (-(urgency_level or 2), -(score if score is not None else 5))
+
+    def schedule(self, service: str, priority: tuple, fn: Callable, *args, cost: float = 1):
+        with self.condition:
+            heapq.heappush(self.queues[service], (priority, next(self.sequence), cost, fn, args))
+            if self.dispatcher is None:
+                self.dispatcher = threading.Thread(target=self._dispatch_loop, name='xscout-scheduler', daemon=True)
+                self.dispatcher.start()
+            self.condition.notify_all()
+
+    def pending(self) -> int:
+        with self.condition:
+            return sum(len(queue) for queue in self.queues.values())
+
+    def _dispatch_loop(self):
+        while True:
+            ready = []
+            with self.condition:
+                next_wake = None
+                for service, queue in self.queues.items():
+                    bucket = self.buckets[service]
+                    while queue and bucket.try_acquire(queue[0][2]):
+                        ready.append((service, heapq.heappop(queue)))
+                        self.dispatching += 1
+                    if queue:
+                        delay = bucket.wait_time(queue[0][2])
+                        next_wake = delay if next_wake is None else min(next_wake, delay)
+                if not ready:
+                    self.condition.notify_all()
+                    self.condition.wait(timeout=None if next_wake is None else min(max(next_wake, 0.01), 60))
+                    continue
+            for service, (_, _, _, fn, args) in ready:
+                try:
+                    self.submit(service, fn, *args)
+                finally:
+                    with self.condition:
+                        self.dispatching -= 1
+                        self.condition.notify_all()
+
+    def drain(self, timeout: float) -> int:
+        """Wait up to `timeout` seconds for every queued job to be dispatched. Returns how many are still deferred."""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while True:
+                remaining = sum(len(queue) for queue in self.queues.values())
+                left = deadline - time.monotonic()
+                if not remaining and not self.dispatching:
+                    return 0
+                if left <= 0:
+                    return remaining
+                self.condition.wait(timeout=min(left, 1.0))
@@ -0,0 +1,169 @@
+"""
+Persistent state for XScout - survives between --single-run invocations
+Features: Seen-tweet dedup store, search checkpoints (since_id), near-duplicate fingerprints,
+the SQLite connection setup every on-disk store shares
+"""
+import os
+import sqlite3
+import time
+import threading
+import functools
+from typing import List, Optional, Tuple
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    Open (or create) a SQLite file for use from several threads and processes:
+    WAL so readers never block the writer, and a 30s wait for another writer's lock
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _locked(method):
+    """Serialize access to the shared connection (search shards and lead workers use it concurrently)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class StateStore:
+    def __init__(self, path: str, max_seen: int = 50000, max_age_days: float = 7):
+        """
+        Open (or create) the SQLite state file at `path`.
+        The seen-tweet table is capped at `max_seen` rows and entries older
+        than `max_age_days` are evicted - search only covers the last 7 days,
+        so older ids can never come back.
+        """
+        self.path = path
+        self.max_seen = max_seen
+        self.max_age = max_age_days * 86400
+
+        self.lock = threading.RLock()
+        self.conn = connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_tweets ("
+            " tweet_id INTEGER PRIMARY KEY,"
+            " seen_at INTEGER NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS seen_tweets_seen_at ON seen_tweets (seen_at)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            " tweet_id INTEGER PRIMARY KEY,"
+            " fingerprint INTEGER NOT NULL,"
+            " cluster_id INTEGER NOT NULL,"
+            " seen_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            " name TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " updated_at INTEGER NOT NULL)"
+        )
+        self.conn.commit()
+        self._adds = 0
+        self.prune()
+
+    # ---- seen tweets (set-like) ----
+
+    @_locked
+    def __contains__(self, tweet_id) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM seen_tweets WHERE tweet_id = ?", (int(tweet_id),)
+        ).fetchone()
+        return row is not None
+
+    @_locked
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM seen_tweets").fetchone()[0]
+
+    @_locked
+    def add(self, tweet_id):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO seen_tweets (tweet_id, seen_at) VALUES (?, ?)",
+            (int(tweet_id), int(time.time()))
+        )
+        self.conn.commit()
+        self._adds += 1
+        if self._adds % 500 == 0:
+            self.prune()
+
+    @_locked
+    def prune(self) -> int:
+        """Evict entries past max age, then the oldest beyond max_seen. Returns rows removed."""
+        cutoff = int(time.time() - self.max_age)
+        removed = self.conn.execute(
+            "DELETE FROM seen_tweets WHERE seen_at < ?", (cutoff,)
+        ).rowcount
+        self.conn.execute("DELETE FROM fingerprints WHERE seen_at < ?", (cutoff,))
+        overflow = len(self) - self.max_seen
+        if overflow > 0:
+            removed += self.conn.execute(
+                "DELETE FROM seen_tweets WHERE tweet_id IN ("
+                " SELECT tweet_id FROM seen_tweets ORDER BY seen_at, tweet_id LIMIT ?)",
+                (overflow,)
+            ).rowcount
+        self.conn.commit()
+        return removed
+
+    # ---- near-duplicate fingerprints ----
+
+    @_locked
+    def save_fingerprint(self, seen_at: float, tweet_id: int, fingerprint: int, cluster_id: int):
+        # SQLite integers are signed 64-bit
+        signed = fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+        self.conn.execute(
+            "INSERT OR REPLACE INTO fingerprints (tweet_id, fingerprint, cluster_id, seen_at) VALUES (?, ?, ?, ?)",
+            (int(tweet_id), signed, int(cluster_id), seen_at)
+        )
+        self.conn.commit()
+
+    @_locked
+    def load_fingerprints(self, since: float) -> List[Tuple[float, int, int, int]]:
+        """(seen_at, tweet_id, fingerprint, cluster_id) rows newer than `since`, oldest first"""
+        rows = self.conn.execute(
+            "SELECT seen_at, tweet_id, fingerprint, cluster_id FROM fingerprints"
+            " WHERE seen_at >= ? ORDER BY seen_at",
+            (since,)
+        ).fetchall()
+        return [(seen_at, tweet_id, fingerprint & ((1 << 64) - 1), cluster_id)
+                for seen_at, tweet_id, fingerprint, cluster_id in rows]
+
+    # ---- checkpoints ----
+
+    @_locked
+    def get_checkpoint(self, name: str, max_age_seconds: Optional[float] = None) -> Optional[str]:
+        """Return a stored checkpoint value, or None if missing or older than max_age_seconds"""
+        row = self.conn.execute(
+            "SELECT value, updated_at FROM checkpoints WHERE name = ?", (name,)
+        ).fetchone()
+        if not row:
+            return None
+        value, updated_at = row
+        if max_age_seconds is not None and time.time() - updated_at > max_age_seconds:
+            return None
+        return value
+
+    @_locked
+    def set_checkpoint(self, name: str, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO checkpoints (name, value, updated_at) VALUES (?, ?, ?)",
+            (name, str(value), int(time.time()))
+        )
+        self.conn.commit()
+
+    @_locked
+    def delete_checkpoint(self, name: str):
+        self.conn.execute("DELETE FROM checkpoints WHERE name = ?", (name,))
+        self.conn.commit()
+
+    @_locked
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,163 @@
+"""
+Filtered-stream ingestion for XScout
+Features: KEYWORDS + exclusions as stream rules, rule sync, reconnects with exponential backoff,
+configurable API base so the stream can run against a local fake server
+"""
+import random
+import time
+from typing import Callable, List, Optional
+
+import requests
+import tweepy
+
+from metrics import metrics
+from query_planner import plan_queries
+
+DEFAULT_API_BASE = 'https://api.twitter.com'
+# Rules we manage carry this tag prefix; other rules on the app are left alone
+RULE_TAG = 'xscout'
+
+
+def build_stream_rules(keywords: List[str], suffix: str, max_length: int) -> List[tweepy.StreamRule]:
+    """Pack keywords into as few rules as fit `max_length`, the same way search queries are planned"""
+    return [
+        tweepy.StreamRule(value=shard.query, tag=f"{RULE_TAG}:{shard.id}")
+        for shard in plan_queries(keywords, suffix, max_length)
+    ]
+
+
+class Backoff:
+    """Exponential backoff with jitter, reset once a connection proves healthy"""
+
+    def __init__(self, initial: float = 1, maximum: float = 320, factor: float = 2):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.delay = initial
+
+    def next(self) -> float:
+        delay = self.delay
+        self.delay = min(self.maximum, self.delay * self.factor)
+        return delay * random.uniform(0.8, 1.2)
+
+    def reset(self):
+        self.delay = self.initial
+
+
+class _RebasedSession(requests.Session):
+    """Sends requests meant for api.twitter.com to another base URL (e.g. a local fake server)"""
+
+    def __init__(self, api_base: str):
+        super().__init__()
+        self.api_base = api_base.rstrip('/')
+
+    def request(self, method, url, *args, **kwargs):
+        if url.startswith(DEFAULT_API_BASE):
+            url = self.api_base + url[len(DEFAULT_API_BASE):]
+        return super().request(method, url, *args, **kwargs)
+
+
+class LeadStream(tweepy.StreamingClient):
+    """
+    Filtered stream that hands each matching tweet and its author to `on_lead`.
+    tweepy already backs off on HTTP and network errors; this adds backoff for
+    streams the server closes cleanly and restarts the stream after unexpected
+    exceptions. 401/403 (bad token, or an app without filtered-stream access)
+    stop it for good.
+    """
+
+    def __init__(self, bearer_token: str, on_lead: Callable, api_base: str = DEFAULT_API_BASE,
+                 backoff: Optional[Backoff] = None, sleep: Callable[[float], None] = time.sleep):
+        super().__init__(bearer_token, wait_on_rate_limit=True, daemon=True)
+        if api_base and api_base.rstrip('/') != DEFAULT_API_BASE:
+            self.session = _RebasedSession(api_base)
+        self.on_lead = on_lead
+        self.backoff = backoff or Backoff()
+        self.sleep = sleep
+        self.stopped = False
+        self.fatal = None
+        self.connections = 0
+
+    def sync_rules(self, rules: List[tweepy.StreamRule]):
+        """Make our tagged rules on X match `rules`, touching only what changed"""
+        existing = self.get_rules().data or []
+        ours = [rule for rule in existing if (rule.tag or '').startswith(RULE_TAG)]
+        wanted = {rule.value for rule in rules}
+        stale = [rule.id for rule in ours if rule.value not in wanted]
+        if stale:
+            self.delete_rules(stale)
+        present = {rule.value for rule in ours}
+        missing = [rule for rule in rules if rule.value not in present]
+        if missing:
+            response = self.add_rules(missing)
+            for error in response.errors or []:
+                print(f"[!] Stream rule rejected: {error.get('title', error)} {error.get('value', '')}")
+        print(f"[*] Stream rules: {len(rules)} active ({len(missing)} added, {len(stale)} removed)")
+
+    def run(self, **params):
+        """Block consuming the stream until stop() or a fatal error, restarting it with backoff"""
+        params.setdefault('expansions', ['author_id'])
+        params.setdefault('tweet_fields', ['created_at', 'author_id', 'public_metrics'])
+        params.setdefault('user_fields', ['username', 'name'])
+        while not self.stopped:
+            self.filter(**params)
+            if self.stopped or self.fatal:
+                break
+            delay = self.backoff.next()
+            print(f"[!] Stream stopped, restarting in {delay:.0f}s...")
+            self.sleep(delay)
+        if self.fatal:
+            print(f"[X] Stream stopped: {self.fatal}")
+
+    def stop(self):
+        self.stopped = True
+        self.disconnect()
+
+    def on_connect(self):
+        self.connections += 1
+        if self.connections > 1:
+            metrics.inc('xscout_stream_reconnects_total')
+        print("[+] Stream connected" + (f" (reconnect {self.connections - 1})" if self.connections > 1 else ""))
+
+    def on_keep_alive(self):
+        self.backoff.reset()
+
+    def on_response(self, response):
+        self.backoff.reset()
+        tweet = response.data
+        if tweet is None:
+            return
+        users = {user.id: user for user in (response.includes or {}).get('users', [])}
+        try:
+            self.on_lead(tweet, users.get(tweet.author_id))
+        except Exception as e:
+            # One bad tweet must not take the stream down
+            print(f"[X] Error handling streamed tweet {tweet.id}: {e}")
+
+    def on_errors(self, errors):
+        for error in errors[:3]:
+            print(f"[!] Stream error: {error.get('title') or error.get('detail') or error}")
+
+    def on_closed(self, response):
+        if not self.running:
+            return
+        metrics.error('twitter.stream')
+        delay = self.backoff.next()
+        print(f"[!] Stream closed by server, reconnecting in {delay:.0f}s...")
+        self.sleep(delay)
+
+    def on_connection_error(self):
+        metrics.error('twitter.stream')
+        print("[!] Stream connection error or timeout, reconnecting...")
+
+    def on_request_error(self, status_code):
+        metrics.error('twitter.stream')
+        if status_code in (401, 403):
+            self.fatal = f"HTTP {status_code} (check TWITTER_BEARER_TOKEN and that the app has filtered-stream access)"
+            self.disconnect()
+            return
+        print(f"[!] Stream HTTP error {status_code}, retrying with backoff...")
+
+    def on_exception(self, exception):
+        metrics.error('twitter.stream')
+        print(f"[X] Stream error: {exception}")
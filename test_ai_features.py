@@ -16,6 +16,10 @@ load_dotenv()
 ai = AIHelper(os.getenv('GEMINI_API_KEY', ''))
 
 if not ai.enabled:
+    if __name__ != '__main__':
+        # Collected by pytest: this is a live demo, not a unit test
+        import pytest
+        pytest.skip("GEMINI_API_KEY not set", allow_module_level=True)
     print("[X] AI not enabled. Check your GEMINI_API_KEY in .env")
     exit(1)
 
@@ -40,6 +44,7 @@ test_tweets = [
 ]
 
 portfolio_url = os.getenv('PORTFOLIO_URL', 'https://your-portfolio.com')
+min_score = int(os.getenv('AI_MIN_LEAD_SCORE', '7'))
 
 for i, tweet in enumerate(test_tweets, 1):
     print(f"\n{'='*60}")
@@ -57,7 +62,7 @@ for i, tweet in enumerate(test_tweets, 1):
     
     print(f"[AI] Score: {lead_score['score']}/10 | Urgency: {emoji} {lead_score.get('urgency', 'medium').upper()}")
     print(f"[AI] {lead_score['reason']}")
-    print(f"[AI] Quality Lead: {'✅ YES' if lead_score['is_quality'] else '❌ NO'}")
+    print(f"[AI] Quality Lead (score >= {min_score}): {'✅ YES' if lead_score['score'] >= min_score else '❌ NO'}")
     
     # Test DM generation
     print()
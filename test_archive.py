@@ -0,0 +1,87 @@
+"""
+Tests for archive capture and replay: what --capture writes, --replay reads
+back unchanged, and a capture cut off mid-write still replays
+Run with: python -m pytest test_archive.py
+"""
+import gzip
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+import tweepy
+
+from archive import ArchiveWriter, JsonlWriter, read_archive
+from conftest import make_tweet
+
+
+@pytest.mark.parametrize('name', ['capture.jsonl', 'capture.jsonl.gz'])
+def test_capture_replay_round_trip(tmp_path, name):
+    path = str(tmp_path / name)
+    data = {'id': '101', 'text': 'need a website', 'author_id': '7', 'edit_history_tweet_ids': ['101']}
+    api_tweet = tweepy.Tweet(data)
+    api_user = tweepy.User({'id': '7', 'username': 'client7', 'name': 'Client Seven'})
+    plain_tweet = SimpleNamespace(id=102, text='looking for web developer', author_id=8,
+                                  created_at=datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc))
+
+    writer = ArchiveWriter(path)
+    writer.capture(api_tweet, api_user)
+    writer.capture(plain_tweet, SimpleNamespace(id=8, username='client8', name=None))
+    writer.capture(SimpleNamespace(id=103, text='no author', author_id=None, created_at=None))
+    writer.close()
+    writer.write({'late': True})  # ignored once closed
+    assert writer.written == 3
+    assert api_tweet.data['id'] == '101' and api_tweet.data is data  # the tweepy payload is copied, not changed
+
+    replayed = list(read_archive(path))
+    assert [(tweet.id, tweet.text, tweet.author_id) for tweet, _ in replayed] == [
+        (101, 'need a website', 7), (102, 'looking for web developer', 8), (103, 'no author', None)]
+    assert replayed[1][0].created_at == plain_tweet.created_at
+    assert [(author.id, author.username) for _, author in replayed[:2]] == [(7, 'client7'), (8, 'client8')]
+    assert replayed[2][1] is None
+
+
+def test_truncated_gzip_replays_what_was_written(tmp_path, capsys):
+    path = tmp_path / 'killed.jsonl.gz'
+    writer = ArchiveWriter(str(path))
+    for tweet_id in range(1, 201):
+        writer.capture(*make_tweet(tweet_id, text=f'need a website #{tweet_id} ' + 'x' * 200))
+    writer.close()
+    # Simulate a kill: the gzip trailer is missing and the last block is cut short
+    content = path.read_bytes()
+    path.write_bytes(content[:len(content) * 2 // 3])
+
+    replayed = [tweet.id for tweet, _ in read_archive(str(path))]
+    assert replayed and replayed == list(range(1, len(replayed) + 1))
+    assert 'truncated or corrupt' in capsys.readouterr().out
+
+
+def test_malformed_lines_are_skipped(tmp_path, capsys):
+    path = tmp_path / 'archive.jsonl'
+    good = {'tweet': {'id': '1', 'text': 'need a website'}, 'users': []}
+    path.write_text('\n'.join([json.dumps(good), '{not json', json.dumps({'users': []}), '',
+                               json.dumps(dict(good, tweet={'id': '2', 'text': 'hi'}))]) + '\n')
+    assert [tweet.id for tweet, _ in read_archive(str(path))] == [1, 2]
+    out = capsys.readouterr().out
+    assert 'Skipping malformed archive line 2' in out and 'Skipped 2 malformed archive lines' in out
+
+
+def test_replay_of_a_capture_finds_the_same_leads(make_bot, tmp_path):
+    path = tmp_path / 'capture.jsonl'
+    writer = ArchiveWriter(str(path))
+    writer.capture(*make_tweet(1, text='need a website for my bakery', author_id=11, username='bakery'))
+    writer.capture(*make_tweet(2, text='lovely weather today in the park', author_id=12, username='walker'))
+    writer.capture(*make_tweet(3, text='looking for web developer to build a shop', author_id=13, username='shop'))
+    writer.close()
+
+    bot = make_bot(DRY_RUN='true', NEAR_DUP_ENABLED='false', AUTHOR_INDEX_ENABLED='false', PREFILTER_ENABLED='false')
+    bot.results = JsonlWriter(str(tmp_path / 'results.jsonl'))
+    bot.replay(str(path))
+    bot.results.close()
+
+    results = [json.loads(line) for line in (tmp_path / 'results.jsonl').read_text().splitlines()]
+    outcomes = {record['id']: record['outcome'] for record in results}
+    assert outcomes['2'] == 'no_keyword'
+    assert outcomes['1'] == outcomes['3'] != 'no_keyword'
+    assert {record['author'] for record in results} == {'bakery', 'walker', 'shop'}
+    assert bot.outbox.counts() == {}  # dry run: nothing queued
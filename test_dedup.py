@@ -0,0 +1,83 @@
+"""
+Tests for SimHash near-duplicate detection: the banded index finds every
+fingerprint within max_distance bits, and a tweet never matches itself
+Run with: python -m pytest test_dedup.py
+"""
+from types import SimpleNamespace
+
+import pytest
+
+import dedup
+from dedup import NearDuplicateDetector, simhash
+from state_store import StateStore
+
+BASE = 0x0123456789ABCDEF
+
+
+@pytest.fixture
+def fingerprints(monkeypatch):
+    """Texts are the fingerprints themselves, so tests can place bit flips in chosen bands"""
+    monkeypatch.setattr(dedup, 'simhash', lambda text: int(text))
+
+
+def flip(fingerprint, *bits):
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def test_simhash_ignores_links_and_mentions():
+    text = "need a website for my bakery, anyone available this week"
+    assert simhash(text) == simhash(f"@someone {text} https://t.co/abc123")
+    assert simhash(text) != simhash("looking for a plumber in austin this weekend please")
+    assert simhash("need a website") is None
+
+
+def test_matches_within_distance_in_any_bands(fingerprints):
+    detector = NearDuplicateDetector(max_distance=3)
+    assert detector.check(1, str(BASE)) is None
+    # Three flips spread over three of the four 16-bit bands: only the last band still agrees
+    assert detector.check(2, str(flip(BASE, 0, 20, 40))) == 1
+    # Three flips inside one band: the other three agree
+    assert detector.check(3, str(flip(BASE, 60, 61, 62))) == 1
+    assert detector.clusters == {1: [1, 2, 3]}
+
+
+def test_no_match_beyond_distance(fingerprints):
+    detector = NearDuplicateDetector(max_distance=3)
+    detector.check(1, str(BASE))
+    assert detector.check(2, str(flip(BASE, 0, 20, 40, 60))) is None  # every band differs
+    assert detector.check(3, str(flip(BASE, 1, 2, 3, 4))) is None  # one band agrees, 4 bits apart
+
+
+def test_refetched_tweet_is_not_its_own_duplicate(fingerprints):
+    detector = NearDuplicateDetector()
+    assert detector.check(1, str(BASE)) is None
+    assert detector.check(1, str(BASE)) is None
+    assert detector.check('1', str(BASE)) is None
+    assert detector.check(2, str(BASE)) == 1
+
+
+def test_window_expiry_and_max_entries(fingerprints, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(dedup, 'time', SimpleNamespace(time=lambda: clock[0]))
+    detector = NearDuplicateDetector(window_seconds=60)
+    detector.check(1, str(BASE))
+    clock[0] += 61
+    assert detector.check(2, str(BASE)) is None
+    assert [entry[1] for bucket in detector.index[0].values() for entry in bucket] == [2]
+    assert list(detector.ids) == [2]
+
+    capped = NearDuplicateDetector(max_entries=2)
+    capped.check(1, str(BASE))
+    capped.check(2, str(flip(BASE, 0, 20, 40, 60)))
+    capped.check(3, str(flip(BASE, 1, 21, 41, 61)))
+    assert capped.check(4, str(BASE)) is None  # 1 fell out of the window
+
+
+def test_window_is_restored_from_the_store(fingerprints, tmp_path):
+    store = StateStore(str(tmp_path / 'state.db'))
+    NearDuplicateDetector(store=store).check(1, str(BASE))
+    detector = NearDuplicateDetector(store=store)
+    assert detector.check(1, str(BASE)) is None
+    assert detector.check(2, str(flip(BASE, 5))) == 1
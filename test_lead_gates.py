@@ -0,0 +1,62 @@
+"""
+Tests for the score thresholds between pipeline stages: a lead the AI failed
+to score is still notified, but never liked or replied to
+Run with: python -m pytest test_lead_gates.py
+"""
+from conftest import make_tweet
+from xscout import XScout
+
+SCORED_HIGH = {'score': 9, 'reason': 'r', 'urgency': 'high', 'urgency_level': 3, 'reply': 'Hi!', 'dm': 'Hello'}
+SCORED_LOW = {'score': 3, 'reason': 'r', 'urgency': 'low', 'urgency_level': 1, 'reply': None, 'dm': None}
+UNSCORED = {'score': 5, 'reason': 'Error: 429', 'urgency': 'medium', 'urgency_level': 2, 'scored': False,
+            'reply': None, 'dm': None}
+
+
+def queued_actions(bot):
+    with bot.outbox.lock:
+        return sorted(row['action'] for row in bot.outbox.conn.execute("SELECT action FROM outbox"))
+
+
+def test_passes():
+    assert XScout.passes(None, 7)
+    assert XScout.passes(SCORED_HIGH, 7)
+    assert not XScout.passes(SCORED_LOW, 7)
+    assert XScout.passes(UNSCORED, 7)
+    assert not XScout.passes(UNSCORED, 7, unscored=False)
+
+
+def test_unscored_lead_is_notified_only(make_bot):
+    bot = make_bot()
+    tweet, author = make_tweet(1)
+    bot.enqueue_actions(tweet, author.username, 'https://x.com/1', 'medium', UNSCORED['score'], UNSCORED)
+    assert queued_actions(bot) == ['notify']
+    assert bot.stage_drops['reply'] == 1
+
+
+def test_scored_lead_is_liked_and_replied(make_bot):
+    bot = make_bot()
+    tweet, author = make_tweet(2)
+    bot.enqueue_actions(tweet, author.username, 'https://x.com/2', 'high', SCORED_HIGH['score'], SCORED_HIGH)
+    assert queued_actions(bot) == ['like', 'notify', 'reply']
+
+
+def test_lead_without_ai_is_replied(make_bot):
+    bot = make_bot()
+    tweet, author = make_tweet(3)
+    bot.enqueue_actions(tweet, author.username, 'https://x.com/3', 'medium', None, None)
+    assert queued_actions(bot) == ['like', 'notify', 'reply']
+
+
+def test_unscored_lead_gets_no_outreach_request(make_bot):
+    bot = make_bot()
+    group = [(*make_tweet(4), bot.route(make_tweet(4)[0]))]
+    analyses = bot.add_outreach(group, [dict(UNSCORED)], bot.profiles[0])
+    assert analyses[0]['reply'] is None and analyses[0]['dm'] is None
+
+
+def test_reply_and_dm_come_from_the_analysis(make_bot):
+    bot = make_bot()
+    assert bot.compose_reply('client1', SCORED_HIGH) == 'Hi!'
+    assert bot.profiles[0].portfolio_url in bot.compose_reply('client1', SCORED_LOW)
+    assert '--- SUGGESTED DM ---\nHello' in bot.compose_notification('t', 'u', 'client1', 'high', 9, SCORED_HIGH)
+    assert 'SUGGESTED DM' not in bot.compose_notification('t', 'u', 'client1', 'low', 3, SCORED_LOW)
@@ -0,0 +1,94 @@
+"""
+Tests for the metrics registry: Prometheus text output, stage timers and
+the JSON summary single runs write
+Run with: python -m pytest test_metrics.py
+"""
+import json
+import urllib.request
+
+import pytest
+
+from metrics import Histogram, Metrics
+
+
+def test_histogram_buckets_and_quantiles():
+    hist = Histogram(buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 2):
+        hist.observe(value)
+    assert hist.counts == [2, 1, 1]  # bounds are inclusive, the last slot is +Inf
+    assert hist.count == 4 and hist.sum == pytest.approx(2.65) and hist.max == 2
+    assert hist.quantile(0.5) == 0.5
+    assert Histogram().quantile(0.5) is None
+
+
+def test_timer_counts_calls_and_errors():
+    registry = Metrics()
+    with registry.timer('gemini'):
+        pass
+    with pytest.raises(ValueError):
+        with registry.timer('gemini'):
+            raise ValueError
+    registry.timed('search')(lambda: None)()
+    registry.error('search')
+
+    stages = registry.summary()['stages']
+    assert stages['gemini']['calls'] == 2 and stages['gemini']['errors'] == 1
+    assert stages['search']['calls'] == 1 and stages['search']['errors'] == 1
+
+
+def test_render_prometheus_text():
+    registry = Metrics()
+    registry.describe('xscout_tweets_total', 'Tweets seen')
+    registry.inc('xscout_tweets_total', outcome='lead')
+    registry.inc('xscout_tweets_total', 2, outcome='say "hi"\n')
+    registry.set_gauge('xscout_poll_interval_seconds', 60)
+    registry.add_collector(lambda: [('xscout_outbox_actions', {'status': 'pending'}, 3)])
+    registry.observe('xscout_stage_seconds', 0.2, buckets=(0.1, 1), stage='search')
+
+    lines = registry.render().splitlines()
+    assert '# HELP xscout_tweets_total Tweets seen' in lines
+    assert '# TYPE xscout_tweets_total counter' in lines
+    assert 'xscout_tweets_total{outcome="lead"} 1' in lines
+    assert 'xscout_tweets_total{outcome="say \\"hi\\"\\n"} 2' in lines
+    assert 'xscout_poll_interval_seconds 60' in lines
+    assert 'xscout_outbox_actions{status="pending"} 3' in lines
+    assert 'xscout_stage_seconds_bucket{stage="search",le="0.1"} 0' in lines
+    assert 'xscout_stage_seconds_bucket{stage="search",le="1"} 1' in lines
+    assert 'xscout_stage_seconds_bucket{stage="search",le="+Inf"} 1' in lines
+    assert 'xscout_stage_seconds_count{stage="search"} 1' in lines
+
+
+def test_failing_collector_does_not_break_export(capsys):
+    registry = Metrics()
+
+    def broken():
+        raise RuntimeError('db closed')
+    registry.add_collector(broken)
+    registry.inc('xscout_tweets_total')
+    assert 'xscout_tweets_total 1' in registry.render()
+    assert 'Metrics collector failed: db closed' in capsys.readouterr().out
+
+
+def test_summary_cache_hit_rates_and_file(tmp_path):
+    registry = Metrics()
+    registry.inc('xscout_ai_cache_requests_total', 3, kind='analysis', result='hit')
+    registry.inc('xscout_ai_cache_requests_total', 1, kind='analysis', result='miss')
+    registry.inc('xscout_tweets_total', 5, outcome='lead')
+    path = tmp_path / 'summary.json'
+    registry.write_summary(str(path))
+
+    summary = json.loads(path.read_text())
+    assert summary['ai_cache'] == {'analysis': {'hits': 3, 'misses': 1, 'hit_rate': 0.75}}
+    assert summary['counters'] == {'xscout_tweets_total': {'outcome=lead': 5}}
+
+
+def test_serve_exposes_metrics():
+    registry = Metrics()
+    registry.inc('xscout_tweets_total')
+    server = registry.serve(0, host='127.0.0.1')
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{server.server_port}/metrics', timeout=5) as response:
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            assert 'xscout_tweets_total 1' in response.read().decode('utf-8')
+    finally:
+        server.shutdown()
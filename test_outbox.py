@@ -0,0 +1,126 @@
+"""
+Tests for the durable outbox: each action runs at most once per key, retries
+back off, and a crash mid-flight only re-runs actions that are safe to repeat
+Run with: python -m pytest test_outbox.py
+"""
+import time
+
+import pytest
+
+from outbox import Outbox
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return Outbox(str(tmp_path / 'outbox.db'), max_attempts=3, retry_backoff=60)
+
+
+def status(outbox, key):
+    with outbox.lock:
+        row = outbox.conn.execute("SELECT status, attempts FROM outbox WHERE key = ?", (key,)).fetchone()
+    return (row['status'], row['attempts']) if row else None
+
+
+def test_enqueue_is_idempotent_per_key_and_scope(outbox):
+    assert outbox.enqueue('like', 1, {})
+    assert not outbox.enqueue('like', 1, {'again': True})
+    assert outbox.enqueue('reply', 1, {}, scope='design')
+    assert Outbox.key('reply', 1, 'design') == 'reply:design:1'
+    assert outbox.counts() == {'pending': 2}
+
+
+def test_start_complete(outbox):
+    outbox.enqueue('like', 1, {'username': 'client1'})
+    key = Outbox.key('like', 1)
+    assert outbox.start(key)
+    assert not outbox.start(key)  # another worker already has it
+    assert status(outbox, key) == ('in_flight', 1)
+    assert outbox.ready() == []
+    outbox.complete(key)
+    assert status(outbox, key) == ('done', 1)
+
+
+def test_fail_backs_off_then_gives_up(outbox):
+    outbox.enqueue('notify', 1, {})
+    key = Outbox.key('notify', 1)
+    for attempt in (1, 2):
+        outbox.start(key)
+        outbox.fail(key, 'HTTP 500')
+        assert status(outbox, key) == ('pending', attempt)
+        assert outbox.ready() == []  # not due until the backoff passes
+        with outbox.lock:
+            next_attempt_at = outbox.conn.execute("SELECT next_attempt_at FROM outbox").fetchone()[0]
+        assert next_attempt_at - time.time() == pytest.approx(60 * 2 ** (attempt - 1), abs=5)
+        with outbox.lock:
+            outbox.conn.execute("UPDATE outbox SET next_attempt_at = 0")
+    outbox.start(key)
+    outbox.fail(key, 'HTTP 500')
+    assert status(outbox, key) == ('failed', 3)
+
+
+def test_permanent_failure_skips_retries(outbox):
+    outbox.enqueue('reply', 1, {})
+    key = Outbox.key('reply', 1)
+    outbox.start(key)
+    outbox.fail(key, 'tweet deleted', retry=False)
+    assert status(outbox, key) == ('failed', 1)
+
+
+def test_defer_returns_the_attempt(outbox):
+    outbox.enqueue('like', 1, {})
+    key = Outbox.key('like', 1)
+    outbox.start(key)
+    outbox.defer(key, time.time() + 900, '429')
+    assert status(outbox, key) == ('pending', 0)
+    assert outbox.ready() == []
+
+
+def test_recover_retries_idempotent_and_parks_the_rest(outbox):
+    for action in ('like', 'notify', 'reply'):
+        outbox.enqueue(action, 1, {})
+        outbox.start(Outbox.key(action, 1))
+    assert outbox.recover() == 3
+    assert status(outbox, 'like:1') == ('pending', 1)
+    assert status(outbox, 'notify:1') == ('pending', 1)
+    assert status(outbox, 'reply:1') == ('unknown', 1)
+
+
+def test_recover_leaves_actions_other_workers_hold(outbox):
+    outbox.enqueue('reply', 1, {})
+    outbox.enqueue('reply', 2, {})
+    outbox.start('reply:1')
+    outbox.start('reply:2')
+    assert outbox.recover(active=lambda key: key == 'reply:1') == 1
+    assert status(outbox, 'reply:1') == ('in_flight', 1)
+    assert status(outbox, 'reply:2') == ('unknown', 1)
+
+
+def test_park_only_touches_in_flight(outbox):
+    outbox.enqueue('reply', 1, {})
+    outbox.park('reply:1', 'timeout')
+    assert status(outbox, 'reply:1') == ('pending', 0)
+    outbox.start('reply:1')
+    outbox.park('reply:1', 'timeout')
+    assert status(outbox, 'reply:1') == ('unknown', 1)
+
+
+def test_dependent_action_waits_for_its_dependency(outbox):
+    outbox.enqueue('like', 1, {})
+    outbox.enqueue('reply', 1, {}, depends_on=Outbox.key('like', 1))
+    assert [row['key'] for row in outbox.ready()] == ['like:1']
+    outbox.start('like:1')
+    outbox.fail('like:1', 'forbidden', retry=False)
+    # A dependency that gave up no longer holds the reply back
+    assert [row['key'] for row in outbox.ready()] == ['reply:1']
+
+
+def test_ready_orders_by_urgency_then_score(outbox):
+    outbox.enqueue('notify', 1, {}, urgency_level=1, score=9)
+    outbox.enqueue('notify', 2, {}, urgency_level=3, score=6)
+    outbox.enqueue('notify', 3, {}, urgency_level=3, score=8)
+    outbox.enqueue('notify', 4, {})
+    outbox.enqueue('like', 5, {'username': 'client5'}, urgency_level=3, score=10)
+    assert [row['tweet_id'] for row in outbox.ready(['notify'])] == [3, 2, 4, 1]
+    assert [row['tweet_id'] for row in outbox.ready(exclude=['like:5'], limit=2)] == [3, 2]
+    assert [row['key'] for row in outbox.ready(tweet_id=5)] == ['like:5']
+    assert Outbox.payload(outbox.ready(tweet_id=5)[0]) == {'username': 'client5'}
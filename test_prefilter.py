@@ -0,0 +1,52 @@
+"""
+Tests for the rule-based pre-filter: client wording must reach the AI,
+obvious self-promotion and bots must not
+Run with: python -m pytest test_prefilter.py
+"""
+from prefilter import PreFilter
+
+CLIENT_TWEETS = [
+    "need a dev, dm me for details",
+    "looking for someone to redo our services page",
+    "we need a new site for my services business, book a call if interested",
+    "I help run a bakery and we need a website asap",
+    "we offer catering and need someone to build our booking site",
+    "running a giveaway next month, need a landing page for it",
+    "check out my current site, it needs a full redesign. any web developers?",
+    "our agency needs a shopify developer, what do you charge?",
+]
+
+PROMO_TWEETS = [
+    ("Hire me! I build websites for small businesses", "self-promo"),
+    ("I'm a web developer taking new clients this month", "self-promo"),
+    ("open to work - react, next.js, tailwind", "self-promo"),
+    ("see my gigs at fiverr.com/webwizard", "portfolio"),
+    ("follow back for a free website review", "bot"),
+    ("Day 42 #100DaysOfCode built a landing page", "bot"),
+]
+
+
+def test_client_wording_passes():
+    prefilter = PreFilter()
+    for text in CLIENT_TWEETS:
+        assert prefilter.check(text) is None, text
+
+
+def test_self_promotion_and_bots_rejected():
+    prefilter = PreFilter()
+    for text, rule in PROMO_TWEETS:
+        assert prefilter.check(text) == rule, text
+
+
+def test_structural_spam_rejected():
+    prefilter = PreFilter()
+    assert prefilter.check("need a website #a #b #c #d #e #f") == "hashtag-spam"
+    assert prefilter.check("need a website @a @b @c @d @e") == "mention-spam"
+
+
+def test_allow_rules_override_deny(tmp_path):
+    allow = tmp_path / "allow.txt"
+    allow.write_text("client: need a website\n", encoding="utf-8")
+    prefilter = PreFilter(allow_rules_path=str(allow))
+    assert prefilter.check("open to work, but first: I need a website for my shop") is None
+    assert prefilter.hits["allow:client"] == 1
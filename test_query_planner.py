@@ -0,0 +1,57 @@
+"""
+Tests for query sharding and local keyword matching: every keyword lands in
+exactly one query within the length limit, and matches are whole words
+Run with: python -m pytest test_query_planner.py
+"""
+from query_planner import build_query, plan_queries
+from text_match import KeywordMatcher, normalize_text
+
+SUFFIX = '-is:retweet lang:en'
+
+
+def test_build_query_groups_keywords_before_the_suffix():
+    assert build_query(['need a website'], SUFFIX) == '"need a website" -is:retweet lang:en'
+    assert build_query(['a', 'b'], SUFFIX) == '("a" OR "b") -is:retweet lang:en'
+    assert build_query(['a', 'b']) == '("a" OR "b")'
+
+
+def test_shards_cover_every_keyword_within_the_limit():
+    keywords = [f"need a website for my shop number {i}" for i in range(40)]
+    shards = plan_queries(keywords, SUFFIX, max_length=200)
+    assert len(shards) > 1
+    assert all(len(shard) <= 200 for shard in shards)
+    planned = [keyword for shard in shards for keyword in shard.keywords]
+    assert sorted(planned) == sorted(keywords)
+
+
+def test_shards_keep_keyword_order_and_stable_ids():
+    keywords = ['web developer', 'need a website', 'wordpress help']
+    shards = plan_queries(keywords, SUFFIX)
+    assert len(shards) == 1
+    assert shards[0].keywords == keywords
+    assert shards[0].id == plan_queries(keywords, SUFFIX)[0].id
+
+
+def test_planner_cleans_duplicates_quotes_and_oversized_keywords():
+    shards = plan_queries([' need a website ', 'need a website', '"shopify"', '', 'x' * 600], SUFFIX)
+    assert [shard.keywords for shard in shards] == [['need a website', 'shopify']]
+
+
+def test_normalize_text():
+    assert normalize_text("Need a WEBSITE!!  ASAP…") == 'need a website asap'
+    assert normalize_text("who’s free?") == "who's free"
+    assert normalize_text(None) == ''
+
+
+def test_matcher_finds_whole_words_in_order():
+    matcher = KeywordMatcher(['need a website', 'web dev', 'website', '  '])
+    assert len(matcher) == 3
+    assert matcher.find("Urgent: need a website, any web dev around?") == ['need a website', 'website', 'web dev']
+    assert matcher.find("I do web development") == []
+    assert matcher.find("websites for sale") == []
+
+
+def test_matcher_handles_overlapping_keywords():
+    matcher = KeywordMatcher(['a b', 'b c', 'a b c d'])
+    assert matcher.find("a b c d") == ['a b', 'b c', 'a b c d']
+    assert matcher.find("a b a b") == ['a b']
@@ -0,0 +1,92 @@
+"""
+Tests for outbound rate limiting: buckets pace each service, the scheduler
+sends the most urgent work first, and a 429 from X defers the action and its
+service until the window resets instead of sleeping a worker
+Run with: python -m pytest test_scheduler.py
+"""
+import time
+from types import SimpleNamespace
+
+import tweepy
+
+from conftest import make_tweet
+from outbox import Outbox
+from scheduler import PriorityScheduler, TokenBucket
+
+
+def too_many_requests(reset_at):
+    response = SimpleNamespace(status_code=429, reason='Too Many Requests',
+                               headers={'x-rate-limit-reset': str(int(reset_at))},
+                               json=lambda: {'title': 'Too Many Requests'})
+    return tweepy.errors.TooManyRequests(response)
+
+
+class RateLimitedClient:
+    def __init__(self, reset_at):
+        self.reset_at = reset_at
+        self.calls = 0
+
+    def like(self, tweet_id):
+        self.calls += 1
+        raise too_many_requests(self.reset_at)
+
+
+def test_bucket_spends_its_burst_then_refills():
+    bucket = TokenBucket(60, burst=2)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert 0 < bucket.wait_time() <= 1
+    assert not bucket.acquire(timeout=0.1)
+    assert bucket.acquire(timeout=2)
+
+
+def test_scheduler_dispatches_by_urgency_then_score():
+    order = []
+    bucket = TokenBucket(600)
+    bucket.pause(0.2)  # hold everything so the whole queue is ordered at once
+    scheduler = PriorityScheduler(lambda service, fn, *args: fn(*args), {'twitter_write': bucket})
+    jobs = [('low', 1, 9), ('high-7', 3, 7), ('medium', 2, 5), ('high-9', 3, 9), ('unscored', None, None)]
+    for name, urgency_level, score in jobs:
+        scheduler.schedule('twitter_write', PriorityScheduler.priority(urgency_level, score), order.append, name)
+    assert scheduler.pending() == len(jobs)
+    assert scheduler.drain(5) == 0
+    # Ties (medium, 5 and the defaults) keep their queueing order
+    assert order == ['high-9', 'high-7', 'medium', 'unscored', 'low']
+
+
+def test_scheduler_defers_work_without_tokens():
+    done = []
+    scheduler = PriorityScheduler(lambda service, fn, *args: fn(*args),
+                                  {'callmebot': TokenBucket(60, burst=1), 'twitter_write': TokenBucket(600)})
+    for i in range(3):
+        scheduler.schedule('callmebot', PriorityScheduler.priority(2, 5), done.append, f'notify-{i}')
+    scheduler.schedule('twitter_write', PriorityScheduler.priority(2, 5), done.append, 'like')
+    assert scheduler.drain(0.5) == 2
+    assert sorted(done) == ['like', 'notify-0']
+
+
+def test_paused_bucket_hands_out_no_tokens():
+    bucket = TokenBucket(600)
+    bucket.pause(60)
+    assert not bucket.try_acquire()
+    assert bucket.available() == 0
+    assert 59 < bucket.wait_time() <= 60
+
+
+def test_rate_limited_like_is_deferred_until_reset(make_bot):
+    bot = make_bot()
+    reset_at = time.time() + 900
+    bot.client = RateLimitedClient(reset_at)
+    tweet, author = make_tweet(7)
+    bot.outbox.enqueue('like', tweet.id, {'username': author.username, 'author_id': str(author.id)})
+
+    row = bot.outbox.ready(['like'])[0]
+    bot.execute_action(row)
+
+    with bot.outbox.lock:
+        stored = bot.outbox.conn.execute("SELECT * FROM outbox WHERE key = ?", (Outbox.key('like', 7),)).fetchone()
+    assert stored['status'] == 'pending'
+    assert stored['attempts'] == 0
+    assert abs(stored['next_attempt_at'] - int(reset_at)) < 1
+    assert bot.client.calls == 1
+    assert bot.scheduler.buckets['twitter_write'].wait_time() > 800
@@ -0,0 +1,131 @@
+"""
+Tests for per-shard search checkpoints: no tweet is skipped when a poll hits
+SEARCH_MAX_TWEETS, and new tweets never wait behind the backlog
+Run with: python -m pytest test_search_checkpoints.py
+"""
+import json
+import time
+from types import SimpleNamespace
+
+import tweepy
+
+from query_planner import plan_queries
+from xscout import QUERY_SUFFIX, XScout
+
+
+class TimelineClient:
+    """Recent search over tweets 1..newest (newest first), honouring since_id, until_id and next_token"""
+
+    def __init__(self, newest):
+        self.newest = newest
+        self.calls = []
+
+    def search_recent_tweets(self, query=None, max_results=10, since_id=None, until_id=None,
+                             next_token=None, **kwargs):
+        self.calls.append({'since_id': since_id, 'until_id': until_id, 'start_time': kwargs.get('start_time')})
+        top = int(until_id) - 1 if until_id else self.newest
+        ids = [i for i in range(top, int(since_id or 0), -1)]
+        start = int(next_token or 0)
+        page = ids[start:start + max_results]
+        meta = {'result_count': len(page)}
+        if start + max_results < len(ids):
+            meta['next_token'] = str(start + max_results)
+        tweets = [SimpleNamespace(id=i, text=f"need a website #{i}", author_id=i, created_at=None) for i in page]
+        users = [SimpleNamespace(id=i, username=f"client{i}", name=f"client{i}") for i in page]
+        return tweepy.Response(tweets or None, {'users': users}, [], meta)
+
+
+def poll(bot):
+    """One search_tweets cycle; returns the tweet ids it fetched"""
+    fetched = []
+    screen = bot.screen_tweet
+    bot.screen_tweet = lambda tweet, author=None, **kwargs: fetched.append(tweet.id) or screen(tweet, author, **kwargs)
+    bot.search_tweets(60)
+    bot.screen_tweet = screen
+    return fetched
+
+
+def make_search_bot(make_bot, newest, cap):
+    bot = make_bot(auto_reply=False, SEARCH_MAX_TWEETS=str(cap), CALLMEBOT_PHONE='', NEAR_DUP_ENABLED='false',
+                   AUTHOR_INDEX_ENABLED='false', PREFILTER_ENABLED='false')
+    bot.client = TimelineClient(newest)
+    shard = plan_queries(bot.keywords, QUERY_SUFFIX, bot.max_query_length)[0]
+    return bot, shard
+
+
+def test_uncapped_poll_moves_since_id(make_bot):
+    bot, shard = make_search_bot(make_bot, newest=25, cap=100)
+    assert sorted(poll(bot)) == list(range(1, 26))
+    assert bot.state.get_checkpoint(f'since_id:{shard.id}') == '25'
+    assert bot.state.get_checkpoint(f'backlog:{shard.id}') is None
+
+    bot.client.newest = 30
+    assert sorted(poll(bot)) == [26, 27, 28, 29, 30]
+    assert bot.client.calls[-1]['since_id'] == '25'
+
+
+def test_capped_first_poll_keeps_its_start_time(make_bot):
+    bot, shard = make_search_bot(make_bot, newest=50, cap=20)
+    assert poll(bot) == list(range(50, 30, -1))
+    first_start_time = bot.client.calls[0]['start_time']
+    backlog = json.loads(bot.state.get_checkpoint(f'backlog:{shard.id}'))
+    assert backlog[0]['start_time'] == first_start_time
+    assert backlog[0]['until_id'] == 31
+
+    bot.client.newest = 55
+    fetched = poll(bot)
+    # New tweets first, then the rest of the budget goes to the backlog, bounded by the first poll's start_time
+    assert fetched[:5] == [55, 54, 53, 52, 51]
+    assert fetched[5:] == list(range(30, 15, -1))
+    assert bot.client.calls[-1]['start_time'] == first_start_time
+
+    seen = set(fetched) | set(range(31, 51))
+    while bot.state.get_checkpoint(f'backlog:{shard.id}'):
+        seen |= set(poll(bot))
+    assert seen == set(range(1, 56))
+
+
+def test_new_tweets_are_not_held_back_by_the_backlog(make_bot):
+    bot, shard = make_search_bot(make_bot, newest=100, cap=10)
+    poll(bot)
+    for newest in (103, 106, 109):
+        bot.client.newest = newest
+        fetched = poll(bot)
+        assert fetched[:3] == [newest, newest - 1, newest - 2]
+
+
+def test_busy_shard_stacks_backlog_ranges(make_bot):
+    bot, shard = make_search_bot(make_bot, newest=100, cap=10)
+    poll(bot)
+    bot.client.newest = 200
+    poll(bot)  # new tweets fill the whole budget again: a second range is skipped
+    backlog = json.loads(bot.state.get_checkpoint(f'backlog:{shard.id}'))
+    assert [gap['until_id'] for gap in backlog] == [191, 91]
+    assert backlog[0]['since_id'] == '100'
+
+    seen = set(range(91, 101)) | set(range(191, 201))
+    while bot.state.get_checkpoint(f'backlog:{shard.id}'):
+        seen |= set(poll(bot))
+    assert seen == set(range(1, 201))
+
+
+def test_stale_backlog_ranges_are_dropped(make_bot):
+    bot, shard = make_search_bot(make_bot, newest=10, cap=100)
+    old = {'since_id': '1', 'until_id': 5, 'at': 0}
+    recent = {'since_id': '5', 'until_id': 9, 'at': time.time() - 60}
+    bot.state.set_checkpoint(f'backlog:{shard.id}', json.dumps([recent, old]))
+    assert bot.search_backlog(shard, report=False) == [recent]
+    assert XScout.backlog_params(recent) == {'until_id': 9, 'since_id': '5'}
+    assert XScout.backlog_params({'start_time': 'T', 'until_id': 9}) == {'until_id': 9, 'start_time': 'T'}
+
+
+def test_failed_search_keeps_the_checkpoint(make_bot):
+    bot, shard = make_search_bot(make_bot, newest=25, cap=100)
+    poll(bot)
+
+    def unavailable(**kwargs):
+        raise tweepy.errors.TwitterServerError(SimpleNamespace(status_code=503, reason='Service Unavailable',
+                                                               json=lambda: {}, headers={}))
+    bot.client.search_recent_tweets = unavailable
+    assert poll(bot) == []
+    assert bot.state.get_checkpoint(f'since_id:{shard.id}') == '25'
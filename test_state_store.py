@@ -0,0 +1,68 @@
+"""
+Tests for the SQLite state store: seen tweets, pruning, checkpoints and
+fingerprints all read back after the file is reopened
+Run with: python -m pytest test_state_store.py
+"""
+import time
+
+from state_store import StateStore, connect
+
+
+def test_seen_tweets_survive_reopen(tmp_path):
+    path = str(tmp_path / 'state.db')
+    store = StateStore(path)
+    store.add(1)
+    store.add('2')
+    assert 1 in store and 2 in store and 3 not in store
+    store.close()
+
+    store = StateStore(path)
+    assert len(store) == 2 and '1' in store
+    store.close()
+
+
+def test_prune_drops_oldest_beyond_max_seen(tmp_path):
+    store = StateStore(str(tmp_path / 'state.db'), max_seen=3)
+    for tweet_id in range(1, 6):
+        store.add(tweet_id)
+    assert store.prune() == 2
+    assert len(store) == 3
+    assert 1 not in store and 2 not in store and 5 in store
+
+
+def test_prune_drops_entries_past_max_age(tmp_path):
+    store = StateStore(str(tmp_path / 'state.db'), max_age_days=1)
+    store.add(1)
+    with store.lock:
+        store.conn.execute("UPDATE seen_tweets SET seen_at = ?", (int(time.time() - 2 * 86400),))
+    store.add(2)
+    assert store.prune() == 1
+    assert 1 not in store and 2 in store
+
+
+def test_checkpoints(tmp_path):
+    store = StateStore(str(tmp_path / 'state.db'))
+    assert store.get_checkpoint('since_id:abc') is None
+    store.set_checkpoint('since_id:abc', 123)
+    assert store.get_checkpoint('since_id:abc') == '123'
+    with store.lock:
+        store.conn.execute("UPDATE checkpoints SET updated_at = ?", (int(time.time() - 3600),))
+    assert store.get_checkpoint('since_id:abc', max_age_seconds=60) is None
+    assert store.get_checkpoint('since_id:abc', max_age_seconds=7200) == '123'
+    store.delete_checkpoint('since_id:abc')
+    assert store.get_checkpoint('since_id:abc') is None
+
+
+def test_fingerprints_round_trip_unsigned(tmp_path):
+    store = StateStore(str(tmp_path / 'state.db'))
+    high = (1 << 64) - 5  # stored signed, must come back unsigned
+    store.save_fingerprint(100.0, 1, high, 1)
+    store.save_fingerprint(200.0, 2, 42, 1)
+    assert store.load_fingerprints(0) == [(100.0, 1, high, 1), (200.0, 2, 42, 1)]
+    assert store.load_fingerprints(150) == [(200.0, 2, 42, 1)]
+
+
+def test_connect_creates_the_directory_in_wal_mode(tmp_path):
+    conn = connect(str(tmp_path / 'nested' / 'cache.db'))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert (tmp_path / 'nested' / 'cache.db').exists()
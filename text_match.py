@@ -0,0 +1,85 @@
+"""
+Text matching helpers for XScout
+Features: Tweet text normalization, multi-keyword matching (Aho-Corasick)
+"""
+import re
+from collections import deque
+from typing import Dict, Iterable, List
+
+_NON_WORD = re.compile(r"[^a-z0-9@#$']+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase and collapse punctuation/whitespace so matching behaves like
+    X search phrase matching ("Need a website!" matches "need a website").
+    """
+    text = (text or '').lower().replace('\u2019', "'")
+    return _NON_WORD.sub(' ', text).strip()
+
+
+class KeywordMatcher:
+    """
+    Finds every keyword contained in a text in a single pass, regardless of
+    how many keywords are registered. Matching is on whole words of the
+    normalized text.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for keyword in keywords:
+            pattern = normalize_text(keyword)
+            if not pattern:
+                continue
+            self.keywords.append(keyword.strip())
+            self._insert(f" {pattern} ", len(self.keywords) - 1)
+
+        self._build()
+
+    def _insert(self, pattern: str, index: int):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append(index)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def find(self, text: str) -> List[str]:
+        """Return the keywords found in `text`, in the order they end in the text"""
+        found: List[int] = []
+        seen = set()
+        state = 0
+        for char in f" {normalize_text(text)} ":
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for index in self._out[state]:
+                if index not in seen:
+                    seen.add(index)
+                    found.append(index)
+        return [self.keywords[index] for index in found]
+
+    def __len__(self) -> int:
+        return len(self.keywords)
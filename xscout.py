@@ -1,33 +1,167 @@
-import tweepy
-import os
 import time
+PROCESS_STARTED = time.perf_counter()  # before the imports below, so their cost shows in startup timings
+
+import tweepy
 import requests
+import os
+import queue
+import json
+import hashlib
+import threading
 import argparse
+import signal
+import sys
+import functools
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
-from ai_helper import AIHelper
+from datetime import datetime, timedelta, timezone
+from ai_helper import AIHelper, ResponseCache
+from classifier import ScoreLog, train_from_log
+from state_store import StateStore
+from query_planner import plan_queries, DEFAULT_MAX_QUERY_LENGTH
+from profiles import DEFAULT_PROFILE, ProfileRouter, load_profiles
+from prefilter import PreFilter
+from dedup import NearDuplicateDetector
+from scheduler import TokenBucket, PriorityScheduler
+from notifier import WhatsAppNotifier
+from outbox import Outbox, OutcomeUnknown
+from authors import AuthorIndex, ALLOW, BLOCK
+from coordination import open_coordinator
+from metrics import metrics, timed
+from archive import ArchiveWriter, JsonlWriter, read_archive
+from polling import AdaptivePoller, SearchQuota, rate_limit_reset
+from stream import LeadStream, Backoff, build_stream_rules, DEFAULT_API_BASE
 
 load_dotenv(override=True)
+IMPORT_SECONDS = time.perf_counter() - PROCESS_STARTED
+
+# Phrases typical of developers advertising themselves rather than clients
+EXCLUDED_PHRASES = ["I help", "I build", "I offer", "hire me", "portfolio", "check out my"]
+QUERY_SUFFIX = '-is:retweet lang:en ' + ' '.join(f'-"{phrase}"' for phrase in EXCLUDED_PHRASES)
+
+# Time-window searches start this far before the previous poll began, for tweets X indexed late
+INDEXING_LAG_SECONDS = 30
+
+# Rate-limited service each outbox action goes through
+ACTION_SERVICES = {'notify': 'callmebot', 'like': 'twitter_write', 'reply': 'twitter_write'}
 
 class XScout:
     def __init__(self):
+        init_started = time.perf_counter()
         self.bearer_token = os.getenv('TWITTER_BEARER_TOKEN')
         self.api_key = os.getenv('TWITTER_API_KEY')
         self.api_secret = os.getenv('TWITTER_API_SECRET')
         self.access_token = os.getenv('TWITTER_ACCESS_TOKEN')
         self.access_secret = os.getenv('TWITTER_ACCESS_SECRET')
         
-        self.callmebot_phone = os.getenv('CALLMEBOT_PHONE')
-        self.callmebot_apikey = os.getenv('CALLMEBOT_APIKEY')
+        # Each profile has its own keywords, portfolio, WhatsApp target and reply settings;
+        # one merged search serves them all and the router sends each tweet to its profiles
+        self.profiles = load_profiles()
+        self.profile_by_name = {profile.name: profile for profile in self.profiles}
+        self.router = ProfileRouter(self.profiles)
+        self.keywords = self.router.keywords
+        self.keyword_matcher = self.router.matcher
+        self.search_max_tweets = int(os.getenv('SEARCH_MAX_TWEETS', '100'))
+        self.max_query_length = int(os.getenv('SEARCH_QUERY_MAX_LENGTH', str(DEFAULT_MAX_QUERY_LENGTH)))
+        self.search_concurrency = int(os.getenv('SEARCH_CONCURRENCY', '4'))
+        self.score_batch_size = int(os.getenv('AI_SCORE_BATCH_SIZE', '10'))
         
-        self.auto_reply = os.getenv('AUTO_REPLY', 'true').lower() == 'true'
-        self.auto_like = os.getenv('AUTO_LIKE', 'true').lower() == 'true'
-        self.portfolio_url = os.getenv('PORTFOLIO_URL', '')
+        # Per-lead work runs on one pool per stage, each sized to that stage's concurrency
+        # cap: jobs waiting on a slow API queue up in its pool without holding workers the
+        # other stages need. The semaphores also cap calls made from another stage's jobs.
+        self.pipeline_workers = int(os.getenv('PIPELINE_WORKERS', '8'))
+        stage_sizes = {
+            'ai': int(os.getenv('AI_CONCURRENCY', '2')),
+            'notify': int(os.getenv('NOTIFY_CONCURRENCY', '2')),
+            'twitter_write': int(os.getenv('TWITTER_WRITE_CONCURRENCY', '2')),
+        }
+        self.stage_limits = {stage: threading.BoundedSemaphore(size) for stage, size in stage_sizes.items()}
+        self.stage_pools = {
+            stage: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f'xscout-{stage}')
+            for stage, size in dict(stage_sizes, pipeline=self.pipeline_workers).items()
+        }
+        self._pending = set()
+        self._pending_lock = threading.Lock()
         
-        self.keywords = os.getenv('KEYWORDS', '').split(',')
+        # Side effects are released per service as rate limits allow, most urgent leads first
+        service_stages = {'callmebot': 'notify', 'twitter_write': 'twitter_write'}
+        self.scheduler = PriorityScheduler(lambda service, fn, *args: self.submit(fn, *args, stage=service_stages[service]), {
+            'callmebot': TokenBucket(float(os.getenv('CALLMEBOT_RPM', '10'))),
+            'twitter_write': TokenBucket(
+                float(os.getenv('TWITTER_WRITE_RPM', '6')),
+                burst=int(os.getenv('TWITTER_WRITE_BURST', '4'))
+            ),
+        })
+        self.drain_timeout = float(os.getenv('SCHEDULER_DRAIN_SECONDS', '60'))
+        
+        # 'instant' sends one message per lead; 'digest' coalesces a cycle's (or window's) leads
+        self.notify_mode = os.getenv('NOTIFY_MODE', 'instant').lower()
+        self.digest_window = float(os.getenv('DIGEST_WINDOW_SECONDS', '0'))
+        # Profiles that share a WhatsApp target share its notifier (and its digest)
+        notifiers = {}
+        for profile in self.profiles:
+            target = (profile.callmebot_phone, profile.callmebot_apikey)
+            if target not in notifiers:
+                notifiers[target] = WhatsAppNotifier(
+                    profile.callmebot_phone,
+                    profile.callmebot_apikey,
+                    timeout=float(os.getenv('CALLMEBOT_TIMEOUT', '10')),
+                    retries=int(os.getenv('CALLMEBOT_RETRIES', '3')),
+                    max_message_chars=int(os.getenv('CALLMEBOT_MAX_MESSAGE_CHARS', '1500')),
+                    rate_limiter=self.scheduler.buckets['callmebot'],
+                    pool_size=int(os.getenv('NOTIFY_CONCURRENCY', '2'))
+                )
+            profile.notifier = notifiers[target]
+        self.notifier = self.profiles[0].notifier
+        
+        self.prefilter = None
+        if os.getenv('PREFILTER_ENABLED', 'true').lower() == 'true':
+            self.prefilter = PreFilter(
+                os.getenv('PREFILTER_DENY_RULES', ''),
+                os.getenv('PREFILTER_ALLOW_RULES', '')
+            )
         
         self.ai_enabled = os.getenv('ENABLE_AI_FEATURES', 'false').lower() == 'true'
-        self.ai_helper = AIHelper(os.getenv('GEMINI_API_KEY', '')) if self.ai_enabled else None
+        self.ai_helper = None
+        if self.ai_enabled:
+            ai_cache = None
+            if os.getenv('AI_CACHE_ENABLED', 'true').lower() == 'true':
+                ai_cache = ResponseCache(
+                    os.getenv('AI_CACHE_DB', 'xscout_ai_cache.db'),
+                    ttl=float(os.getenv('AI_CACHE_TTL_HOURS', '168')) * 3600,
+                    max_entries=int(os.getenv('AI_CACHE_MAX_ENTRIES', '20000')),
+                    bypass=os.getenv('AI_CACHE_BYPASS', 'false').lower() == 'true'
+                )
+            # Gemini's scores are logged to train the local classifier, which then
+            # answers the tweets it is confident about without a Gemini call
+            score_log = None
+            if os.getenv('AI_SCORE_LOG_ENABLED', 'true').lower() == 'true':
+                score_log = self.open_score_log()
+            classifier = None
+            if score_log and os.getenv('LOCAL_CLASSIFIER_ENABLED', 'true').lower() == 'true':
+                low, high = self.classifier_band()
+                classifier = score_log.load_model(low, high)
+                if classifier:
+                    print(f"[+] Local classifier loaded ({classifier.examples} training examples, "
+                          f"Gemini only between {low:.2f} and {high:.2f} lead probability)")
+            self.ai_helper = AIHelper(
+                os.getenv('GEMINI_API_KEY', ''),
+                cache=ai_cache,
+                rate_limiter=TokenBucket(float(os.getenv('GEMINI_RPM', '10'))),
+                score_log=score_log,
+                classifier=classifier,
+                batch_retries=int(os.getenv('AI_BATCH_RETRIES') or '1'),
+                batch_backoff=float(os.getenv('AI_BATCH_BACKOFF_SECONDS') or '5')
+            )
+        
+        # Leads pass through stages: cheap local checks, scoring, then AI-written reply/DM.
+        # Each score threshold stops a lead before the next, more expensive stage.
+        self.notify_min_score = int(os.getenv('NOTIFY_MIN_SCORE') or '0')
+        self.min_lead_score = int(os.getenv('AI_MIN_LEAD_SCORE') or '7')
+        self.reply_min_score = int(os.getenv('REPLY_MIN_SCORE') or self.min_lead_score)
+        self.stage_drops = Counter()
+        self._stage_drops_lock = threading.Lock()
         
         self.client = tweepy.Client(
             bearer_token=self.bearer_token,
@@ -35,12 +169,123 @@ class XScout:
             consumer_secret=self.api_secret,
             access_token=self.access_token,
             access_token_secret=self.access_secret,
-            wait_on_rate_limit=True
+            # A 429 raises instead of sleeping a worker for up to 15 minutes: writes are
+            # deferred in the outbox and scheduler until the window resets, searches next poll
+            wait_on_rate_limit=False
+        )
+        
+        # Search quota left, from X's rate-limit headers (or our own count without them)
+        self.search_quota = SearchQuota(
+            limit=int(os.getenv('SEARCH_RATE_LIMIT', '50')),
+            window_seconds=float(os.getenv('SEARCH_RATE_WINDOW_SECONDS', '900'))
+        )
+        self.client.session.hooks['response'].append(self.search_quota.on_response)
+        self.search_requests = 0
+        self._search_requests_lock = threading.Lock()
+        self.poll_adaptive = os.getenv('POLL_ADAPTIVE', 'true').lower() == 'true'
+        self.poll_min_interval = float(os.getenv('POLL_MIN_SECONDS', '60'))
+        self.poll_max_interval = float(os.getenv('POLL_MAX_SECONDS', '1800'))
+        
+        # --stream: leads are batched for AI for at most STREAM_BATCH_SECONDS
+        self.stream_api_base = os.getenv('STREAM_API_BASE', DEFAULT_API_BASE)
+        self.stream_batch_seconds = float(os.getenv('STREAM_BATCH_SECONDS', '2'))
+        self.stream_backfill_minutes = int(os.getenv('STREAM_BACKFILL_MINUTES', '0'))
+        self.lead_stream = None
+        self._stream_batch = []
+        self._stream_batch_lock = threading.Lock()
+        
+        state_db = os.getenv('XSCOUT_STATE_DB', 'xscout_state.db')
+        self.state = StateStore(
+            state_db,
+            max_seen=int(os.getenv('SEEN_TWEETS_MAX', '50000')),
+            max_age_days=float(os.getenv('SEEN_TWEETS_MAX_AGE_DAYS', '7'))
+        )
+        self.seen_tweets = self.state
+        
+        # Leases shared with other workers (overlapping cron runs, a continuous worker):
+        # one searcher per query shard, one claimant per tweet and per outbox action
+        self.coordinator = open_coordinator(os.getenv('COORDINATION_URL', ''), state_db)
+        self.search_lease_seconds = float(os.getenv('SEARCH_LEASE_SECONDS', '900'))
+        # A --single-run killed before it can release its leases must not block the next cron run
+        self.single_run_lease_seconds = float(os.getenv('SINGLE_RUN_LEASE_SECONDS', '300'))
+        self.tweet_claim_seconds = float(os.getenv('TWEET_CLAIM_SECONDS', '600'))
+        self.action_claim_seconds = float(os.getenv('ACTION_CLAIM_SECONDS', '300'))
+        self.tweet_done_seconds = float(os.getenv('SEEN_TWEETS_MAX_AGE_DAYS', '7')) * 86400
+        self._search_leases = set()
+        
+        # Every like, reply and WhatsApp message is journaled before it runs, so a
+        # crash, timeout or rate-limit deferral resumes on the next run instead of losing the lead
+        self.outbox = Outbox(
+            state_db,
+            max_attempts=int(os.getenv('OUTBOX_MAX_ATTEMPTS', '5')),
+            retry_backoff=float(os.getenv('OUTBOX_RETRY_SECONDS', '60'))
         )
+        self.outbox.recover(active=self.action_in_progress if self.coordinator else None)
+        self._scheduled = set()
+        self._scheduled_lock = threading.Lock()
+        
+        # What we know about each author (last score, contact, replies, block/allow),
+        # checked before any AI call and again before replying
+        self.authors = None
+        if os.getenv('AUTHOR_INDEX_ENABLED', 'true').lower() == 'true':
+            self.authors = AuthorIndex(
+                state_db,
+                cache_size=int(os.getenv('AUTHOR_CACHE_SIZE', '10000')),
+                cooldown=float(os.getenv('AUTHOR_COOLDOWN_HOURS', '72')) * 3600,
+                low_score=int(os.getenv('AUTHOR_SKIP_MAX_SCORE', '2')),
+                score_ttl=float(os.getenv('AUTHOR_SCORE_TTL_DAYS', '7')) * 86400
+            )
+        
+        # dry_run skips notifications, likes and replies; results/archive are JSON Lines files
+        self.dry_run = os.getenv('DRY_RUN', 'false').lower() == 'true'
+        self.results = None
+        self.archive = ArchiveWriter(os.getenv('CAPTURE_ARCHIVE')) if os.getenv('CAPTURE_ARCHIVE') else None
         
-        self.seen_tweets = set()
+        self.metrics_port = int(os.getenv('METRICS_PORT', '9108'))
+        self.metrics_summary_file = os.getenv('METRICS_SUMMARY_FILE', 'xscout_metrics.json')
+        metrics.add_collector(self.collect_metrics)
         
+        self.near_dupes = None
+        if os.getenv('NEAR_DUP_ENABLED', 'true').lower() == 'true':
+            self.near_dupes = NearDuplicateDetector(
+                window_seconds=float(os.getenv('NEAR_DUP_WINDOW_HOURS', '24')) * 3600,
+                max_distance=int(os.getenv('NEAR_DUP_MAX_DISTANCE', '3')),
+                store=None if self.dry_run else self.state
+            )
+        
+        # A successful get_me is remembered per credential set, so cron runs skip the round trip
+        self.auth_cache_hours = float(os.getenv('AUTH_CACHE_HOURS', '24'))
+        auth_started = time.perf_counter()
         self.validate_credentials()
+        
+        self.startup_timings = {
+            'imports': IMPORT_SECONDS,
+            'init': time.perf_counter() - init_started,
+            'auth': time.perf_counter() - auth_started,
+        }
+        self.first_search_at = None
+        for phase, seconds in self.startup_timings.items():
+            metrics.set_gauge('xscout_startup_seconds', round(seconds, 4), phase=phase)
+    
+    def collect_metrics(self):
+        """Quota headroom and backlog gauges, read whenever metrics are exported"""
+        for service, bucket in self.scheduler.buckets.items():
+            yield 'xscout_rate_limit_tokens', {'service': service}, bucket.available()
+        if self.ai_helper and self.ai_helper.rate_limiter:
+            yield 'xscout_rate_limit_tokens', {'service': 'gemini'}, self.ai_helper.rate_limiter.available()
+        yield 'xscout_scheduler_queued', {}, self.scheduler.pending()
+        remaining, reset_in = self.search_quota.status()
+        yield 'xscout_search_quota_remaining', {}, remaining
+        yield 'xscout_search_quota_reset_seconds', {}, reset_in
+        for status, count in self.outbox.counts().items():
+            yield 'xscout_outbox_actions', {'status': status}, count
+    
+    def auth_cache_key(self):
+        """Checkpoint name for the cached get_me result: a hash of the user-auth credentials, never the tokens"""
+        credentials = '\0'.join(value or '' for value in (
+            self.api_key, self.api_secret, self.access_token, self.access_secret
+        ))
+        return 'auth:' + hashlib.sha256(credentials.encode('utf-8')).hexdigest()[:16]
     
     def validate_credentials(self):
         print("\n[*] Validating API credentials...")
@@ -63,17 +308,34 @@ class XScout:
         else:
             print("[+] All Twitter credentials are present")
         
-        if self.auto_reply:
-            print("[+] Auto-reply is ENABLED")
-            if not self.portfolio_url:
-                print("[!] Warning: AUTO_REPLY is enabled but PORTFOLIO_URL is not set")
-            else:
-                print(f"    Portfolio URL: {self.portfolio_url}")
+        if len(self.profiles) > 1:
+            print(f"[+] {len(self.profiles)} profiles sharing one search ({len(self.keywords)} keywords):")
+            for profile in self.profiles:
+                print(f"    {profile.name}: {len(profile.keywords)} keywords")
+        
+        replying = [profile for profile in self.profiles if profile.auto_reply]
+        if replying:
+            print("[+] Auto-reply is ENABLED" + self.profile_suffix(replying))
+            for profile in replying:
+                if not profile.portfolio_url:
+                    print(f"[!] Warning: AUTO_REPLY is enabled but PORTFOLIO_URL is not set{self.profile_suffix([profile])}")
+                else:
+                    print(f"    Portfolio URL{self.profile_suffix([profile])}: {profile.portfolio_url}")
             
+            cached_username = None
+            if self.auth_cache_hours > 0:
+                cached_username = self.state.get_checkpoint(
+                    self.auth_cache_key(), max_age_seconds=self.auth_cache_hours * 3600
+                )
             try:
-                me = self.client.get_me()
-                print(f"[+] Authenticated as: @{me.data.username}")
-                print("    Note: Auto-reply requires 'Read and Write' permissions in your Twitter app settings")
+                if cached_username:
+                    print(f"[+] Authenticated as: @{cached_username} (cached, re-checked every {self.auth_cache_hours:g}h)")
+                else:
+                    me = self.client.get_me()
+                    print(f"[+] Authenticated as: @{me.data.username}")
+                    print("    Note: Auto-reply requires 'Read and Write' permissions in your Twitter app settings")
+                    if self.auth_cache_hours > 0:
+                        self.state.set_checkpoint(self.auth_cache_key(), me.data.username)
             except tweepy.errors.Unauthorized:
                 print("[X] Authentication failed: 401 Unauthorized")
                 print("    Your credentials are invalid or your app lacks proper permissions")
@@ -88,116 +350,144 @@ class XScout:
         else:
             print("[i] Auto-reply is DISABLED")
         
-        if self.auto_like:
-            print("[+] Auto-like is ENABLED (will like tweets before replying)")
+        liking = [profile for profile in self.profiles if profile.auto_like]
+        if liking:
+            print("[+] Auto-like is ENABLED (will like tweets before replying)" + self.profile_suffix(liking))
         else:
             print("[i] Auto-like is DISABLED")
         
-        if self.callmebot_phone and self.callmebot_apikey:
-            print(f"[+] WhatsApp notifications enabled for {self.callmebot_phone}")
-        else:
+        notifying = [profile for profile in self.profiles if profile.notify_configured]
+        for profile in notifying:
+            print(f"[+] WhatsApp notifications enabled for {profile.callmebot_phone}{self.profile_suffix([profile])}")
+        if not notifying:
             print("[i] WhatsApp notifications not configured")
         
         if self.ai_enabled and self.ai_helper and self.ai_helper.enabled:
-            print(f"[+] AI Features enabled (all leads notified, scores shown for info)")
+            print(f"[+] AI Features enabled (notify at score {self.notify_min_score}+, "
+                  f"reply at {self.reply_min_score}+, AI-written DM at {self.min_lead_score}+)")
         else:
             print("[i] AI Features disabled")
         
         print()
     
-    def send_whatsapp_notification(self, tweet_text, tweet_url, author, urgency="medium", score=None):
-        if not self.callmebot_phone or not self.callmebot_apikey:
-            print("WhatsApp not configured. Skipping notification.")
-            return
-        
+    def profile_suffix(self, profiles):
+        """' (for a, b)' when several profiles are configured, for log lines"""
+        if len(self.profiles) == 1:
+            return ''
+        return f" (for {', '.join(profile.name for profile in profiles)})"
+    
+    def route(self, tweet):
+        """
+        [(profile, matched keywords)] for a lead. Tweets search returned but no
+        keyword matches locally (X tokenizes differently) go to the first profile.
+        """
+        return self.router.route(tweet.text) or [(self.profiles[0], [])]
+    
+    @staticmethod
+    def primary_profile(routes):
+        """The profile that replies to (and pitches) a lead: the first matching one that replies"""
+        for profile, _ in routes:
+            if profile.replies:
+                return profile
+        return routes[0][0]
+    
+    @staticmethod
+    def outbox_scope(profile):
+        # The default profile keeps the original unscoped keys
+        return None if profile.name == DEFAULT_PROFILE else profile.name
+    
+    def compose_notification(self, tweet_text, tweet_url, author, urgency="medium", score=None, analysis=None,
+                             profile=None):
+        """Build the WhatsApp lead message, with a suggested DM when one is available"""
+        profile = profile or self.profiles[0]
         # Urgency emoji indicators
         urgency_emoji = {"high": "🔥", "medium": "⚡", "low": "📌"}
         emoji = urgency_emoji.get(urgency.lower(), "⚡")
         
         message = f"{emoji} New Lead Found! [{urgency.upper()}]\n\n"
+        if len(self.profiles) > 1:
+            message += f"Profile: {profile.name}\n"
         if score is not None:
             message += f"AI Score: {score}/10\n"
         message += f"Author: @{author}\n"
         message += f"Tweet: {tweet_text[:200]}...\n\n"
         message += f"View: {tweet_url}\n\n"
         
-        # Generate personalized DM if AI is enabled
-        if self.ai_enabled and self.ai_helper and self.ai_helper.enabled:
-            print(f"[*] Generating personalized DM for @{author}...")
-            dm_message = self.ai_helper.generate_dm(tweet_text, author, self.portfolio_url)
-            if dm_message:
-                message += f"--- SUGGESTED DM ---\n{dm_message}\n\n"
-                print(f"[+] AI generated personalized DM")
-            else:
-                print(f"[!] AI DM generation failed, sending basic notification")
+        # The DM was written with the lead's score (add_outreach); low scorers have none
+        dm_message = (analysis or {}).get('dm')
+        if dm_message:
+            message += f"--- SUGGESTED DM ---\n{dm_message}\n\n"
+        elif analysis and self.passes(analysis, self.min_lead_score, unscored=False):
+            print(f"[!] Lead analysis has no DM, sending basic notification")
         
-        try:
-            url = "https://api.callmebot.com/whatsapp.php"
-            params = {
-                'phone': self.callmebot_phone,
-                'text': message,
-                'apikey': self.callmebot_apikey
-            }
-            
-            response = requests.get(url, params=params)
-            
-            if response.status_code == 200:
-                print(f"[+] WhatsApp notification sent for tweet by @{author}")
-            else:
-                print(f"[X] Failed to send WhatsApp notification: {response.text}")
-        except Exception as e:
-            print(f"[X] Error sending WhatsApp notification: {e}")
+        return message
     
-    def send_auto_reply(self, tweet_id, username, tweet_text=''):
-        print(f"[*] send_auto_reply called for @{username}")
-        print(f"    AUTO_REPLY={self.auto_reply}")
-        print(f"    PORTFOLIO_URL={self.portfolio_url}")
-        print(f"    AI_ENABLED={self.ai_enabled}")
-        
-        if not self.auto_reply:
-            print(f"[i] Auto-reply disabled. Skipping reply to @{username}")
-            return
-        
-        if not self.portfolio_url:
-            print(f"[!] Portfolio URL not configured. Skipping reply to @{username}")
-            return
-        
-        reply_text = None
-        if self.ai_enabled and self.ai_helper and self.ai_helper.enabled and tweet_text:
-            print(f"[*] Generating AI reply for @{username}...")
-            try:
-                reply_text = self.ai_helper.generate_reply(tweet_text, username, self.portfolio_url)
-                if reply_text:
-                    print(f"[+] AI generated personalized reply: {reply_text[:50]}...")
-                else:
-                    print(f"[!] AI returned empty reply")
-            except Exception as e:
-                print(f"[X] AI reply generation failed: {e}")
-        
-        if not reply_text:
-            reply_text = f"Hi! I'm a web developer specializing in frontend and fullstack development. Check out my portfolio: {self.portfolio_url}\n\nI'd love to discuss your project!"
+    def profile_dm(self, tweet_text, author, analysis, profile):
+        """
+        A DM pitching a secondary profile's portfolio (the analysis' DM pitches the
+        primary's), for leads that score high enough to get one
+        """
+        if not (analysis and self.passes(analysis, self.min_lead_score, unscored=False)):
+            return None
+        print(f"[*] Generating personalized DM for @{author}{self.profile_suffix([profile])}...")
+        with self.stage_limits['ai']:
+            dm_message = self.ai_helper.generate_dm(tweet_text, author, profile.portfolio_url)
+        if not dm_message:
+            print(f"[!] AI DM generation failed, sending basic notification")
+        return dm_message
+    
+    def compose_reply(self, username, analysis=None, profile=None):
+        """Reply text for a lead: the AI reply from its analysis, or the template"""
+        profile = profile or self.profiles[0]
+        reply_text = (analysis or {}).get('reply')
+        if reply_text:
+            print(f"[+] Using AI reply from lead analysis: {reply_text[:50]}...")
+        else:
+            reply_text = f"Hi! I'm a web developer specializing in frontend and fullstack development. Check out my portfolio: {profile.portfolio_url}\n\nI'd love to discuss your project!"
             print(f"[*] Using template reply")
-        
-        # Auto-like before replying (increases engagement)
-        if self.auto_like:
-            try:
+        return reply_text
+    
+    # Outbox action handlers: return True when done, False for a permanent failure
+    # (not retried), and raise for anything worth retrying
+    
+    @timed('send_whatsapp_notification')
+    def send_whatsapp_notification(self, message, author, notifier=None):
+        with self.stage_limits['notify']:
+            delivered = (notifier or self.notifier).send(message)
+        if not delivered:
+            raise RuntimeError("WhatsApp notification was not delivered")
+        print(f"[+] WhatsApp notification sent for tweet by @{author}")
+        return True
+    
+    @timed('like_tweet')
+    def like_tweet(self, tweet_id, username):
+        try:
+            with self.stage_limits['twitter_write'], metrics.timer('twitter.like'):
                 self.client.like(tweet_id)
-                print(f"[+] ❤️ Liked tweet by @{username}")
-            except tweepy.errors.Forbidden as e:
-                if "already" in str(e).lower():
-                    print(f"[i] Already liked tweet by @{username}")
-                else:
-                    print(f"[!] Could not like tweet: {e}")
-            except Exception as e:
-                print(f"[!] Error liking tweet: {e}")
-        
+            print(f"[+] ❤️ Liked tweet by @{username}")
+            return True
+        except tweepy.errors.Forbidden as e:
+            if "already" in str(e).lower():
+                print(f"[i] Already liked tweet by @{username}")
+                return True
+            print(f"[!] Could not like tweet: {e}")
+            metrics.error('like_tweet')
+            return False
+    
+    @timed('send_auto_reply')
+    def send_auto_reply(self, tweet_id, username, reply_text):
         print(f"[*] Attempting to post reply to tweet {tweet_id}...")
         try:
-            response = self.client.create_tweet(
-                text=reply_text,
-                in_reply_to_tweet_id=tweet_id
-            )
+            with self.stage_limits['twitter_write'], metrics.timer('twitter.create_tweet'):
+                response = self.client.create_tweet(
+                    text=reply_text,
+                    in_reply_to_tweet_id=tweet_id
+                )
             print(f"[+] ✅ Auto-replied to @{username} - Tweet ID: {response.data['id']}")
+            return True
+        except (tweepy.errors.TooManyRequests, tweepy.errors.TwitterServerError, requests.ConnectTimeout):
+            metrics.error('send_auto_reply')
+            raise  # X turned it away or it never left: nothing posted, safe to retry
         except tweepy.errors.Unauthorized as e:
             print(f"[X] Error sending auto-reply: 401 Unauthorized")
             print(f"    This typically means:")
@@ -205,101 +495,1090 @@ class XScout:
             print(f"    2. Your app lacks 'Read and Write' permissions")
             print(f"    3. Access tokens need to be regenerated with proper permissions")
             print(f"    Details: {e}")
+            metrics.error('send_auto_reply')
+            # Don't keep vouching for credentials that just failed
+            self.state.set_checkpoint(self.auth_cache_key(), '')
+            return False
         except tweepy.errors.Forbidden as e:
             print(f"[X] Error sending auto-reply: 403 Forbidden - {e}")
             print(f"    Your app may not have permission to post tweets")
-        except tweepy.errors.TweepyException as e:
-            print(f"[X] Twitter API Error sending auto-reply: {e}")
+            metrics.error('send_auto_reply')
+            return False
+        except tweepy.errors.HTTPException as e:
+            print(f"[X] Error sending auto-reply: {e}")
+            metrics.error('send_auto_reply')
+            return False
         except Exception as e:
-            print(f"[X] Unexpected error sending auto-reply: {e}")
+            # Timed out or dropped after the request went out: the reply may be live already
+            metrics.error('send_auto_reply')
+            raise OutcomeUnknown(f"reply may have been posted ({e})") from e
     
-    def search_tweets(self, time_window_minutes=60):
-        print(f"[*] Searching for {len(self.keywords)} keywords:")
-        for i, keyword in enumerate(self.keywords, 1):
-            print(f"    {i}. '{keyword.strip()}'")
+    def enqueue_actions(self, tweet, username, tweet_url, urgency, score, analysis, routes=None):
+        """
+        Journal this lead's notifications (one per matching profile), like and
+        reply in the outbox. The account replies once, as the primary profile.
+        Returns True if anything was journaled.
+        """
+        urgency_level = (analysis or {}).get('urgency_level')
+        routes = routes or self.route(tweet)
+        primary = self.primary_profile(routes)
+        contacted = False
         
-        query = ' OR '.join([f'"{keyword.strip()}"' for keyword in self.keywords])
-        query += ' -is:retweet lang:en'
-        query += ' -"I help" -"I build" -"I offer" -"hire me" -"portfolio" -"check out my"'
-        print(f"[*] Search query: {query[:200]}...")  
+        for profile, _ in routes:
+            if not profile.notify_configured:
+                print(f"WhatsApp not configured{self.profile_suffix([profile])}. Skipping notification.")
+                continue
+            # The analysis' DM pitches the primary profile's portfolio; other portfolios get their own
+            profile_analysis = analysis
+            if analysis and profile.portfolio_url != primary.portfolio_url:
+                profile_analysis = dict(analysis, reply=None, dm=self.profile_dm(tweet.text, username, analysis, profile))
+            message = self.compose_notification(tweet.text, tweet_url, username, urgency, score, profile_analysis, profile)
+            self.outbox.enqueue('notify', tweet.id, {'message': message, 'author': username, 'profile': profile.name},
+                                urgency_level, score, scope=self.outbox_scope(profile))
+            contacted = True
         
+        print(f"[*] Auto-reply check for @{username}{self.profile_suffix([primary])}")
+        print(f"    AUTO_REPLY={primary.auto_reply}")
+        print(f"    PORTFOLIO_URL={primary.portfolio_url}")
+        print(f"    AI_ENABLED={self.ai_enabled}")
+        if not primary.auto_reply:
+            print(f"[i] Auto-reply disabled. Skipping reply to @{username}")
+            return contacted
+        if not primary.portfolio_url:
+            print(f"[!] Portfolio URL not configured. Skipping reply to @{username}")
+            return contacted
+        if not self.passes(analysis, self.reply_min_score, unscored=False):
+            if analysis.get('scored') is False:
+                print(f"[i] AI could not score this lead. Notifying only, no like or reply to @{username}")
+            else:
+                print(f"[i] Score {score} is below REPLY_MIN_SCORE ({self.reply_min_score}). Skipping like and reply to @{username}")
+            self.count_drop('reply')
+            return contacted
+        
+        reply_text = self.compose_reply(username, analysis, primary)
+        author_id = str(tweet.author_id) if tweet.author_id is not None else None
+        like_key = None
+        # Auto-like before replying (increases engagement)
+        if primary.auto_like:
+            self.outbox.enqueue('like', tweet.id, {'username': username, 'author_id': author_id}, urgency_level, score)
+            like_key = Outbox.key('like', tweet.id)
+        self.outbox.enqueue('reply', tweet.id, {'username': username, 'text': reply_text, 'author_id': author_id},
+                            urgency_level, score, depends_on=like_key)
+        return True
+    
+    def schedule_outbox(self, tweet_id=None):
+        """
+        Hand ready outbox actions (all of them, or one tweet's) to the rate-limited
+        scheduler. Returns how many were scheduled.
+        """
+        services = dict(ACTION_SERVICES)
+        if self.notify_mode == 'digest':
+            services.pop('notify')  # sent in batches by flush_digest
+        
+        with self._scheduled_lock:
+            rows = self.outbox.ready(services, exclude=self._scheduled, tweet_id=tweet_id)
+            for row in rows:
+                self._scheduled.add(row['key'])
+                priority = PriorityScheduler.priority(row['urgency_level'], row['score'])
+                self.scheduler.schedule(services[row['action']], priority, self.execute_action, row)
+        return len(rows)
+    
+    def execute_action(self, row):
+        """Run one outbox action and record the outcome"""
+        key = row['key']
+        payload = Outbox.payload(row)
+        if not self.claim_action(key):
+            return
         try:
-            end_time = datetime.now()
-            start_time = end_time - timedelta(minutes=time_window_minutes)
-            print(f"[*] Searching tweets from last {time_window_minutes} minutes...")
+            if row['action'] == 'notify':
+                profile = self.profile_by_name.get(payload.get('profile'), self.profiles[0])
+                done = self.send_whatsapp_notification(payload['message'], payload['author'], profile.notifier)
+            elif row['action'] == 'like':
+                done = self.like_tweet(row['tweet_id'], payload['username'])
+            elif self.authors is not None and payload.get('author_id') and not self.authors.can_reply(payload['author_id']):
+                # Another lead from this author was replied to since this one was queued
+                print(f"[i] Already replied to @{payload['username']} recently, skipping reply to tweet {row['tweet_id']}")
+                done = False
+            else:
+                done = self.send_auto_reply(row['tweet_id'], payload['username'], payload['text'])
+                if done and self.authors is not None and payload.get('author_id'):
+                    self.authors.record_reply(payload['author_id'], payload['username'])
+        except tweepy.errors.TooManyRequests as e:
+            # Nothing was done: hold the service and the action until X's window resets
+            reset_at = rate_limit_reset(e.response) or time.time() + self.outbox.retry_backoff
+            self.scheduler.buckets[ACTION_SERVICES[row['action']]].pause(reset_at - time.time())
+            self.outbox.defer(key, reset_at, '429 Too Many Requests')
+            print(f"[!] {key}: rate limited by X, deferred until {datetime.fromtimestamp(reset_at):%H:%M:%S}")
+        except OutcomeUnknown as e:
+            self.outbox.park(key, str(e))
+            print(f"[!] {key}: {e}, not retrying so it can't be posted twice (status 'unknown')")
+        except Exception as e:
+            self.outbox.fail(key, str(e))
+            print(f"[!] {key} failed ({e}), will retry")
+        else:
+            if done:
+                self.outbox.complete(key)
+            else:
+                self.outbox.fail(key, 'rejected', retry=False)
+        finally:
+            self.release_action(key)
+        
+        # A finished like releases the reply that waits on it
+        self.schedule_outbox(row['tweet_id'])
+    
+    def claim_action(self, key):
+        """
+        Take an outbox action for this worker: its claim token, then the pending ->
+        in_flight transition. False (and nothing to undo) if another worker has it.
+        """
+        if self.coordinator is not None and not self.coordinator.acquire(f"action:{key}", self.action_claim_seconds):
+            with self._scheduled_lock:
+                self._scheduled.discard(key)
+            return False
+        if self.outbox.start(key):
+            return True
+        self.release_action(key)
+        return False
+    
+    def release_action(self, key):
+        if self.coordinator:
+            self.coordinator.release(f"action:{key}")
+        with self._scheduled_lock:
+            self._scheduled.discard(key)
+    
+    def action_in_progress(self, key):
+        """Whether another worker is executing this outbox action right now"""
+        return self.coordinator.held(f"action:{key}")
+    
+    def flush_digest(self, window_seconds=0):
+        """Send pending notifications as one digest once the oldest is window_seconds old"""
+        oldest = self.outbox.oldest_pending('notify')
+        if oldest is None or time.time() - oldest < window_seconds:
+            return
+        
+        rows = self.outbox.ready(['notify'], limit=500)
+        # One digest per WhatsApp target
+        digests = {}
+        for row in rows:
+            profile = self.profile_by_name.get(Outbox.payload(row).get('profile'), self.profiles[0])
+            digests.setdefault(id(profile.notifier), (profile.notifier, []))[1].append(row)
+        
+        for notifier, rows in digests.values():
+            rows = [row for row in rows if self.outbox.start(row['key'])]
+            if not rows:
+                continue
+            try:
+                delivered = notifier.send_digest([Outbox.payload(row)['message'] for row in rows])
+            except Exception as e:
+                print(f"[X] Error sending WhatsApp digest: {e}")
+                delivered = False
+            for row in rows:
+                if delivered:
+                    self.outbox.complete(row['key'])
+                else:
+                    self.outbox.fail(row['key'], 'digest not delivered')
+    
+    def drain_outbox(self, timeout):
+        """
+        Execute ready outbox actions for up to `timeout` seconds. Anything still
+        pending (rate-limited, backing off after an error) stays in the outbox for later.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            self.wait_for_pipeline()
+            if self.notify_mode == 'digest':
+                self.flush_digest(self.digest_window)
+            self.schedule_outbox()
+            deferred = self.scheduler.drain(max(0, deadline - time.monotonic()))
+            self.wait_for_pipeline()
+            # Finished actions may have released dependents (reply after like); go round until none are left
+            with self._scheduled_lock:
+                in_progress = bool(self._scheduled)
+            if deferred or not in_progress or time.monotonic() >= deadline:
+                break
+        
+        pending = self.outbox.counts().get('pending', 0)
+        if pending:
+            print(f"[i] {pending} outbox actions pending (rate-limited or retrying), will resume later")
+    
+    def fetch_tweets(self, query, max_tweets, **search_params):
+        """
+        Page through search results, yielding (tweet, author) pairs as each page arrives.
+        Only the current page is held in memory; the next page is requested once it is consumed.
+        """
+        page_size = max(10, min(100, max_tweets))
+        search = self.client.search_recent_tweets
+        
+        @functools.wraps(search)  # Paginator picks its pagination parameter by method name
+        def search_page(*args, **kwargs):
+            with self._search_requests_lock:
+                self.search_requests += 1
+                if self.first_search_at is None:
+                    self.record_first_search()
+            with metrics.timer('twitter.search_recent_tweets'):
+                return search(*args, **kwargs)
+        
+        pages = tweepy.Paginator(
+            search_page,
+            query=query,
+            max_results=page_size,
+            tweet_fields=['created_at', 'author_id', 'public_metrics'],
+            expansions=['author_id'],
+            user_fields=['username', 'name'],
+            **search_params
+        )
+        
+        fetched = 0
+        for page_number, page in enumerate(pages, 1):
+            if not page.data:
+                break
             
-            tweets = self.client.search_recent_tweets(
-                query=query,
-                max_results=10,
-                start_time=start_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
-                tweet_fields=['created_at', 'author_id', 'public_metrics'],
-                expansions=['author_id'],
-                user_fields=['username', 'name']
-            )
+            print(f"[*] Page {page_number}: {len(page.data)} tweets")
+            users = {user.id: user for user in (page.includes or {}).get('users', [])}
             
-            if not tweets.data:
-                print("No new tweets found.")
+            for tweet in page.data:
+                author = users.get(tweet.author_id)
+                if self.archive:
+                    self.archive.capture(tweet, author)
+                yield tweet, author
+                fetched += 1
+                if fetched >= max_tweets:
+                    print(f"[i] Reached SEARCH_MAX_TWEETS cap ({max_tweets}), stopping pagination")
+                    return
+    
+    def record_first_search(self):
+        """Log time-to-first-search, the cold-start cost every --single-run pays"""
+        self.first_search_at = time.perf_counter() - PROCESS_STARTED
+        metrics.set_gauge('xscout_startup_seconds', round(self.first_search_at, 4), phase='first_search')
+        timings = self.startup_timings
+        print(f"[i] First search request {self.first_search_at:.2f}s after start "
+              f"(imports {timings['imports']:.2f}s, init {timings['init']:.2f}s, auth check {timings['auth']:.2f}s)")
+    
+    def needs_outreach_text(self, profiles=None):
+        """True when leads for these profiles (default: all) will get a WhatsApp DM suggestion or a public reply"""
+        return any(profile.notify_configured or profile.replies for profile in profiles or self.profiles)
+    
+    @staticmethod
+    def passes(analysis, min_score, unscored=True):
+        """
+        Whether a lead's score clears a stage threshold. Leads without AI always do;
+        leads the AI failed to score (scored=False) only when `unscored` is True, so a
+        Gemini outage still notifies but never likes or replies to every lead.
+        """
+        if not analysis:
+            return True
+        if analysis.get('scored') is False:
+            return unscored
+        return analysis.get('score') is None or analysis['score'] >= min_score
+    
+    def count_drop(self, stage):
+        with self._stage_drops_lock:
+            self.stage_drops[stage] += 1
+        metrics.inc('xscout_pipeline_drops_total', stage=stage)
+    
+    def report_stage_drops(self):
+        with self._stage_drops_lock:
+            drops = dict(self.stage_drops)
+        if drops:
+            print(f"[*] Dropped by stage: {drops.get('screen', 0)} by local checks, "
+                  f"{drops.get('notify', 0)} scored below NOTIFY_MIN_SCORE ({self.notify_min_score}), "
+                  f"{drops.get('outreach', 0)} without AI reply/DM (below {self.min_lead_score}), "
+                  f"{drops.get('reply', 0)} not liked/replied (below {self.reply_min_score})")
+    
+    def add_outreach(self, group, analyses, profile):
+        """
+        Last stage: AI-written reply and DM, in one request, only for the scored leads
+        that clear the threshold of the outreach they would actually get. The rest get
+        reply/dm set to None, so nothing generates them later either.
+        group: [(tweet, author, routes), ...] sharing primary `profile`
+        """
+        wanted = []
+        for i, ((tweet, author, routes), analysis) in enumerate(zip(group, analyses)):
+            profiles = [p for p, _ in routes]
+            dm = any(p.notify_configured for p in profiles) and self.passes(analysis, self.min_lead_score, unscored=False)
+            reply = profile.replies and self.passes(analysis, self.reply_min_score, unscored=False)
+            analyses[i] = dict(analysis, reply=None, dm=None)
+            if not self.passes(analysis, self.notify_min_score):
+                continue  # dropped altogether by process_tweet
+            if dm or reply:
+                wanted.append((i, dm))
+            elif self.needs_outreach_text(profiles):
+                self.count_drop('outreach')
+        
+        if wanted:
+            print(f"[*] AI writing reply + DM for {len(wanted)} of {len(group)} leads in one request"
+                  f"{self.profile_suffix([profile])}...")
+            batch = [
+                {'text': group[i][0].text, 'username': group[i][1].username if group[i][1] else 'unknown'}
+                for i, _ in wanted
+            ]
+            with self.stage_limits['ai']:
+                texts = self.ai_helper.outreach_for_leads(batch, profile.portfolio_url)
+            for (i, dm), text in zip(wanted, texts):
+                analyses[i].update(reply=text.get('reply'), dm=text.get('dm') if dm else None)
+        return analyses
+    
+    def submit(self, fn, *args, stage='pipeline'):
+        """Run fn on the stage's pool. Errors are contained to that one job."""
+        def isolated():
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"[X] Error in {fn.__name__}: {e}")
+        
+        future = self.stage_pools[stage].submit(isolated)
+        with self._pending_lock:
+            self._pending.add(future)
+        # Finished jobs are forgotten straight away, so long replays don't pile up futures
+        future.add_done_callback(self._job_done)
+        return future
+    
+    def _job_done(self, future):
+        with self._pending_lock:
+            self._pending.discard(future)
+    
+    def wait_for_pipeline(self):
+        """Block until all submitted work, including jobs submitted by other jobs, has finished"""
+        while True:
+            with self._pending_lock:
+                pending = list(self._pending)
+            if not pending:
                 return
+            wait(pending)
+    
+    def finish_cycle(self):
+        """Wait for lead processing, then give outbox actions up to drain_timeout to go out"""
+        self.wait_for_pipeline()
+        if not self.dry_run:
+            self.drain_outbox(self.drain_timeout)
+    
+    def process_batch(self, leads):
+        """Hand a batch of (tweet, author) pairs to the pipeline"""
+        if leads:
+            self.submit(self.analyze_batch, leads, stage=self.analysis_stage())
+    
+    def analysis_stage(self):
+        """analyze_batch spends its time in AI requests when AI is on"""
+        return 'ai' if self.ai_enabled and self.ai_helper and self.ai_helper.enabled else 'pipeline'
+    
+    def analyze_batch(self, leads):
+        """
+        Score a batch in one AI request, then write replies and DMs for the leads that
+        score high enough in one more request per primary profile (they pitch that
+        profile's portfolio), then fan each lead out to its own job
+        """
+        groups = {}
+        for tweet, author in leads:
+            routes = self.route(tweet)
+            groups.setdefault(self.primary_profile(routes).name, []).append((tweet, author, routes))
+        
+        for name, group in groups.items():
+            analyses = [None] * len(group)
+            if self.ai_enabled and self.ai_helper and self.ai_helper.enabled:
+                batch = [
+                    {'text': tweet.text, 'username': author.username if author else 'unknown'}
+                    for tweet, author, _ in group
+                ]
+                print(f"\n[*] AI scoring {len(group)} leads in one request...")
+                with self.stage_limits['ai']:
+                    analyses = self.ai_helper.score_leads(batch)
+                analyses = self.add_outreach(group, analyses, self.profile_by_name[name])
             
-            users = {user.id: user for user in tweets.includes.get('users', [])}
+            for (tweet, author, routes), analysis in zip(group, analyses):
+                self.submit(self.process_tweet, tweet, author, routes, analysis)
+    
+    def process_tweet(self, tweet, author, routes=None, analysis=None):
+        username = author.username if author else 'unknown'
+        tweet_url = f"https://twitter.com/{username}/status/{tweet.id}"
+        routes = routes or self.route(tweet)
+        primary = self.primary_profile(routes)
+        matched_keywords = list(dict.fromkeys(keyword for _, keywords in routes for keyword in keywords))
+        
+        print(f"\n[>] Found tweet by @{username}:")
+        print(f"   {tweet.text[:100]}...")
+        print(f"   {tweet_url}")
+        if matched_keywords:
+            print(f"   Matched: {', '.join(matched_keywords)}{self.profile_suffix([profile for profile, _ in routes])}")
+        
+        urgency = "medium"  # Default urgency
+        score = None  # AI score (if available)
+        
+        if self.ai_enabled and self.ai_helper and self.ai_helper.enabled:
+            if analysis is None:
+                print(f"[*] AI analyzing lead quality...")
+                with self.stage_limits['ai']:
+                    analysis = self.ai_helper.score_lead(tweet.text, username)
+                analysis = self.add_outreach([(tweet, author, routes)], [analysis], primary)[0]
+            urgency = analysis.get('urgency', 'medium')
+            score = analysis.get('score')
+            urgency_emoji = {"high": "🔥", "medium": "⚡", "low": "📌"}
+            emoji = urgency_emoji.get(urgency.lower(), "⚡")
             
-            for tweet in tweets.data:
-                if tweet.id in self.seen_tweets:
-                    continue
-                
+            print(f"[AI] Score: {score}/10 | Urgency: {emoji} {urgency.upper()}")
+            print(f"[AI] {analysis['reason']}")
+            if (self.authors is not None and tweet.author_id is not None and not self.dry_run
+                    and analysis.get('scored') is not False):
+                self.authors.record_score(tweet.author_id, author.username if author else None, score)
+        
+        below_min = not self.passes(analysis, self.notify_min_score)
+        if self.results:
+            profiles = [profile.name for profile, _ in routes] if len(self.profiles) > 1 else None
+            self.record_result(tweet, username, 'below_min_score' if below_min else 'lead',
+                               matched_keywords, analysis, profiles)
+        if below_min:
+            print(f"[-] Score {score} is below NOTIFY_MIN_SCORE ({self.notify_min_score}), dropping lead")
+            self.count_drop('notify')
+            metrics.inc('xscout_tweets_total', outcome='below_min_score')
+            self.release_author(tweet)
+            if not self.dry_run:
                 self.seen_tweets.add(tweet.id)
+            self.finish_tweet(tweet, handled=not self.dry_run)
+            return
+        if self.dry_run:
+            print(f"[i] Dry run: skipping notification, like and reply for @{username}")
+            self.release_author(tweet)
+            self.finish_tweet(tweet, handled=False)
+            return
+        
+        # Notify every lead that got this far. Actions are journaled before the tweet
+        # counts as seen, so a crash in between re-processes the lead instead of losing it.
+        contacted = self.enqueue_actions(tweet, username, tweet_url, urgency, score, analysis, routes)
+        if contacted and self.authors is not None and tweet.author_id is not None:
+            self.authors.record_contact(tweet.author_id, author.username if author else None)
+        self.release_author(tweet)
+        self.seen_tweets.add(tweet.id)
+        self.finish_tweet(tweet)
+        self.schedule_outbox(tweet.id)
+    
+    def release_author(self, tweet):
+        if self.authors is not None and tweet.author_id is not None:
+            self.authors.release(tweet.author_id)
+    
+    def claim_tweet(self, tweet):
+        """Take this tweet's claim token, so no other worker scores or acts on it"""
+        return self.coordinator is None or self.coordinator.acquire(f"tweet:{tweet.id}", self.tweet_claim_seconds)
+    
+    def finish_tweet(self, tweet, handled=True):
+        """
+        Keep a handled tweet's claim for as long as tweets count as seen, so workers
+        that don't share this state DB skip it too; otherwise hand it back
+        """
+        if self.coordinator is None:
+            return
+        if handled:
+            self.coordinator.acquire(f"tweet:{tweet.id}", self.tweet_done_seconds)
+        else:
+            self.coordinator.release(f"tweet:{tweet.id}")
+    
+    def record_result(self, tweet, username, outcome, matched_keywords=None, analysis=None, profiles=None):
+        """Append one tweet's outcome (and AI verdict, for leads) to the results file"""
+        record = {
+            'id': str(tweet.id),
+            'author': username,
+            'text': tweet.text,
+            'outcome': outcome,
+            'matched': matched_keywords or [],
+        }
+        if profiles:
+            record['profiles'] = profiles
+        if analysis:
+            record.update({key: analysis.get(key) for key in ('score', 'reason', 'urgency', 'urgency_level', 'reply', 'dm')})
+        self.results.write(record)
+    
+    def screen_tweet(self, tweet, author=None, check_seen=True):
+        """
+        Cheap local checks before a tweet costs any AI call. Returns why it was
+        dropped ('already_seen', 'prefiltered', 'near_duplicate', 'author_blocked',
+        'author_cooldown', 'author_low_score', 'claimed_elsewhere') or None for a lead.
+        A lead comes back claimed for this worker; process_tweet finishes the claim.
+        """
+        outcome = None
+        if check_seen and tweet.id in self.seen_tweets:
+            outcome = 'already_seen'
+        
+        # Cheap local rules first - every rejection here saves an AI call
+        rejected_by = self.prefilter.check(tweet.text) if self.prefilter and not outcome else None
+        if rejected_by:
+            print(f"[-] Pre-filter rejected tweet {tweet.id} ({rejected_by})")
+            outcome = 'prefiltered'
+        
+        # Reposts and lightly edited copies collapse onto the first tweet seen
+        duplicate_of = self.near_dupes.check(tweet.id, tweet.text) if self.near_dupes and not outcome else None
+        if duplicate_of:
+            print(f"[-] Tweet {tweet.id} is a near-duplicate of {duplicate_of}, skipping")
+            outcome = 'near_duplicate'
+        
+        # Known authors: blocked, recently contacted, or scored as junk before - no need to ask the AI again
+        author_id = getattr(tweet, 'author_id', None)
+        if self.authors is not None and author_id is not None and not outcome:
+            skip = self.authors.skip_reason(author_id, check_history=check_seen)
+            if not skip and check_seen and not self.authors.claim(author_id):
+                skip = 'author_cooldown'  # another of their tweets is already in the pipeline
+            if skip:
+                print(f"[-] Skipping tweet {tweet.id} by @{author.username if author else author_id} ({skip})")
+                self.authors.count_skip(skip)
+                outcome = skip
+        
+        # Last, because it may be a network call: another worker may have this tweet already
+        if check_seen and not outcome and not self.claim_tweet(tweet):
+            print(f"[-] Tweet {tweet.id} is being handled by another worker, skipping")
+            self.release_author(tweet)
+            outcome = 'claimed_elsewhere'
+        
+        if outcome:
+            metrics.inc('xscout_tweets_total', outcome=outcome)
+            if outcome not in ('already_seen', 'claimed_elsewhere'):
+                self.count_drop('screen')
+                if not self.dry_run:
+                    self.seen_tweets.add(tweet.id)
+                if self.results:
+                    self.record_result(tweet, author.username if author else 'unknown', outcome)
+        return outcome
+    
+    def search_window(self, shard, time_window_minutes):
+        """
+        Search params for a shard, so consecutive polls neither overlap nor leave gaps:
+        its since_id checkpoint if fresh, else from where its previous poll ended,
+        else the last `time_window_minutes`. Ranges that earlier polls skipped at
+        SEARCH_MAX_TWEETS are searched separately (see search_backlog).
+        """
+        # Recent search rejects ids and times older than 7 days, so stale checkpoints are ignored
+        since_id = self.state.get_checkpoint(f'since_id:{shard.id}', max_age_seconds=6 * 86400)
+        if since_id:
+            print(f"[*] [{shard.id}] Searching tweets newer than checkpoint {since_id}...")
+            params = {'since_id': since_id}
+        else:
+            searched_until = self.state.get_checkpoint(f'searched_until:{shard.id}', max_age_seconds=6 * 86400)
+            if searched_until:
+                start_time = datetime.fromtimestamp(float(searched_until) - INDEXING_LAG_SECONDS, timezone.utc)
+                print(f"[*] [{shard.id}] Searching tweets since previous poll ({start_time:%H:%M:%S} UTC)...")
+            else:
+                start_time = datetime.now(timezone.utc) - timedelta(minutes=time_window_minutes)
+                print(f"[*] [{shard.id}] Searching tweets from last {time_window_minutes} minutes...")
+            params = {'start_time': start_time.strftime('%Y-%m-%dT%H:%M:%SZ')}
+        return params
+    
+    def search_backlog(self, shard, report=True):
+        """
+        Ranges earlier polls of this shard skipped when they hit SEARCH_MAX_TWEETS,
+        newest first. Each keeps that poll's lower bound (since_id or start_time) and
+        until_id, the oldest tweet it got; ranges X's 7-day search no longer covers are dropped.
+        """
+        value = self.state.get_checkpoint(f'backlog:{shard.id}')
+        backlog = json.loads(value) if value else []
+        live = [gap for gap in backlog if time.time() - gap['at'] < 6 * 86400]
+        if report and len(live) < len(backlog):
+            print(f"[!] [{shard.id}] {len(backlog) - len(live)} skipped ranges are too old for recent search, giving up on them")
+        return live
+    
+    @staticmethod
+    def backlog_params(gap):
+        params = {'until_id': gap['until_id']}
+        if gap.get('since_id'):
+            params['since_id'] = gap['since_id']
+        else:
+            params['start_time'] = gap['start_time']
+        return params
+    
+    def fetch_all(self, shards, time_window_minutes, failed_shards, batch_size=10, shard_runs=None):
+        """
+        Run every shard's paginated search concurrently and yield lists of
+        (shard, tweet, author) as results arrive: each list holds whatever is
+        already available, up to `batch_size`. Tweets already yielded by another
+        shard are dropped. Shards whose search raised are added to `failed_shards`.
+        
+        A shard first searches for new tweets, then spends whatever is left of its
+        SEARCH_MAX_TWEETS budget on its backlog. Each search that completes is listed
+        in `shard_runs[shard.id]` for advance_checkpoints.
+        """
+        results = queue.Queue(maxsize=100)
+        stop = threading.Event()
+        done = object()
+        
+        def put(item):
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def worker(shard):
+            try:
+                budget = self.search_max_tweets
+                backlog = self.search_backlog(shard)
+                searches = [(None, self.search_window(shard, time_window_minutes))]
+                searches += [(gap, self.backlog_params(gap)) for gap in backlog]
+                for gap, params in searches:
+                    if budget <= 0:
+                        print(f"[i] [{shard.id}] New tweets used this poll's SEARCH_MAX_TWEETS budget, "
+                              f"{len(backlog)} skipped ranges wait for a quieter poll")
+                        break
+                    if gap:
+                        print(f"[*] [{shard.id}] Catching up on tweets older than {gap['until_id']} "
+                              f"skipped by an earlier SEARCH_MAX_TWEETS cap...")
+                    run = {'gap': gap, 'params': params, 'fetched': 0, 'newest': None, 'oldest': None}
+                    for tweet, author in self.fetch_tweets(shard.query, budget, **params):
+                        run['fetched'] += 1
+                        run['newest'] = max(run['newest'] or 0, int(tweet.id))
+                        run['oldest'] = min(run['oldest'] or int(tweet.id), int(tweet.id))
+                        if not put((shard, tweet, author)):
+                            return
+                    run['capped'] = run['fetched'] >= budget
+                    budget -= run['fetched']
+                    if gap:
+                        backlog.remove(gap)
+                    if shard_runs is not None:
+                        shard_runs.setdefault(shard.id, []).append(run)
+            except Exception as e:
+                put((shard, e, None))
+            finally:
+                put((shard, done, None))
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.search_concurrency, len(shards))))
+        for shard in shards:
+            executor.submit(worker, shard)
+        
+        yielded_ids = set()
+        remaining = len(shards)
+        try:
+            while remaining:
+                batch = []
+                # Block for the first result, then take whatever else has already arrived
+                item = results.get()
+                while True:
+                    shard, tweet, author = item
+                    if tweet is done:
+                        remaining -= 1
+                    elif isinstance(tweet, Exception):
+                        failed_shards.add(shard.id)
+                        if isinstance(tweet, tweepy.errors.TooManyRequests):
+                            reset_at = rate_limit_reset(tweet.response)
+                            until = f" until {datetime.fromtimestamp(reset_at):%H:%M:%S}" if reset_at else ""
+                            print(f"[!] [{shard.id}] Search rate limited by X{until}, retrying next poll")
+                        elif isinstance(tweet, tweepy.errors.TweepyException):
+                            print(f"[X] [{shard.id}] Twitter API Error: {tweet}")
+                        else:
+                            print(f"[X] [{shard.id}] Error: {tweet}")
+                    elif tweet.id not in yielded_ids:
+                        yielded_ids.add(tweet.id)
+                        batch.append(item)
+                    
+                    if len(batch) >= batch_size or not remaining:
+                        break
+                    try:
+                        item = results.get_nowait()
+                    except queue.Empty:
+                        break
                 
-                author = users.get(tweet.author_id)
-                username = author.username if author else 'unknown'
-                tweet_url = f"https://twitter.com/{username}/status/{tweet.id}"
-                
-                print(f"\n[>] Found tweet by @{username}:")
-                print(f"   {tweet.text[:100]}...")
-                print(f"   {tweet_url}")
-                
-                urgency = "medium"  # Default urgency
-                score = None  # AI score (if available)
-                
-                if self.ai_enabled and self.ai_helper and self.ai_helper.enabled:
-                    print(f"[*] AI analyzing lead quality...")
-                    lead_score = self.ai_helper.score_lead(tweet.text, username)
-                    urgency = lead_score.get('urgency', 'medium')
-                    score = lead_score.get('score')
-                    urgency_emoji = {"high": "🔥", "medium": "⚡", "low": "📌"}
-                    emoji = urgency_emoji.get(urgency.lower(), "⚡")
+                if batch:
+                    yield batch
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
+    
+    @timed('search_tweets')
+    def search_tweets(self, time_window_minutes=60):
+        """Run one poll over every query shard. Returns the number of new leads."""
+        poll_started = time.time()
+        print(f"[*] Searching for {len(self.keywords)} keywords:")
+        for i, keyword in enumerate(self.keywords, 1):
+            print(f"    {i}. '{keyword.strip()}'")
+        
+        shards = plan_queries(self.keywords, QUERY_SUFFIX, self.max_query_length)
+        print(f"[*] Query plan: {len(shards)} quer{'y' if len(shards) == 1 else 'ies'} (max {self.max_query_length} chars)")
+        for shard in shards:
+            print(f"    [{shard.id}] {len(shard.keywords)} keywords: {shard.query[:200]}")
+        shards = self.lease_shards(shards)
+        
+        # Pick up actions a previous run left pending before new leads queue behind them
+        resumed = 0 if self.dry_run else self.schedule_outbox()
+        if resumed:
+            print(f"[*] Outbox: resuming {resumed} pending actions from an earlier run")
+        
+        found = 0
+        leads = 0
+        try:
+            failed_shards = set()
+            shard_runs = {}
+            
+            # Tweets are handled as they stream in from all shards, a page at a time
+            batches = self.fetch_all(shards, time_window_minutes, failed_shards, self.score_batch_size, shard_runs)
+            for batch in batches:
+                found += len(batch)
+                new_leads = []
+                for shard, tweet, author in batch:
+                    if self.screen_tweet(tweet, author):
+                        continue
                     
-                    print(f"[AI] Score: {score}/10 | Urgency: {emoji} {urgency.upper()}")
-                    print(f"[AI] {lead_score['reason']}")
+                    metrics.inc('xscout_tweets_total', outcome='lead')
+                    new_leads.append((tweet, author))
                 
-                # Send notification for ALL leads (no filtering)
-                self.send_whatsapp_notification(tweet.text, tweet_url, username, urgency, score)
-                self.send_auto_reply(tweet.id, username, tweet.text)
+                leads += len(new_leads)
+                self.process_batch(new_leads)
+            
+            # Leads finish in parallel; checkpoints only move once all of them are done
+            self.finish_cycle()
+            metrics.observe('xscout_leads_per_cycle', leads, buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000))
+            
+            # Only completed searches move checkpoints, so a failed one retries its window
+            if not self.dry_run:
+                for shard in shards:
+                    if shard_runs.get(shard.id):
+                        self.advance_checkpoints(shard, shard_runs[shard.id], poll_started)
+            
+            if not found:
+                print("No new tweets found.")
+                return leads
+            
+            print(f"[*] Processed {found} tweets from search")
+            if self.prefilter:
+                self.prefilter.report()
+            if self.near_dupes:
+                self.near_dupes.report()
+            if self.authors is not None:
+                self.authors.report()
+            self.report_stage_drops()
+            if self.ai_helper and self.ai_helper.classifier:
+                self.ai_helper.classifier.report()
+            if self.ai_helper and self.ai_helper.cache:
+                self.ai_helper.cache.report()
         
         except tweepy.errors.TweepyException as e:
             print(f"[X] Twitter API Error: {e}")
         except Exception as e:
             print(f"[X] Error: {e}")
+        finally:
+            self.wait_for_pipeline()
+        return leads
+    
+    def advance_checkpoints(self, shard, runs, poll_started):
+        """
+        Move a shard's checkpoints past this poll's completed searches (see fetch_all).
+        The new-tweets search always moves since_id to the newest tweet. If it stopped
+        at SEARCH_MAX_TWEETS, the range it didn't reach - its lower bound up to the
+        oldest tweet it got - joins the backlog. A backlog range that was searched
+        without hitting the cap is done; one that hit it shrinks to below its oldest tweet.
+        """
+        backlog = self.search_backlog(shard, report=False)
+        fresh = runs[0] if runs[0]['gap'] is None else None
+        for run in runs:
+            if run['gap'] is None:
+                continue
+            gap = next((gap for gap in backlog if gap['until_id'] == run['gap']['until_id']), None)
+            if gap is None:
+                continue
+            if run['capped']:
+                gap['until_id'] = run['oldest']
+            else:
+                backlog.remove(gap)
+                print(f"[+] [{shard.id}] Caught up on tweets skipped by an earlier SEARCH_MAX_TWEETS cap")
+        
+        if fresh:
+            if fresh['capped']:
+                lower = {key: fresh['params'][key] for key in ('since_id', 'start_time') if key in fresh['params']}
+                backlog.insert(0, dict(lower, until_id=fresh['oldest'], at=poll_started))
+                print(f"[i] [{shard.id}] Hit the SEARCH_MAX_TWEETS cap ({self.search_max_tweets}): "
+                      f"tweets older than {fresh['oldest']} will be fetched by later polls")
+            if fresh['newest']:
+                self.state.set_checkpoint(f'since_id:{shard.id}', fresh['newest'])
+            self.state.set_checkpoint(f'searched_until:{shard.id}', poll_started)
+        
+        if backlog:
+            self.state.set_checkpoint(f'backlog:{shard.id}', json.dumps(backlog))
+        else:
+            self.state.delete_checkpoint(f'backlog:{shard.id}')
+    
+    def lease_shards(self, shards):
+        """
+        The shards this worker holds (or renews) the search lease for. The rest are
+        being searched by another worker; new tweets there reach us only if it dies.
+        """
+        if self.coordinator is None:
+            return shards
+        mine = []
+        for shard in shards:
+            name = f"search:{shard.id}"
+            if self.coordinator.acquire(name, self.search_lease_seconds):
+                self._search_leases.add(name)
+                mine.append(shard)
+            else:
+                self._search_leases.discard(name)
+        if len(mine) < len(shards):
+            print(f"[i] {len(shards) - len(mine)}/{len(shards)} queries are being searched by another worker, skipping them")
+        return mine
+    
+    def release_search_leases(self):
+        """Give up search leases on exit, so the next run or another worker can take over straight away"""
+        if self.coordinator:
+            for name in list(self._search_leases):
+                self.coordinator.release(name)
+        self._search_leases.clear()
+    
+    def replay(self, path):
+        """
+        Stream an archive (see --capture) through the same screen/score/notify stages.
+        The file is read a line at a time and at most a few batches are in flight, so
+        memory stays flat for multi-GB archives. Keywords are re-matched locally, so
+        new KEYWORDS can be tried against old traffic.
+        """
+        print(f"[*] Replaying {path}" + (" (dry run: no notifications, likes or replies)" if self.dry_run else ""))
+        if self.near_dupes:
+            # Replay runs far faster than real time, so bound the window by count instead
+            self.near_dupes = NearDuplicateDetector(
+                window_seconds=self.near_dupes.window,
+                max_distance=self.near_dupes.max_distance,
+                max_entries=int(os.getenv('REPLAY_NEAR_DUP_MAX_ENTRIES', '50000'))
+            )
+        
+        slots = threading.BoundedSemaphore(self.pipeline_workers * 2)
+        
+        def analyze_replay_batch(leads):
+            try:
+                self.analyze_batch(leads)
+            finally:
+                slots.release()
+        
+        read = 0
+        outcomes = Counter()
+        batch = []
+        try:
+            for tweet, author in read_archive(path):
+                read += 1
+                matched = self.keyword_matcher.find(tweet.text)
+                if not matched:
+                    outcome = 'no_keyword'
+                    if self.results:
+                        self.record_result(tweet, author.username if author else 'unknown', outcome)
+                else:
+                    # A dry run leaves seen state alone, so already handled leads are re-scored
+                    outcome = self.screen_tweet(tweet, author, check_seen=not self.dry_run) or 'lead'
+                outcomes[outcome] += 1
+                if outcome != 'lead':
+                    continue
+                
+                batch.append((tweet, author))
+                if len(batch) >= self.score_batch_size:
+                    slots.acquire()
+                    self.submit(analyze_replay_batch, batch, stage=self.analysis_stage())
+                    batch = []
+                if read % 10000 == 0:
+                    print(f"[*] Replayed {read} tweets...")
+            
+            if batch:
+                slots.acquire()
+                self.submit(analyze_replay_batch, batch, stage=self.analysis_stage())
+            
+            self.finish_cycle()
+        except KeyboardInterrupt:
+            print("\n[!] Replay interrupted")
+        finally:
+            self.wait_for_pipeline()
+        
+        print(f"[*] Replayed {read} tweets: " + ', '.join(f"{count} {outcome}" for outcome, count in outcomes.most_common()))
+        if self.prefilter:
+            self.prefilter.report()
+        if self.near_dupes:
+            self.near_dupes.report()
+        if self.authors is not None:
+            self.authors.report()
+        self.report_stage_drops()
+        if self.ai_helper and self.ai_helper.classifier:
+            self.ai_helper.classifier.report()
+        if self.ai_helper and self.ai_helper.cache:
+            self.ai_helper.cache.report()
+        if self.results:
+            print(f"[+] {self.results.written} results written to {self.results.path}")
     
     def run(self, interval=60):
-        """Run continuously with a specified interval"""
+        """
+        Run continuously. With POLL_ADAPTIVE the wait between polls starts at `interval`
+        and adapts to lead yield and remaining search quota; otherwise it stays fixed.
+        """
         print("[*] XScout Bot Started!")
-        print(f"[*] Checking every {interval} seconds...")
+        if self.poll_adaptive:
+            poller = AdaptivePoller(interval, self.poll_min_interval, self.poll_max_interval)
+            print(f"[*] Checking every {poller.min_interval:.0f}-{poller.max_interval:.0f} seconds "
+                  f"(adaptive, starting at {interval})...")
+        else:
+            print(f"[*] Checking every {interval} seconds...")
         print("Press Ctrl+C to stop\n")
         
+        self.serve_metrics()
+        
         try:
             while True:
                 timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 print(f"\n[{timestamp}] Running search...")
-                self.search_tweets(time_window_minutes=60)
-                print(f"[-] Sleeping for {interval} seconds...")
-                time.sleep(interval)
+                requests_before = self.search_requests
+                leads = self.search_tweets(time_window_minutes=60)
+                remaining, reset_in = self.search_quota.status()
+                if not self.poll_adaptive:
+                    if not remaining and reset_in > interval:
+                        print(f"[-] Search quota used up, sleeping {reset_in:.0f} seconds until it resets...")
+                        time.sleep(reset_in)
+                    else:
+                        print(f"[-] Sleeping for {interval} seconds...")
+                        time.sleep(interval)
+                    continue
+                delay, reason = poller.next_interval(leads, self.search_requests - requests_before, remaining, reset_in)
+                metrics.set_gauge('xscout_poll_interval_seconds', delay)
+                print(f"[-] Sleeping for {delay:.0f} seconds ({reason})...")
+                time.sleep(delay)
         except KeyboardInterrupt:
             print("\n\n[*] XScout Bot stopped.")
+        finally:
+            self.release_search_leases()
+    
+    def serve_metrics(self):
+        """Start the Prometheus endpoint for long-running modes, if configured"""
+        if self.metrics_port:
+            try:
+                metrics.serve(self.metrics_port)
+            except OSError as e:
+                print(f"[!] Could not start metrics endpoint on port {self.metrics_port}: {e}")
+    
+    def handle_stream_tweet(self, tweet, author):
+        """Screen a streamed tweet and queue it for the next AI batch"""
+        if tweet.created_at:
+            lag = (datetime.now(tweet.created_at.tzinfo) - tweet.created_at).total_seconds()
+            metrics.observe('xscout_stream_lag_seconds', max(0.0, lag), buckets=(0.5, 1, 2, 5, 10, 30, 60, 300))
+        if self.archive:
+            self.archive.capture(tweet, author)
+        if self.screen_tweet(tweet, author):
+            return
+        metrics.inc('xscout_tweets_total', outcome='lead')
+        
+        with self._stream_batch_lock:
+            self._stream_batch.append((tweet, author))
+            full = len(self._stream_batch) >= self.score_batch_size
+            if len(self._stream_batch) == 1 and not full:
+                timer = threading.Timer(self.stream_batch_seconds, self.flush_stream_batch)
+                timer.daemon = True
+                timer.start()
+        if full:
+            self.flush_stream_batch()
+    
+    def flush_stream_batch(self):
+        with self._stream_batch_lock:
+            leads, self._stream_batch = self._stream_batch, []
+        self.process_batch(leads)
+    
+    def stream_upkeep(self, stopped, interval=30):
+        """While streaming: release outbox retries that came due and send digests as their window closes"""
+        while not stopped.wait(interval):
+            if self.notify_mode == 'digest':
+                self.flush_digest(self.digest_window)
+            self.schedule_outbox()
+    
+    def stream(self):
+        """
+        Real-time mode: consume X's filtered stream (rules built from KEYWORDS and the
+        exclusion list) and push each tweet through the same screen/score/notify
+        pipeline within seconds. Needs an app with filtered-stream access.
+        """
+        print("[*] XScout Stream Started!")
+        print("Press Ctrl+C to stop\n")
+        self.serve_metrics()
+        
+        resumed = 0 if self.dry_run else self.schedule_outbox()
+        if resumed:
+            print(f"[*] Outbox: resuming {resumed} pending actions from an earlier run")
+        
+        rules = build_stream_rules(self.keywords, QUERY_SUFFIX, self.max_query_length)
+        self.lead_stream = LeadStream(
+            self.bearer_token,
+            self.handle_stream_tweet,
+            api_base=self.stream_api_base,
+            backoff=Backoff(
+                initial=float(os.getenv('STREAM_BACKOFF_SECONDS', '1')),
+                maximum=float(os.getenv('STREAM_BACKOFF_MAX_SECONDS', '320'))
+            )
+        )
+        params = {}
+        if self.stream_backfill_minutes:
+            # Recovers tweets missed while reconnecting (Pro access and above)
+            params['backfill_minutes'] = self.stream_backfill_minutes
+        
+        stopped = threading.Event()
+        if not self.dry_run:
+            threading.Thread(target=self.stream_upkeep, args=(stopped,), daemon=True).start()
+        
+        try:
+            self.lead_stream.sync_rules(rules)
+            self.lead_stream.run(**params)
+        except KeyboardInterrupt:
+            self.lead_stream.stop()
+        except tweepy.errors.TweepyException as e:
+            print(f"[X] Twitter API Error: {e}")
+        finally:
+            stopped.set()
+            self.flush_stream_batch()
+            self.finish_cycle()
+            self.wait_for_pipeline()
+            print("\n[*] XScout Stream stopped.")
+    
+    @staticmethod
+    def open_score_log():
+        return ScoreLog(
+            os.getenv('AI_SCORE_LOG_DB') or os.getenv('AI_CACHE_DB', 'xscout_ai_cache.db'),
+            max_rows=int(os.getenv('AI_SCORE_LOG_MAX_ROWS', '50000'))
+        )
+    
+    @staticmethod
+    def classifier_band():
+        """Lead probabilities between these two go to Gemini; outside them the local classifier decides"""
+        return float(os.getenv('LOCAL_CLASSIFIER_LOW', '0.2')), float(os.getenv('LOCAL_CLASSIFIER_HIGH', '0.8'))
+    
+    @classmethod
+    def train_classifier(cls):
+        """Retrain the local classifier from the logged Gemini scores and print how well it agrees"""
+        low, high = cls.classifier_band()
+        model = train_from_log(
+            cls.open_score_log(),
+            lead_score=int(os.getenv('LOCAL_CLASSIFIER_LEAD_SCORE') or os.getenv('AI_MIN_LEAD_SCORE') or '7'),
+            low=low,
+            high=high,
+            min_examples=int(os.getenv('LOCAL_CLASSIFIER_MIN_EXAMPLES', '200'))
+        )
+        return model is not None
+    
+    def flag_author(self, who, flag):
+        """Block, allow-list or (flag=None) unflag an author given as @username or numeric id"""
+        if self.authors is None:
+            print("[X] Author index is disabled (AUTHOR_INDEX_ENABLED=false)")
+            return False
+        who = who.strip().lstrip('@')
+        author_id, username = (int(who), None) if who.isdigit() else (None, who)
+        if author_id is None:
+            known = self.authors.find_by_username(username)
+            if known:
+                author_id = known['author_id']
+            else:
+                try:
+                    user = self.client.get_user(username=username).data
+                except Exception as e:
+                    print(f"[X] Could not look up @{username}: {e}")
+                    return False
+                if user is None:
+                    print(f"[X] No such user: @{username}")
+                    return False
+                author_id = user.id
+        self.authors.set_flag(author_id, username, flag)
+        print(f"[+] Author {'@' + username if username else author_id} is now {flag or 'unflagged'}")
+        return True
     
     def run_once(self):
         """Run a single search (for GitHub Actions)"""
         print(f"[*] XScout Single Run Started at {datetime.now()}")
-        self.search_tweets(time_window_minutes=15)
+        self.search_lease_seconds = min(self.search_lease_seconds, self.single_run_lease_seconds)
+        try:
+            self.search_tweets(time_window_minutes=15)
+        finally:
+            self.release_search_leases()
+        if self.metrics_summary_file:
+            metrics.write_summary(self.metrics_summary_file)
         print(f"[*] XScout Single Run Completed at {datetime.now()}")
 
 if __name__ == "__main__":
@@ -308,12 +1587,69 @@ if __name__ == "__main__":
                         help='Run once and exit (for GitHub Actions)')
     parser.add_argument('--interval', type=int, default=300,
                         help='Check interval in seconds for continuous mode (default: 300)')
+    parser.add_argument('--clear-ai-cache', action='store_true',
+                        help='Invalidate all cached AI results before running')
+    parser.add_argument('--stream', action='store_true',
+                        help='Consume the filtered stream in real time instead of polling search')
+    parser.add_argument('--replay', metavar='ARCHIVE',
+                        help='Stream tweets from an archive (.jsonl or .jsonl.gz) through the pipeline instead of searching')
+    parser.add_argument('--dry-run', action=argparse.BooleanOptionalAction, default=None,
+                        help='Score leads without notifying, liking or replying (default: on for --replay)')
+    parser.add_argument('--output', metavar='FILE',
+                        help='Append each tweet\'s outcome and AI verdict to this JSON Lines file')
+    parser.add_argument('--capture', metavar='ARCHIVE',
+                        help='Append every fetched tweet and its author to this archive (same format --replay reads)')
+    parser.add_argument('--train-classifier', action='store_true',
+                        help='Retrain the local lead classifier from logged Gemini scores, print its evaluation and exit')
+    parser.add_argument('--block-author', metavar='USER',
+                        help='Never process leads from this @username or author id, then exit')
+    parser.add_argument('--allow-author', metavar='USER',
+                        help='Exempt this @username or author id from author cooldowns and low-score skips, then exit')
+    parser.add_argument('--unflag-author', metavar='USER',
+                        help='Clear a block or allow flag, then exit')
     
     args = parser.parse_args()
     
+    if args.dry_run is not None:
+        os.environ['DRY_RUN'] = str(args.dry_run).lower()
+    elif args.replay:
+        os.environ['DRY_RUN'] = 'true'
+    if args.capture:
+        # Takes the place of CAPTURE_ARCHIVE, so XScout opens only this archive
+        os.environ['CAPTURE_ARCHIVE'] = args.capture
+    
+    if args.train_classifier:
+        sys.exit(0 if XScout.train_classifier() else 1)
+    
     bot = XScout()
     
-    if args.single_run:
-        bot.run_once()
-    else:
-        bot.run(interval=args.interval)
+    # timeout(1), CI runners and container platforms stop the bot with SIGTERM:
+    # exit through the finally blocks so leases are given back and files closed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    
+    try:
+        if args.clear_ai_cache and bot.ai_helper and bot.ai_helper.cache:
+            removed = bot.ai_helper.cache.invalidate()
+            print(f"[*] Cleared {removed} cached AI results")
+        
+        author_flags = [(args.block_author, BLOCK), (args.allow_author, ALLOW), (args.unflag_author, None)]
+        if any(who for who, _ in author_flags):
+            ok = all(bot.flag_author(who, flag) for who, flag in author_flags if who)
+            sys.exit(0 if ok else 1)
+        
+        if args.output:
+            bot.results = JsonlWriter(args.output)
+        
+        if args.replay:
+            bot.replay(args.replay)
+        elif args.stream:
+            bot.stream()
+        elif args.single_run:
+            bot.run_once()
+        else:
+            bot.run(interval=args.interval)
+    finally:
+        # A .gz archive is only complete once closed (its trailer is written last)
+        for writer in (bot.archive, bot.results):
+            if writer:
+                writer.close()